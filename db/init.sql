@@ -26,7 +26,8 @@ CREATE TABLE IF NOT EXISTS campaigns (
     terminos_condiciones TEXT,
     fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     fecha_ultima_actividad TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-    fecha_actualizacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    fecha_actualizacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    version INTEGER NOT NULL DEFAULT 1
 );
 
 -- Tabla Outbox
@@ -43,12 +44,25 @@ id                  UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     attempts        INT NOT NULL DEFAULT 0
 );
 
+-- Llaves de idempotencia de los endpoints de comandos (status_code NULL = petición en curso)
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key             VARCHAR(255) PRIMARY KEY,
+    fingerprint     CHAR(64) NOT NULL,
+    status_code     SMALLINT NULL,
+    body            TEXT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT NOW()
+);
+-- La purga periódica borra por antigüedad
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at ON idempotency_keys (created_at);
+
 -- Proyección de lectura 
 CREATE TABLE IF NOT EXISTS campaigns_read (
     id UUID PRIMARY KEY,
     id_marca UUID NOT NULL,
     nombre VARCHAR(255) NOT NULL,
+    descripcion TEXT NULL,
     tipo_campana VARCHAR(50) NOT NULL,
+    objetivo VARCHAR(50) NULL,
     estado VARCHAR(30) NOT NULL DEFAULT 'borrador',
     fecha_inicio TIMESTAMP NULL,
     fecha_fin TIMESTAMP NULL,
@@ -58,6 +72,11 @@ CREATE TABLE IF NOT EXISTS campaigns_read (
     ventas_actuales INT NOT NULL DEFAULT 0,
     meta_engagement INT NOT NULL DEFAULT 0,
     engagement_actual INT NOT NULL DEFAULT 0,
+    target_audiencia TEXT NULL,
+    canales_distribucion TEXT NULL,
+    terminos_condiciones TEXT NULL,
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP NULL,
     last_version INT NOT NULL DEFAULT 0,
     fecha_ultima_actividad TIMESTAMP NULL
 );
@@ -68,6 +87,75 @@ CREATE INDEX IF NOT EXISTS idx_campaigns_estado ON campaigns(estado);
 CREATE INDEX IF NOT EXISTS idx_campaigns_tipo_campana ON campaigns(tipo_campana);
 CREATE INDEX IF NOT EXISTS idx_campaigns_fecha_creacion ON campaigns(fecha_creacion);
 
+-- Índices compuestos para la paginación keyset de los listados (filtro, fecha_creacion, id)
+CREATE INDEX IF NOT EXISTS idx_campaigns_marca_creacion ON campaigns(id_marca, fecha_creacion, id);
+CREATE INDEX IF NOT EXISTS idx_campaigns_tipo_creacion ON campaigns(tipo_campana, fecha_creacion, id);
+CREATE INDEX IF NOT EXISTS idx_campaigns_estado_creacion ON campaigns(estado, fecha_creacion, id);
+
+CREATE INDEX IF NOT EXISTS idx_campaigns_fecha_actualizacion ON campaigns(fecha_actualizacion);
+
+-- Versión por campaña: cada escritura la incrementa y viaja en el evento de outbox (bases existentes)
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- Proyección de lectura: columnas agregadas para servir las queries (bases existentes) e índices de listados
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS descripcion TEXT NULL;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS objetivo VARCHAR(50) NULL;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS target_audiencia TEXT NULL;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS canales_distribucion TEXT NULL;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS terminos_condiciones TEXT NULL;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS fecha_actualizacion TIMESTAMP NULL;
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_marca_creacion ON campaigns_read(id_marca, fecha_creacion, id);
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_tipo_creacion ON campaigns_read(tipo_campana, fecha_creacion, id);
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_estado_creacion ON campaigns_read(estado, fecha_creacion, id);
+DROP INDEX IF EXISTS idx_campaigns_read_ultima_actividad;
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_fecha_actualizacion ON campaigns_read(fecha_actualizacion);
+
+-- Resumen por marca: contadores por (marca, estado, tipo) mantenidos con deltas por la proyección
+CREATE TABLE IF NOT EXISTS campaigns_resumen (
+    id_marca              UUID NOT NULL,
+    estado                VARCHAR(30) NOT NULL,
+    tipo_campana          VARCHAR(50) NOT NULL,
+    cantidad              INTEGER NOT NULL DEFAULT 0,
+    presupuesto_total     DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+    presupuesto_utilizado DOUBLE PRECISION NOT NULL DEFAULT 0.0,
+    ventas_actuales       INTEGER NOT NULL DEFAULT 0,
+    fecha_actualizacion   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_marca, estado, tipo_campana)
+);
+
+-- Carga inicial desde la proyección (bases existentes); no pisa contadores ya mantenidos
+INSERT INTO campaigns_resumen (id_marca, estado, tipo_campana, cantidad, presupuesto_total, presupuesto_utilizado, ventas_actuales)
+SELECT id_marca, estado, tipo_campana, COUNT(*), COALESCE(SUM(presupuesto_total), 0), COALESCE(SUM(presupuesto_utilizado), 0), COALESCE(SUM(ventas_actuales), 0)
+FROM campaigns_read
+GROUP BY id_marca, estado, tipo_campana
+ON CONFLICT (id_marca, estado, tipo_campana) DO NOTHING;
+
+-- Búsqueda de texto: tsvector mantenido por la base (nombre > descripcion > target_audiencia) con índice GIN,
+-- y pg_trgm sobre el nombre para prefijos (ILIKE 'x%') y coincidencias aproximadas (%)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS busqueda tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('spanish', coalesce(nombre, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B') ||
+    setweight(to_tsvector('spanish', coalesce(target_audiencia, '')), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_campaigns_busqueda ON campaigns USING GIN (busqueda);
+CREATE INDEX IF NOT EXISTS idx_campaigns_nombre_trgm ON campaigns USING GIN (nombre gin_trgm_ops);
+ALTER TABLE campaigns_read ADD COLUMN IF NOT EXISTS busqueda tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('spanish', coalesce(nombre, '')), 'A') ||
+    setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B') ||
+    setweight(to_tsvector('spanish', coalesce(target_audiencia, '')), 'C')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_busqueda ON campaigns_read USING GIN (busqueda);
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_nombre_trgm ON campaigns_read USING GIN (nombre gin_trgm_ops);
+
+-- Vigencia de campañas: índice GiST sobre tsrange(fecha_inicio, fecha_fin) para consultas de solapamiento
+-- (fecha_fin NULL = rango abierto). Parcial: sin inicio o con fin anterior al inicio no hay rango válido
+CREATE INDEX IF NOT EXISTS idx_campaigns_vigencia ON campaigns USING GIST (tsrange(fecha_inicio, fecha_fin, '[]'))
+    WHERE fecha_inicio IS NOT NULL AND (fecha_fin IS NULL OR fecha_fin >= fecha_inicio);
+CREATE INDEX IF NOT EXISTS idx_campaigns_read_vigencia ON campaigns_read USING GIST (tsrange(fecha_inicio, fecha_fin, '[]'))
+    WHERE fecha_inicio IS NOT NULL AND (fecha_fin IS NULL OR fecha_fin >= fecha_inicio);
+
 CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox_events(status, occurred_at);
 CREATE INDEX IF NOT EXISTS idx_outbox_agg_time ON outbox_events(aggregate_id, occurred_at);
 
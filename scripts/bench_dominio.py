@@ -0,0 +1,128 @@
+"""Micro-benchmarks del modelo de dominio de campañas
+
+Mide el costo de construir el agregado ``Campana`` y los eventos de dominio,
+de aplicar transiciones que agregan eventos y de serializar los eventos a
+JSON, además de la memoria por instancia: la propia (objeto y ``__dict__``)
+y la retenida con todo lo que referencia (ids, fechas, lista de eventos).
+
+Uso:
+
+    PYTHONPATH=src python scripts/bench_dominio.py --n 200000
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from campaign_management.modulos.campaign_management.dominio.entidades import (
+    Campana, CampanaActivada, CampanaProgramada, EstadoCampana, MetricasCampanaActualizadas
+)
+
+ID_MARCA = uuid.uuid4()
+AHORA = datetime(2025, 1, 1)
+
+
+_CAMPOS = {}
+
+
+def atributos(objeto) -> dict:
+    """Igual que el publicador de Pulsar: campos del dataclass, con o sin ``__dict__``"""
+    campos = _CAMPOS.get(type(objeto))
+    if campos is None:
+        campos = _CAMPOS[type(objeto)] = tuple(campo.name for campo in dataclasses.fields(objeto))
+    return {campo: getattr(objeto, campo) for campo in campos}
+
+
+def construir_campana(i: int):
+    return Campana(id_marca=ID_MARCA, nombre='bench', presupuesto_total=1000.0, meta_ventas=i)
+
+
+def construir_evento(i: int):
+    return MetricasCampanaActualizadas(
+        id_campana=ID_MARCA, id_marca=ID_MARCA, nombre='bench',
+        ventas_actuales=i, engagement_actual=i, presupuesto_utilizado=1.0, fecha_actualizacion=AHORA
+    )
+
+
+def ciclo_de_vida(i: int):
+    campana = Campana(id_marca=ID_MARCA, nombre='bench')
+    campana.programar_campana(AHORA, AHORA)
+    campana.activar_campana()
+    campana.actualizar_metricas(ventas=1, engagement=1)
+    return campana
+
+
+EVENTO = CampanaProgramada(id_campana=ID_MARCA, id_marca=ID_MARCA, nombre='bench',
+                           fecha_inicio=AHORA, fecha_fin=AHORA, fecha_programacion=AHORA)
+
+
+def serializar_evento(i: int):
+    return json.dumps(atributos(EVENTO), default=str)
+
+
+CASOS = {
+    'construir Campana': construir_campana,
+    'construir evento': construir_evento,
+    'programar+activar+métricas': ciclo_de_vida,
+    'serializar evento (json)': serializar_evento,
+}
+
+
+def medir_tiempo(funcion, n: int, rondas: int) -> float:
+    """Mejor tiempo por operación (µs) de ``rondas`` repeticiones"""
+    mejor = float('inf')
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for i in range(n):
+            funcion(i)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / n * 1e6
+
+
+def medir_memoria(funcion, n: int) -> float:
+    """Bytes retenidos por instancia al mantener ``n`` objetos vivos"""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [funcion(i) for i in range(n)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # La lista que los contiene no cuenta
+    return (despues - antes - (len(objetos) * 8)) / n
+
+
+def tamano_propio(objeto) -> int:
+    """Bytes de la instancia y su ``__dict__`` (si tiene), sin los valores que referencia"""
+    tamano = sys.getsizeof(objeto)
+    if hasattr(objeto, '__dict__'):
+        tamano += sys.getsizeof(objeto.__dict__)
+    return tamano
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=100000)
+    parser.add_argument('--rondas', type=int, default=3)
+    args = parser.parse_args()
+
+    assert ciclo_de_vida(0).estado == EstadoCampana.ACTIVA and len(ciclo_de_vida(0).eventos) == 3
+    print(f"{'caso':<28}{'µs/op':>10}")
+    for nombre, funcion in CASOS.items():
+        print(f"{nombre:<28}{medir_tiempo(funcion, args.n, args.rondas):>10.3f}")
+
+    n_memoria = min(args.n, 50000)
+    print(f"\n{'memoria por instancia':<28}{'propia':>10}{'retenida':>10}")
+    for nombre, funcion in (
+        ('Campana', construir_campana),
+        ('MetricasCampanaActualizadas', construir_evento),
+        ('CampanaActivada', lambda i: CampanaActivada(id_campana=ID_MARCA, nombre='bench')),
+    ):
+        print(f"{nombre:<28}{tamano_propio(funcion(0)):>10}{medir_memoria(funcion, n_memoria):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
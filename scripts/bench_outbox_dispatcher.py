@@ -0,0 +1,119 @@
+"""Benchmark del dispatcher de outbox con envíos en pipeline
+
+Compara el camino anterior (``send`` síncrono y un ``UPDATE`` por fila) con
+``publish_pending_batch`` actual (``send_async`` por olas y dos ``UPDATE`` por
+conjunto) usando un broker y una base simulados en proceso: cada ``send``
+espera un round trip (``--rtt-ms``), ``send_async`` confirma tras el mismo
+round trip desde otro hilo, y cada sentencia SQL cuesta ``--sql-ms``.
+``--agregados`` controla cuántos agregados distintos hay en el lote (menos
+agregados, más olas).
+
+Uso:
+
+    PYTHONPATH=src python scripts/bench_outbox_dispatcher.py --lote 200 --agregados 200
+"""
+
+import argparse
+import contextlib
+import json
+import threading
+import time
+import uuid
+
+from campaign_management.infraestructura.outbox import dispatcher
+
+
+class PublicadorSimulado:
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.enviados = 0
+
+    def publish_json(self, saga_id, event_data, event_type, status):
+        time.sleep(self.rtt)
+        self.enviados += 1
+
+    def publish_json_async(self, saga_id, event_data, event_type, status, callback):
+        self.enviados += 1
+        threading.Timer(self.rtt, callback, (True, None)).start()
+
+    def flush(self):
+        pass
+
+
+class ConexionSimulada:
+    def __init__(self, filas, costo_sql: float):
+        self.filas = filas
+        self.costo_sql = costo_sql
+        self.sentencias = 0
+
+    def execute(self, sentencia, parametros=None):
+        time.sleep(self.costo_sql)
+        self.sentencias += 1
+        filas = self.filas
+
+        class Resultado:
+            def mappings(self):
+                return self
+
+            def all(self):
+                return filas
+        return Resultado()
+
+
+class BaseSimulada:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    @property
+    def engine(self):
+        return self
+
+    @contextlib.contextmanager
+    def begin(self):
+        yield self.conexion
+
+
+def filas_outbox(lote: int, agregados: int):
+    ids = [uuid.uuid4() for _ in range(agregados)]
+    return [{
+        'id': uuid.uuid4(), 'saga_id': uuid.uuid4(), 'aggregate_id': ids[i % agregados],
+        'event_data': json.dumps({'event_type': 'CampaignMetricsUpdated', 'aggregate_id': str(ids[i % agregados]),
+                                  'data': {'ventas_actuales': i}}),
+    } for i in range(lote)]
+
+
+def anterior(conexion, publicador):
+    """Camino previo: publish_json síncrono y un UPDATE por fila"""
+    for r in conexion.execute('SELECT').mappings().all():
+        publicador.publish_json(r['saga_id'], json.loads(r['event_data']), dispatcher.TOPIC_CAMPAIGN, 'success')
+        conexion.execute('UPDATE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lote', type=int, default=200)
+    parser.add_argument('--agregados', type=int, default=200)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    parser.add_argument('--sql-ms', type=float, default=0.3)
+    args = parser.parse_args()
+
+    filas = filas_outbox(args.lote, args.agregados)
+    print(f"lote {args.lote}, {args.agregados} agregados, rtt {args.rtt_ms} ms, {args.sql_ms} ms por sentencia")
+    print(f"{'camino':<12}{'ms/lote':>10}{'eventos/s':>12}{'sentencias':>12}")
+    for nombre in ('anterior', 'pipeline'):
+        conexion = ConexionSimulada(filas, args.sql_ms / 1000)
+        publicador = PublicadorSimulado(args.rtt_ms / 1000)
+        inicio = time.perf_counter()
+        if nombre == 'anterior':
+            anterior(conexion, publicador)
+        else:
+            dispatcher.db = BaseSimulada(conexion)
+            dispatcher.pulsar_publisher = publicador
+            dispatcher.publish_pending_batch(args.lote)
+        duracion = time.perf_counter() - inicio
+        assert publicador.enviados == len(filas)
+        print(f"{nombre:<12}{duracion * 1000:>10.1f}{len(filas) / duracion:>12.0f}{conexion.sentencias:>12}")
+
+
+if __name__ == '__main__':
+    main()
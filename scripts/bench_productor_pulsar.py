@@ -0,0 +1,198 @@
+"""Benchmark de los perfiles de producer de Pulsar
+
+Publica mensajes de outbox representativos con cada perfil de
+``PERFILES_PRODUCTOR`` y reporta mensajes/s y bytes en el cable.
+
+Dos modos:
+
+* ``--broker pulsar://localhost:6650``: contra un broker local de pruebas
+  (``docker compose up pulsar``). Cada perfil publica en su propio topic
+  ``bench-productor-<perfil>`` con ``send`` (camino actual de ``publish_json``)
+  y con ``send_async`` + ``flush``; los bytes salen de ``bytesInCounter`` de
+  las estadísticas del topic (``--admin``).
+* ``--simulado`` (por defecto, sin ``--broker``): un broker
+  simulado en proceso. Arma los lotes y comprime de verdad (zlib de la
+  biblioteca estándar; lz4 y zstd si están instalados ``lz4``/``zstandard``)
+  y modela la red con un round trip fijo (``--rtt-ms``) y un costo fijo por
+  request en cliente y broker (``--costo-request-us``): ``send`` espera un
+  round trip por mensaje, y ``send_async`` uno por lote, con a lo más
+  ``max_pending`` mensajes en vuelo. Si falta el compresor del perfil se usa
+  zlib en su lugar y se indica en el resultado.
+
+Uso:
+
+    PYTHONPATH=src python scripts/bench_productor_pulsar.py --simulado --n 20000
+    PYTHONPATH=src python scripts/bench_productor_pulsar.py --broker pulsar://localhost:6650 --n 20000
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import time
+import urllib.request
+import uuid
+import zlib
+from datetime import datetime
+
+from campaign_management.infraestructura.pulsar import PERFILES_PRODUCTOR, PerfilProductor
+from campaign_management.seedwork.infraestructura.codecs import codec_configurado
+
+# Encabezado por mensaje y por request que agrega el protocolo (aproximado, solo para el modo simulado)
+BYTES_METADATA_MENSAJE = 40
+BYTES_ENCABEZADO_REQUEST = 60
+
+
+def mensaje(i: int) -> bytes:
+    """Sobre de publish_json con un evento de outbox, codificado con PULSAR_MESSAGE_CODEC"""
+    ahora = datetime.utcnow().isoformat()
+    id_campana = str(uuid.uuid4())
+    return codec_configurado().codificar({
+        'saga_id': str(uuid.uuid4()), 'service': 'Campaign', 'status': 'success', 'event_id': None,
+        'event_type': 'EventCampaignCreated',
+        'event_data': {
+            'event_type': 'CampaignMetricsUpdated', 'aggregate_id': id_campana, 'version': 1,
+            'timestamp': ahora, 'metadata': {},
+            'data': {'id': id_campana, 'id_marca': str(uuid.uuid4()), 'nombre': f'Campaña de verano {i % 50}',
+                     'ventas_actuales': i, 'engagement_actual': i * 3, 'presupuesto_utilizado': i * 1.5,
+                     'fecha_actualizacion': ahora},
+        },
+        'timestamp': ahora,
+    })
+
+
+# ------------------------------------------------------------------ simulado
+
+def _compresor(nombre: str):
+    if nombre == 'none':
+        return lambda datos: datos
+    if nombre == 'zlib':
+        return zlib.compress
+    if nombre == 'lz4':
+        import lz4.frame
+        return lz4.frame.compress
+    if nombre == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor().compress
+    raise ImportError(nombre)
+
+
+def simular(perfil: PerfilProductor, mensajes, rtt_ms: float, costo_request_us: float, asincrono: bool):
+    """Devuelve (mensajes/s, bytes en el cable) según el modelo descrito en el encabezado"""
+    comprimir = _compresor(perfil.compression)
+    rtt = rtt_ms / 1000
+    costo_request = costo_request_us / 1e6
+    bytes_cable = 0
+    requests = 0
+    inicio = time.perf_counter()
+    if perfil.batching and asincrono:
+        lote, tamano = [], 0
+        for datos in mensajes:
+            lote.append(datos)
+            tamano += len(datos) + BYTES_METADATA_MENSAJE
+            if len(lote) >= perfil.batch_max_messages or tamano >= perfil.batch_max_bytes:
+                bytes_cable += BYTES_ENCABEZADO_REQUEST + len(comprimir(b''.join(lote))) + BYTES_METADATA_MENSAJE * len(lote)
+                requests += 1
+                lote, tamano = [], 0
+        if lote:
+            bytes_cable += BYTES_ENCABEZADO_REQUEST + len(comprimir(b''.join(lote))) + BYTES_METADATA_MENSAJE * len(lote)
+            requests += 1
+        cpu = time.perf_counter() - inicio
+        # Los lotes viajan en paralelo hasta llenar la cola de pendientes
+        en_vuelo = max(1, perfil.max_pending // max(1, math.ceil(len(mensajes) / requests)))
+        espera = math.ceil(requests / en_vuelo) * rtt + requests * costo_request
+    else:
+        for datos in mensajes:
+            bytes_cable += BYTES_ENCABEZADO_REQUEST + BYTES_METADATA_MENSAJE + len(comprimir(datos))
+            requests += 1
+        cpu = time.perf_counter() - inicio
+        if asincrono:
+            espera = math.ceil(requests / max(1, perfil.max_pending)) * rtt + requests * costo_request
+        else:
+            # send síncrono: un round trip por mensaje y, con batching, además la espera del lote
+            espera = requests * (rtt + costo_request + (perfil.batch_delay_ms / 1000 if perfil.batching else 0))
+    return len(mensajes) / (cpu + espera), bytes_cable
+
+
+# ------------------------------------------------------------------ broker real
+
+def _bytes_recibidos(admin_url: str, topic: str) -> int:
+    ruta = topic.replace('persistent://', 'persistent/')
+    with urllib.request.urlopen(f'{admin_url}/admin/v2/{ruta}/stats', timeout=10) as respuesta:
+        return int(json.load(respuesta).get('bytesInCounter', 0))
+
+
+def publicar_real(cliente, admin_url: str, perfil_nombre: str, perfil: PerfilProductor, mensajes, asincrono: bool):
+    topic = f'persistent://campaign-management/events/bench-productor-{perfil_nombre}'
+    producer = cliente.create_producer(topic, **perfil.opciones_producer())
+    try:
+        antes = _bytes_recibidos(admin_url, topic)
+        errores = []
+        inicio = time.perf_counter()
+        if asincrono:
+            def confirmado(resultado, _id):
+                if str(resultado) != 'Ok':
+                    errores.append(resultado)
+            for datos in mensajes:
+                producer.send_async(datos, confirmado)
+            producer.flush()
+        else:
+            for datos in mensajes:
+                producer.send(datos)
+        duracion = time.perf_counter() - inicio
+        # Las estadísticas del broker se actualizan con retraso
+        time.sleep(2)
+        if errores:
+            print(f"  {len(errores)} envíos fallidos, el primero: {errores[0]}")
+        return len(mensajes) / duracion, _bytes_recibidos(admin_url, topic) - antes
+    finally:
+        producer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=20000)
+    parser.add_argument('--broker', default=None, help='URL del broker local; sin ella se usa el modo simulado')
+    parser.add_argument('--admin', default='http://localhost:8080')
+    parser.add_argument('--simulado', action='store_true')
+    parser.add_argument('--rtt-ms', type=float, default=0.5, help='round trip del modo simulado')
+    parser.add_argument('--costo-request-us', type=float, default=50, help='costo por request del modo simulado')
+    args = parser.parse_args()
+
+    mensajes = [mensaje(i) for i in range(args.n)]
+    print(f"{args.n} mensajes, {sum(map(len, mensajes)) / args.n:.0f} bytes promedio de payload")
+
+    cliente = None
+    if args.broker and not args.simulado:
+        import pulsar
+        cliente = pulsar.Client(args.broker)
+        print(f"broker: {args.broker}")
+    else:
+        print(f"broker simulado, rtt {args.rtt_ms} ms, {args.costo_request_us:.0f} µs por request")
+
+    print(f"{'perfil':<12}{'envío':<12}{'mensajes/s':>12}{'bytes cable':>14}{'bytes/msg':>11}")
+    try:
+        for nombre, valores in PERFILES_PRODUCTOR.items():
+            perfil = PerfilProductor(**valores)
+            if cliente is None:
+                try:
+                    _compresor(perfil.compression)
+                except ImportError:
+                    nombre = f'{nombre}*'
+                    perfil = dataclasses.replace(perfil, compression='zlib')
+            for asincrono in (False, True):
+                envio = 'send_async' if asincrono else 'send'
+                if cliente is not None:
+                    tasa, bytes_cable = publicar_real(cliente, args.admin, nombre, perfil, mensajes, asincrono)
+                else:
+                    tasa, bytes_cable = simular(perfil, mensajes, args.rtt_ms, args.costo_request_us, asincrono)
+                print(f"{nombre:<12}{envio:<12}{tasa:>12.0f}{bytes_cable:>14}{bytes_cable / len(mensajes):>11.1f}")
+        if cliente is None:
+            print("* compresor del perfil no instalado: medido con zlib")
+    finally:
+        if cliente is not None:
+            cliente.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark de la serialización de eventos para Pulsar
+
+Compara, por clase de evento, el camino anterior de ``publish_event``
+(atributos del objeto y ``json.dumps(..., default=str)``) con el codificador
+generado del registro de serializadores (``codificar`` + ``json.dumps`` sin
+``default=``), y lo mismo para el payload de outbox que recibe ``publish_json``.
+
+Uso:
+
+    PYTHONPATH=src python scripts/bench_serializacion.py --n 100000
+"""
+
+import argparse
+import dataclasses
+import json
+import time
+import uuid
+from datetime import datetime
+
+from campaign_management.modulos.campaign_management.dominio.entidades import (
+    CampanaActivada, CampanaProgramada, MetricasCampanaActualizadas
+)
+from campaign_management.seedwork.infraestructura.serializacion import a_json, codificar, valor_json
+
+SAGA_ID = uuid.uuid4()
+AHORA = datetime(2025, 1, 1, 12, 30)
+
+EVENTOS = {
+    'CampanaActivada': CampanaActivada(id_campana=uuid.uuid4(), id_marca=uuid.uuid4(), nombre='bench', fecha_activacion=AHORA),
+    'CampanaProgramada': CampanaProgramada(
+        id_campana=uuid.uuid4(), id_marca=uuid.uuid4(), nombre='bench',
+        fecha_inicio=AHORA, fecha_fin=AHORA, fecha_programacion=AHORA
+    ),
+    'MetricasCampanaActualizadas': MetricasCampanaActualizadas(
+        id_campana=uuid.uuid4(), id_marca=uuid.uuid4(), nombre='bench', ventas_actuales=10,
+        engagement_actual=20, presupuesto_utilizado=1.5, fecha_actualizacion=AHORA
+    ),
+}
+
+# Payload de outbox ya decodificado, como lo entrega el dispatcher a publish_json
+PAYLOAD_OUTBOX = json.loads(json.dumps({
+    'event_type': 'CampaignActivated', 'aggregate_id': str(uuid.uuid4()), 'version': 1,
+    'timestamp': AHORA.isoformat(), 'metadata': {},
+    'data': {'id': str(uuid.uuid4()), 'id_marca': str(uuid.uuid4()), 'nombre': 'bench',
+             'fecha_activacion': AHORA.isoformat()},
+}))
+
+
+def atributos_reflexivos(evento) -> dict:
+    # Equivalente a ``evento.__dict__`` para clases con __slots__
+    return {campo.name: getattr(evento, campo.name) for campo in dataclasses.fields(evento)}
+
+
+def anterior_evento(evento) -> str:
+    return json.dumps({
+        'saga_id': SAGA_ID, 'service': 'Campaign', 'status': 'success',
+        'event_type': 'EventCampaignCreated', 'event_data': atributos_reflexivos(evento),
+    }, default=str)
+
+
+def nuevo_evento(evento) -> str:
+    return json.dumps({
+        'saga_id': valor_json(SAGA_ID), 'service': 'Campaign', 'status': 'success',
+        'event_type': 'EventCampaignCreated', 'event_data': codificar(evento),
+    })
+
+
+def anterior_json(payload) -> str:
+    return json.dumps({'saga_id': SAGA_ID, 'service': 'Campaign', 'status': 'success',
+                       'event_type': 'EventCampaignCreated', 'event_data': payload}, default=str)
+
+
+def nuevo_json(payload) -> str:
+    return a_json({'saga_id': valor_json(SAGA_ID), 'service': 'Campaign', 'status': 'success',
+                   'event_type': 'EventCampaignCreated', 'event_data': payload})
+
+
+def medir(funcion, argumento, n: int, rondas: int) -> float:
+    """Mejor tiempo por llamada (µs)"""
+    mejor = float('inf')
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(n):
+            funcion(argumento)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=100000)
+    parser.add_argument('--rondas', type=int, default=5)
+    args = parser.parse_args()
+
+    casos = [(nombre, anterior_evento, nuevo_evento, evento) for nombre, evento in EVENTOS.items()]
+    casos.append(('payload outbox (publish_json)', anterior_json, nuevo_json, PAYLOAD_OUTBOX))
+
+    print(f"{'caso':<32}{'anterior µs':>12}{'nuevo µs':>10}{'mejora':>8}")
+    for nombre, anterior, nuevo, argumento in casos:
+        # Mismo contenido salvo el formato de fechas: str(datetime) usa espacio e isoformat 'T'
+        assert json.loads(anterior(argumento)).keys() == json.loads(nuevo(argumento)).keys()
+        t_anterior = medir(anterior, argumento, args.n, args.rondas)
+        t_nuevo = medir(nuevo, argumento, args.n, args.rondas)
+        print(f"{nombre:<32}{t_anterior:>12.3f}{t_nuevo:>10.3f}{t_anterior / t_nuevo:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
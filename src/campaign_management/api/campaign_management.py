@@ -4,22 +4,27 @@ En este archivo se define la API REST para la gestión de campañas
 
 """
 
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import (
     CrearCampana, ProgramarCampana, ActivarCampana, PausarCampana, 
-    FinalizarCampana, CancelarCampana, ActualizarMetricasCampana
+    FinalizarCampana, CancelarCampana, ActualizarMetricasCampana, CrearCampanasLote,
+    TransicionarCampanasMarca
 )
 from campaign_management.modulos.campaign_management.aplicacion.queries.queries_campana import (
-    ObtenerCampana, ObtenerCampanasPorMarca, ObtenerCampanasPorTipo,
-    ObtenerCampanasPorEstado, ObtenerCampanasActivas
+    ObtenerCampana, ObtenerVersionCampana, ObtenerCampanasPorMarca, ObtenerCampanasPorTipo,
+    ObtenerCampanasPorEstado, ObtenerCampanasActivas, ObtenerCampanasPorIds, ObtenerResumenMarca,
+    BuscarCampanas, ObtenerCampanasEnRango
 )
 from campaign_management.modulos.campaign_management.aplicacion.mapeadores import MapeadorCampanaDTOJson
+from campaign_management.api.idempotencia import idempotente
 from campaign_management.seedwork.aplicacion.comandos import ejecutar_commando
 from campaign_management.seedwork.aplicacion.queries import ejecutar_query
 from campaign_management.seedwork.dominio.excepciones import ExcepcionDominio
-from datetime import datetime
+from datetime import datetime, timezone
+import hashlib
 import json
 from uuid import UUID
+from urllib.parse import urlencode
 import logging
 
 def _is_uuid(v: str) -> bool:
@@ -30,11 +35,80 @@ def _is_uuid(v: str) -> bool:
         return False
 
 
+def _lista_de_textos(valor) -> bool:
+    return isinstance(valor, list) and all(isinstance(elemento, str) for elemento in valor)
+
+
+def _campos_solicitados():
+    """Lista de campos pedidos con ?fields=a,b,c (None si se piden todos)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [campo.strip() for campo in fields.split(',') if campo.strip()] or None
+
+
+def _etag_campana(id_campana: str, version: datetime, campos=None) -> str:
+    """ETag fuerte derivado de la fecha de actualización de la campaña y de los campos pedidos"""
+    representacion = ','.join(sorted(campos)) if campos else '*'
+    return hashlib.sha1(f"{id_campana}:{version.isoformat()}:{representacion}".encode('utf-8')).hexdigest()
+
+
+def _no_modificada(etag: str, ultima_modificacion: datetime) -> bool:
+    """Evalúa If-None-Match (prioritario) e If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return ultima_modificacion.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _quiere_stream() -> bool:
+    """Modo stream con ?stream=1 o Accept: application/x-ndjson"""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+
+def _respuesta_ndjson(filas):
+    """Emite una línea JSON por campaña a medida que se leen del cursor
+
+    El status 200 ya se envió con la primera línea: si la lectura falla a mitad
+    del stream, el listado termina con una línea ``{"error": ...}``.
+    """
+    def generar():
+        try:
+            for fila in filas:
+                yield json.dumps(fila, ensure_ascii=False) + '\n'
+        except Exception:
+            logger.exception("Error emitiendo listado de campañas en stream")
+            yield json.dumps(dict(error='Error interno del servidor')) + '\n'
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+
+
+def _respuesta_listado(resultado):
+    if isinstance(resultado, dict):
+        return _respuesta_paginada(resultado)
+    return _respuesta_ndjson(resultado)
+
+
+def _respuesta_paginada(resultado: dict):
+    """Responde la página como lista JSON y expone el cursor siguiente en cabeceras"""
+    respuesta = jsonify(resultado['items'])
+    siguiente = resultado.get('next_cursor')
+    if siguiente:
+        respuesta.headers['X-Next-Cursor'] = siguiente
+        args = request.args.to_dict()
+        args['cursor'] = siguiente
+        respuesta.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return respuesta
+
+
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('campaign_management', __name__, url_prefix='/campaign-management')
 
 @bp.route('/campaign', methods=['POST'])
+@idempotente
 def crear_campana():
     try:
         campana_dict = request.json
@@ -70,7 +144,48 @@ def crear_campana():
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
+@bp.route('/campaigns/batch', methods=['POST'])
+@idempotente
+def crear_campanas_lote():
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('campanas') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "se requiere una lista no vacía de campañas"}), 400
+
+        map_campana = MapeadorCampanaDTOJson()
+        ahora = datetime.now().isoformat()
+        campanas = []
+        for item in items:
+            campana_dto = map_campana.externo_a_dto(item if isinstance(item, dict) else {})
+            campanas.append(CrearCampana(
+                id=campana_dto.id,
+                saga_id=campana_dto.saga_id,
+                id_marca=campana_dto.id_marca,
+                nombre=campana_dto.nombre,
+                descripcion=campana_dto.descripcion,
+                tipo_campana=campana_dto.tipo_campana,
+                objetivo=campana_dto.objetivo,
+                fecha_inicio=campana_dto.fecha_inicio,
+                fecha_fin=campana_dto.fecha_fin,
+                presupuesto_total=campana_dto.presupuesto_total,
+                meta_ventas=campana_dto.meta_ventas,
+                meta_engagement=campana_dto.meta_engagement,
+                target_audiencia=campana_dto.target_audiencia,
+                canales_distribucion=campana_dto.canales_distribucion,
+                terminos_condiciones=campana_dto.terminos_condiciones,
+                fecha_creacion=ahora,
+                fecha_actualizacion=ahora
+            ))
+
+        resultado = ejecutar_commando(CrearCampanasLote(campanas=campanas))
+        status = 202 if resultado["creadas"] else 400
+        return jsonify(resultado), status
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+
 @bp.route('/campaign/<id>/programar', methods=['PUT'])
+@idempotente
 def programar_campana(id):
     try:
         data = request.json
@@ -91,6 +206,7 @@ def programar_campana(id):
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
 @bp.route('/campaign/<id>/activar', methods=['PUT'])
+@idempotente
 def activar_campana(id):
     # Aceptar body vacío sin reventar el mapeo
     _ = request.get_json(silent=True) or {}
@@ -114,6 +230,7 @@ def activar_campana(id):
         return jsonify({"error": "internal", "detail": str(e)}), 500
 
 @bp.route('/campaign/<id>/pausar', methods=['PUT'])
+@idempotente
 def pausar_campana(id):
     try:
         data = request.json
@@ -132,6 +249,7 @@ def pausar_campana(id):
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
 @bp.route('/campaign/<id>/finalizar', methods=['PUT'])
+@idempotente
 def finalizar_campana(id):
     try:
         data = request.json
@@ -150,6 +268,7 @@ def finalizar_campana(id):
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
 @bp.route('/campaign/<id>/cancelar', methods=['PUT'])
+@idempotente
 def cancelar_campana(id):
     try:
         data = request.json
@@ -167,7 +286,36 @@ def cancelar_campana(id):
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
 
+@bp.route('/campaigns/marca/<id_marca>/<accion>', methods=['PUT'])
+@idempotente
+def transicionar_campanas_marca(id_marca, accion):
+    if not _is_uuid(id_marca):
+        return jsonify({"error": "id_marca debe ser UUID válido"}), 400
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            # Sin filtro la transición alcanzaría a todas las campañas de la marca
+            return jsonify({"error": "body debe ser {\"estados\": [...], \"motivo\": \"...\"}"}), 400
+        estados = data.get('estados')
+        if estados is not None and not _lista_de_textos(estados):
+            return jsonify({"error": "estados debe ser una lista de strings"}), 400
+
+        comando = TransicionarCampanasMarca(
+            id_marca=id_marca,
+            accion=accion,
+            motivo=data.get('motivo', ''),
+            estados=estados
+        )
+
+        resultado = ejecutar_commando(comando)
+        return jsonify(resultado), 200
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+
 @bp.route('/campaign/<id>/actualizar-metricas', methods=['PUT'])
+@idempotente
 def actualizar_metricas_campana(id):
     try:
         data = request.json
@@ -191,36 +339,170 @@ def actualizar_metricas_campana(id):
 
 @bp.route('/campaign/<id>', methods=['GET'])
 def obtener_campana(id):
+    if not _is_uuid(id):
+        return jsonify({"error": "id inválido, debe ser UUID"}), 400
     try:
-        query = ObtenerCampana(id_campana=id)
+        campos = _campos_solicitados()
+        # Revalidación barata: solo se consulta la versión antes de cargar la campaña completa
+        if request.if_none_match or request.if_modified_since:
+            version = ejecutar_query(ObtenerVersionCampana(id_campana=id, campos=campos))
+            if version is None:
+                return Response(json.dumps(dict(error='Campaña no encontrada')), status=404, mimetype='application/json')
+            ultima_modificacion = version.replace(tzinfo=timezone.utc)
+            etag = _etag_campana(id, version, campos)
+            if _no_modificada(etag, ultima_modificacion):
+                respuesta = Response(status=304)
+                respuesta.set_etag(etag)
+                respuesta.last_modified = ultima_modificacion
+                respuesta.headers['Cache-Control'] = 'no-cache'
+                return respuesta
+
+        # La versión se lee siempre para poder emitir el ETag, aunque no se haya pedido
+        campos_consulta = campos + ['fecha_actualizacion'] if campos and 'fecha_actualizacion' not in campos else campos
+        query = ObtenerCampana(id_campana=id, campos=campos_consulta)
         resultado = ejecutar_query(query)
         if resultado is None:
             return Response(json.dumps(dict(error='Campaña no encontrada')), status=404, mimetype='application/json')
-        return jsonify(resultado)
+        fecha_actualizacion = resultado.get('fecha_actualizacion')
+        if campos_consulta is not campos:
+            resultado.pop('fecha_actualizacion')
+        respuesta = jsonify(resultado)
+        if fecha_actualizacion:
+            version = datetime.fromisoformat(fecha_actualizacion)
+            respuesta.set_etag(_etag_campana(id, version, campos))
+            respuesta.last_modified = version.replace(tzinfo=timezone.utc)
+            respuesta.headers['Cache-Control'] = 'no-cache'
+        return respuesta
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
     except Exception as e:
         logger.exception("Error obteniendo campaña: %s", e)
         return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
 
+def _respuesta_por_ids(ids, campos):
+    if not ids:
+        return jsonify({"error": "ids es obligatorio"}), 400
+    if not all(isinstance(i, str) and _is_uuid(i) for i in ids):
+        return jsonify({"error": "ids debe contener solo UUID válidos"}), 400
+    try:
+        resultado = ejecutar_query(ObtenerCampanasPorIds(ids=ids, campos=campos))
+        return jsonify(resultado)
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+    except Exception as e:
+        logger.exception("Error obteniendo campañas por ids: %s", e)
+        return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
+
+@bp.route('/campaigns', methods=['GET'])
+def obtener_campanas_por_ids():
+    ids = [i.strip() for i in request.args.get('ids', '').split(',') if i.strip()]
+    return _respuesta_por_ids(ids, _campos_solicitados())
+
+@bp.route('/campaigns/ids', methods=['POST'])
+def obtener_campanas_por_ids_post():
+    data = request.get_json(silent=True)
+    data = data if isinstance(data, dict) else {}
+    ids = data.get('ids')
+    campos = data.get('fields')
+    if not _lista_de_textos(ids) or (campos is not None and not _lista_de_textos(campos)):
+        return jsonify({"error": "body debe ser {\"ids\": [...], \"fields\": [...]} con listas de strings"}), 400
+    return _respuesta_por_ids(ids, campos or None)
+
+@bp.route('/campaigns/search', methods=['GET'])
+def buscar_campanas():
+    texto = request.args.get('q', '')
+    id_marca = request.args.get('id_marca')
+    if id_marca and not _is_uuid(id_marca):
+        return jsonify({"error": "id_marca debe ser UUID válido"}), 400
+    try:
+        query = BuscarCampanas(
+            texto=texto,
+            id_marca=id_marca,
+            limite=request.args.get('limit', type=int),
+            offset=request.args.get('offset', 0, type=int),
+            campos=_campos_solicitados()
+        )
+        return jsonify(ejecutar_query(query))
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+    except Exception as e:
+        logger.exception("Error buscando campañas: %s", e)
+        return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
+
+@bp.route('/campaigns/rango', methods=['GET'])
+def obtener_campanas_en_rango():
+    # ?en=T equivale a ?desde=T&hasta=T (campañas vigentes en ese instante)
+    desde = request.args.get('desde') or request.args.get('en')
+    hasta = request.args.get('hasta') or request.args.get('en')
+    if not desde or not hasta:
+        return jsonify({"error": "Se requiere desde y hasta, o en"}), 400
+    id_marca = request.args.get('id_marca')
+    if id_marca and not _is_uuid(id_marca):
+        return jsonify({"error": "id_marca debe ser UUID válido"}), 400
+    try:
+        query = ObtenerCampanasEnRango(
+            desde=desde,
+            hasta=hasta,
+            id_marca=id_marca,
+            estado=request.args.get('estado'),
+            limite=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            stream=_quiere_stream(),
+            campos=_campos_solicitados()
+        )
+        resultado = ejecutar_query(query)
+        return _respuesta_listado(resultado)
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+    except Exception as e:
+        logger.exception("Error obteniendo campañas en rango: %s", e)
+        return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
+
 @bp.route('/campaigns/marca/<id_marca>', methods=['GET'])
 def obtener_campanas_por_marca(id_marca):
+    if not _is_uuid(id_marca):
+        return jsonify({"error": "id_marca debe ser UUID válido"}), 400
     try:
-        query = ObtenerCampanasPorMarca(id_marca=id_marca)
+        query = ObtenerCampanasPorMarca(
+            id_marca=id_marca,
+            limite=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            stream=_quiere_stream(),
+            campos=_campos_solicitados()
+        )
         resultado = ejecutar_query(query)
-        return jsonify(resultado)
+        return _respuesta_listado(resultado)
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
     except Exception as e:
         logger.exception("Error obteniendo campañas por marca: %s", e)
         return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
 
+@bp.route('/campaigns/marca/<id_marca>/resumen', methods=['GET'])
+def obtener_resumen_marca(id_marca):
+    if not _is_uuid(id_marca):
+        return jsonify({"error": "id_marca debe ser UUID válido"}), 400
+    try:
+        resultado = ejecutar_query(ObtenerResumenMarca(id_marca=id_marca))
+        return jsonify(resultado)
+    except ExcepcionDominio as e:
+        return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
+    except Exception as e:
+        logger.exception("Error obteniendo resumen de la marca: %s", e)
+        return Response(json.dumps(dict(error='Error interno del servidor')), status=500, mimetype='application/json')
+
 @bp.route('/campaigns/tipo/<tipo_campana>', methods=['GET'])
 def obtener_campanas_por_tipo(tipo_campana):
     try:
-        query = ObtenerCampanasPorTipo(tipo_campana=tipo_campana)
+        query = ObtenerCampanasPorTipo(
+            tipo_campana=tipo_campana,
+            limite=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            stream=_quiere_stream(),
+            campos=_campos_solicitados()
+        )
         resultado = ejecutar_query(query)
-        return jsonify(resultado)
+        return _respuesta_listado(resultado)
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
     except Exception as e:
@@ -230,9 +512,15 @@ def obtener_campanas_por_tipo(tipo_campana):
 @bp.route('/campaigns/estado/<estado>', methods=['GET'])
 def obtener_campanas_por_estado(estado):
     try:
-        query = ObtenerCampanasPorEstado(estado=estado)
+        query = ObtenerCampanasPorEstado(
+            estado=estado,
+            limite=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            stream=_quiere_stream(),
+            campos=_campos_solicitados()
+        )
         resultado = ejecutar_query(query)
-        return jsonify(resultado)
+        return _respuesta_listado(resultado)
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
     except Exception as e:
@@ -242,9 +530,14 @@ def obtener_campanas_por_estado(estado):
 @bp.route('/campaigns/activas', methods=['GET'])
 def obtener_campanas_activas():
     try:
-        query = ObtenerCampanasActivas()
+        query = ObtenerCampanasActivas(
+            limite=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            stream=_quiere_stream(),
+            campos=_campos_solicitados()
+        )
         resultado = ejecutar_query(query)
-        return jsonify(resultado)
+        return _respuesta_listado(resultado)
     except ExcepcionDominio as e:
         return Response(json.dumps(dict(error=str(e))), status=400, mimetype='application/json')
     except Exception as e:
@@ -1,27 +1,37 @@
 from flask import Blueprint, jsonify
-from sqlalchemy import text
-from campaign_management.config.db import db
-from campaign_management.infraestructura.pulsar import PulsarConfig
-from pulsar import Client
+from campaign_management.infraestructura import commit_grupal, salud
+from campaign_management.seedwork.aplicacion.middleware import estadisticas_buses
+from campaign_management.seedwork.infraestructura.cache import estadisticas_caches
 
 bp = Blueprint("health", __name__, url_prefix="/health")
 
+def _estado():
+    if salud.verificador_salud is None:
+        return {"listo": False, "dependencias": {}}
+    return salud.verificador_salud.estado()
+
+@bp.route("/live", methods=["GET"])
+def live():
+    # El proceso responde: no depende de la base ni del broker
+    return jsonify({"status": "ok"}), 200
+
+@bp.route("/ready", methods=["GET"])
+def ready():
+    estado = _estado()
+    return jsonify(estado), 200 if estado["listo"] else 503
+
 @bp.route("", methods=["GET"])
 def health():
-    # DB check
-    try:
-        db.session.execute(text("SELECT 1"))
-        db_ok = True
-    except Exception:
-        db_ok = False
-
-    # Pulsar check
-    try:
-        cfg = PulsarConfig()
-        client = Client(cfg.service_url)
-        client.close()
-        pulsar_ok = True
-    except Exception:
-        pulsar_ok = False
+    # Compatibilidad: mismo resultado que /ready con los indicadores db/pulsar de siempre
+    estado = _estado()
+    dependencias = estado["dependencias"]
+    cuerpo = {nombre: dependencia.get("ok", False) for nombre, dependencia in dependencias.items()}
+    cuerpo["dependencias"] = dependencias
+    return jsonify(cuerpo), 200 if estado["listo"] else 503
 
-    return jsonify({"db": db_ok, "pulsar": pulsar_ok}), 200 if (db_ok and pulsar_ok) else 503
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    cuerpo = {"caches": estadisticas_caches(), "buses": estadisticas_buses()}
+    if commit_grupal.commit_grupal is not None:
+        cuerpo["commit_grupal"] = commit_grupal.commit_grupal.estadisticas()
+    return jsonify(cuerpo), 200
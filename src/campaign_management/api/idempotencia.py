@@ -0,0 +1,73 @@
+"""Soporte de Idempotency-Key para los endpoints de comandos
+
+En este archivo se define el decorador que hace idempotentes los endpoints de
+escritura: un reintento con la misma llave devuelve la respuesta original sin
+volver a ejecutar el comando.
+"""
+
+import hashlib
+import json
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from campaign_management.infraestructura.idempotencia import (
+    guardar_respuesta, liberar_llave, reclamar_llave, respuesta_en_cache
+)
+
+CABECERA = 'Idempotency-Key'
+LARGO_MAXIMO_LLAVE = 255
+
+
+def _error(mensaje: str, status: int) -> Response:
+    return Response(json.dumps(dict(error=mensaje)), status=status, mimetype='application/json')
+
+
+def _huella() -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode('utf-8'))
+    digest.update(b' ')
+    digest.update(request.path.encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _repetir(guardada) -> Response:
+    respuesta = Response(guardada.cuerpo, status=guardada.status_code, mimetype='application/json')
+    respuesta.headers['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+def idempotente(vista):
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        llave = request.headers.get(CABECERA)
+        if not llave:
+            return vista(*args, **kwargs)
+        if len(llave) > LARGO_MAXIMO_LLAVE:
+            return _error(f"{CABECERA} no puede superar {LARGO_MAXIMO_LLAVE} caracteres", 400)
+
+        huella = _huella()
+        reservada_en = None
+        guardada = respuesta_en_cache(llave)
+        if guardada is None:
+            reservada_en, guardada = reclamar_llave(llave, huella)
+        if guardada is not None:
+            if guardada.huella != huella:
+                return _error(f"{CABECERA} ya fue usada con otra petición", 422)
+            if guardada.en_curso:
+                return _error(f"Hay una petición en curso con la misma {CABECERA}", 409)
+            return _repetir(guardada)
+
+        try:
+            respuesta = make_response(vista(*args, **kwargs))
+        except Exception:
+            liberar_llave(llave, huella, reservada_en)
+            raise
+        if respuesta.status_code >= 500:
+            liberar_llave(llave, huella, reservada_en)
+        else:
+            guardar_respuesta(llave, huella, reservada_en, respuesta.status_code, respuesta.get_data(as_text=True))
+        return respuesta
+    return envoltura
@@ -0,0 +1,152 @@
+# src/campaign_management/infraestructura/commit_grupal.py
+# ------------------------------------------------------------
+# Commit agrupado (opcional, CAMPAIGN_GROUP_COMMIT) para el bus de comandos.
+# Los comandos elegibles que llegan dentro de una ventana corta (o hasta
+# completar un lote) se ejecutan en una sola transacción: cada uno dentro de
+# su SAVEPOINT, de modo que un comando que falla no arrastra a los demás, y
+# al final un único COMMIT. El primer hilo que encuentra la cola vacía hace de
+# líder con su propia sesión; los demás esperan su resultado. Cuando el COMMIT
+# falla, todos los comandos del lote reciben ese error.
+# ------------------------------------------------------------
+import logging
+import os
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from campaign_management.config.db import db
+
+logger = logging.getLogger(__name__)
+
+COMMIT_GRUPAL_HABILITADO = os.getenv('CAMPAIGN_GROUP_COMMIT', 'false').lower() in ('1', 'true', 'yes')
+VENTANA_MS = float(os.getenv('CAMPAIGN_GROUP_COMMIT_WINDOW_MS', '2'))
+MAX_COMANDOS = int(os.getenv('CAMPAIGN_GROUP_COMMIT_MAX_COMMANDS', '64'))
+
+_contexto = threading.local()
+
+
+def commit_diferido() -> bool:
+    """True mientras el hilo ejecuta un lote agrupado: el handler no debe hacer commit ni rollback"""
+    return getattr(_contexto, 'en_lote', False)
+
+
+class _Pendiente:
+    __slots__ = ('comando', 'siguiente', 'listo', 'resultado', 'error', 'liderar')
+
+    def __init__(self, comando, siguiente):
+        self.comando = comando
+        self.siguiente = siguiente
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error: Optional[BaseException] = None
+        self.liderar = False
+
+
+class CommitGrupal:
+    """Middleware del bus que agrupa comandos elegibles en una transacción con un commit"""
+
+    def __init__(self, tipos: Iterable[type], ventana_ms: float = VENTANA_MS, max_comandos: int = MAX_COMANDOS):
+        self.tipos = frozenset(tipos)
+        self.ventana = ventana_ms / 1000.0
+        self.max_comandos = max(1, max_comandos)
+        self._cola: List[_Pendiente] = []
+        self._hay_lider = False
+        self._condicion = threading.Condition(threading.Lock())
+        self.lotes = 0
+        self.comandos = 0
+
+    def estadisticas(self) -> dict:
+        return {
+            'lotes': self.lotes,
+            'comandos': self.comandos,
+            'promedio_por_lote': round(self.comandos / self.lotes, 2) if self.lotes else 0.0,
+        }
+
+    def __call__(self, comando, siguiente):
+        if type(comando) not in self.tipos or commit_diferido():
+            return siguiente(comando)
+
+        pendiente = _Pendiente(comando, siguiente)
+        with self._condicion:
+            self._cola.append(pendiente)
+            lider = not self._hay_lider
+            if lider:
+                self._hay_lider = True
+            elif len(self._cola) >= self.max_comandos:
+                self._condicion.notify()
+
+        if lider:
+            self._liderar(esperar=True)
+        while not pendiente.listo.is_set():
+            pendiente.listo.wait()
+            if pendiente.liderar:
+                # Promovido por el líder anterior: su comando va en el próximo lote
+                pendiente.liderar = False
+                pendiente.listo.clear()
+                self._liderar(esperar=False)
+
+        if pendiente.error is not None:
+            raise pendiente.error
+        return pendiente.resultado
+
+    def _liderar(self, esperar: bool) -> None:
+        with self._condicion:
+            if esperar and len(self._cola) < self.max_comandos:
+                limite = time.monotonic() + self.ventana
+                while len(self._cola) < self.max_comandos:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+            lote = self._cola[:self.max_comandos]
+            del self._cola[:self.max_comandos]
+
+        try:
+            self._ejecutar_lote(lote)
+        finally:
+            with self._condicion:
+                siguiente_lider = self._cola[0] if self._cola else None
+                if siguiente_lider is None:
+                    self._hay_lider = False
+            if siguiente_lider is not None:
+                # Lo que llegó durante el lote ya esperó su ventana: sale sin esperar otra
+                siguiente_lider.liderar = True
+                siguiente_lider.listo.set()
+            for pendiente in lote:
+                pendiente.listo.set()
+
+    def _ejecutar_lote(self, lote: List[_Pendiente]) -> None:
+        _contexto.en_lote = True
+        try:
+            for pendiente in lote:
+                try:
+                    with db.session.begin_nested():
+                        pendiente.resultado = pendiente.siguiente(pendiente.comando)
+                except Exception as e:
+                    pendiente.error = e
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Error confirmando un lote de %s comandos: %s", len(lote), e)
+            for pendiente in lote:
+                if pendiente.error is None:
+                    pendiente.error = e
+        finally:
+            _contexto.en_lote = False
+            self.lotes += 1
+            self.comandos += len(lote)
+
+
+commit_grupal: Optional[CommitGrupal] = None
+
+
+def iniciar_commit_grupal(bus, tipos: Iterable[type]) -> Optional[CommitGrupal]:
+    """Agrega el middleware al final de la cadena del bus, si está habilitado y no fue agregado antes"""
+    global commit_grupal
+    if not COMMIT_GRUPAL_HABILITADO:
+        return None
+    if commit_grupal is None:
+        commit_grupal = CommitGrupal(tipos)
+        bus.agregar_middleware(commit_grupal)
+        logger.info("Commit agrupado habilitado (ventana=%sms, max_comandos=%s)", VENTANA_MS, MAX_COMANDOS)
+    return commit_grupal
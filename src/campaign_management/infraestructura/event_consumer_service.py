@@ -1,6 +1,7 @@
 import logging
 import json
 import os
+import time
 from datetime import datetime
 from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import CancelarCampana
 from flask import current_app
@@ -11,11 +12,18 @@ import uuid
 from campaign_management.config.db import db
 from campaign_management.infraestructura.pulsar import PulsarEventConsumer, PulsarConfig
 from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import evento_campana, valores_instantanea
+from campaign_management.modulos.campaign_management.infraestructura.indice_rangos import indice_rangos
+from campaign_management.modulos.campaign_management.infraestructura.proyeccion_campanas import EVENTOS_CAMPANA
 from campaign_management.infraestructura.outbox.model import OutboxEvent
 from campaign_management.infraestructura.pulsar import pulsar_publisher
+from campaign_management.infraestructura.repositories_cache import invalidate_on_commit
 
 logger = logging.getLogger(__name__)
 
+# Segundos de campaign-events que se vuelven a leer al iniciar, para cubrir el atraso de la proyección
+REPETICION_INDICE_RANGOS = int(os.getenv('CAMPAIGN_RANGE_INDEX_REPLAY_SECONDS', '60'))
+
 # TOPIC_CAMPAIGN = "campaign-events"
 # SUBSCRIPTION  = "campaigns-read-projection"
 
@@ -34,6 +42,8 @@ class EventConsumerService:
         # Eventos de programas de lealtad
         self._start_consumer('loyalty-events', self._on_message_loyalty)
         self._start_consumer('campaign-events', self._on_message_campaign)
+        if indice_rangos.habilitado:
+            self._start_range_index_reader()
         
         logger.info("Servicio de consumo de eventos iniciado")
 
@@ -65,6 +75,33 @@ class EventConsumerService:
         except Exception as e:
             logger.error(f"Error iniciando consumidor para {event_type}: {e}")
 
+    def _start_range_index_reader(self):
+        """Mantiene al día el índice de vigencias de este proceso con todos los eventos de campaign-events
+
+        La suscripción compartida reparte los mensajes entre réplicas, así que
+        cada proceso lee el topic completo con su propio Reader.
+        """
+        try:
+            consumer = PulsarEventConsumer(service_name=self.service_name)
+            desde_ms = int((time.time() - REPETICION_INDICE_RANGOS) * 1000)
+            consumer.read_topic(self.config.get_topic_name('campaign-events'), self._on_campaign_snapshot, desde_ms)
+            self.consumers['campaign-events-range-index'] = consumer
+            logger.info("Índice de vigencias leyendo campaign-events")
+        except Exception as e:
+            logger.error(f"Error iniciando la lectura de campaign-events para el índice de vigencias: {e}")
+
+    def _on_campaign_snapshot(self, event_data: Dict[str, Any]):
+        """Aplica al índice de vigencias la instantánea de un evento de campaña"""
+        evento = event_data.get('event_data') if isinstance(event_data.get('event_data'), dict) else event_data
+        if evento.get('event_type') not in EVENTOS_CAMPANA:
+            return
+        valores = valores_instantanea(evento)
+        if valores is None:
+            return
+        indice_rangos.actualizar(
+            valores['id'], valores['last_version'], valores['fecha_creacion'], valores['fecha_inicio'], valores['fecha_fin']
+        )
+
     def _on_message_loyalty(self, event_data: Dict[str, Any]):
         try:
             # Ensure we have Flask application context
@@ -157,17 +194,20 @@ class EventConsumerService:
                 camp.tipo_campana = ""
             
             db.session.add(camp)
+            db.session.flush()
             
-            # Save to outbox table for event publishing
+            # Save to outbox table for event publishing: the saga event plus the stored row as snapshot
+            evento = evento_campana('EventCampaignCreated', camp, datetime.utcnow(), data)
             outbox_event = OutboxEvent(
                 saga_id = saga_id,
                 aggregate_id=aggregate_id,
                 aggregate_type='Campaign',
                 event_type='EventCampaignCreated',
-                payload=json.dumps(ev, default=str),
+                payload=json.dumps({**ev, **evento}, default=str),
                 status='PENDING'
             )
             db.session.add(outbox_event)
+            invalidate_on_commit(db.session, [camp.id])
 
     def _apply_campaign_reverse_created(self, ev: dict, saga_id: str):
         data = ev.get("data", {})
@@ -180,7 +220,7 @@ class EventConsumerService:
                 logger.info(f"Clase: EventConsumerService | Metodo: _apply_campaign_reverse_created | Linea: 183")
                 logger.info("Evento %s para saga_id inexistente %s", ev.get("event_type"), saga_id)
                 return
-            camp: CampanaDBModel | None = db.session.get(CampanaDBModel, outbox.aggregate_id)
+            camp: CampanaDBModel | None = db.session.get(CampanaDBModel, outbox.aggregate_id, with_for_update=True)
             if camp is None:
                 logger.info(f"Clase: EventConsumerService | Metodo: _apply_campaign_reverse_created | Linea: 178")
                 logger.info("Evento %s para campaña inexistente %s", ev.get("event_type"), outbox.aggregate_id)
@@ -188,6 +228,18 @@ class EventConsumerService:
 
             camp.estado = 'cancelada'
             camp.fecha_ultima_actividad = datetime.utcnow()
+            camp.fecha_actualizacion = camp.fecha_ultima_actividad
+            camp.version += 1
+            # La proyección se entera de la cancelación por el outbox, como en cualquier otra escritura
+            db.session.add(OutboxEvent(
+                saga_id=saga_id,
+                aggregate_id=camp.id,
+                aggregate_type='Campaign',
+                event_type='CampaignCancelled',
+                payload=json.dumps(evento_campana('CampaignCancelled', camp, camp.fecha_actualizacion)),
+                status='PENDING'
+            ))
+            invalidate_on_commit(db.session, [camp.id])
             
         # Publicar eventos después de cerrar la transacción
         evento = CancelarCampana(
@@ -208,13 +260,15 @@ class EventConsumerService:
 
         with db.session.begin():
             # Update campaigns table (write model)
-            camp: CampanaDBModel | None = db.session.get(CampanaDBModel, aggregate_id)
+            camp: CampanaDBModel | None = db.session.get(CampanaDBModel, aggregate_id, with_for_update=True)
             if not camp:
                 logger.warning("Evento %s para campaña inexistente %s", ev.get("event_type"), aggregate_id)
                 return
 
             camp.estado = new_status
             camp.fecha_ultima_actividad = datetime.utcnow()
+            camp.fecha_actualizacion = camp.fecha_ultima_actividad
+            camp.version += 1
             db.session.add(camp)
             
             # Save to outbox table for event publishing
@@ -222,10 +276,11 @@ class EventConsumerService:
                 aggregate_id=aggregate_id,
                 aggregate_type='Campaign',
                 event_type=ev.get("event_type"),
-                payload=json.dumps(ev, default=str),
+                payload=json.dumps(evento_campana(ev.get("event_type"), camp, camp.fecha_actualizacion)),
                 status='PENDING'
             )
             db.session.add(outbox_event)
+            invalidate_on_commit(db.session, [camp.id])
 
     @staticmethod
     def _parse_iso(s: str | None):
@@ -0,0 +1,203 @@
+"""Almacén de llaves de idempotencia
+
+En este archivo se define la tabla compacta ``idempotency_keys`` y el acceso a
+ella. Las respuestas ya completadas se guardan además en una cache LRU+TTL en
+memoria, de modo que un reintento con la misma llave no toca la base de datos.
+Cada reserva queda identificada por su huella y su ``created_at``: si otra
+petición la retoma por huérfana, la original ya no puede guardar ni liberar
+la fila. Un hilo de fondo borra las llaves vencidas cada
+``IDEMPOTENCY_PURGE_INTERVAL_SECONDS``.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Index, SmallInteger, String, Text, and_, delete, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+
+from campaign_management.config.db import db
+from campaign_management.seedwork.infraestructura.cache import CacheLRUTTL, registrar_cache
+
+logger = logging.getLogger(__name__)
+
+TTL_SEGUNDOS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+# Debe superar con holgura el timeout de las peticiones (gunicorn --timeout): retomar una reserva
+# cuya petición sigue en curso ejecutaría el comando dos veces
+BLOQUEO_SEGUNDOS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '300'))
+INTERVALO_PURGA_SEGUNDOS = float(os.getenv('IDEMPOTENCY_PURGE_INTERVAL_SECONDS', '3600'))
+MAX_ENTRADAS_CACHE = int(os.getenv('IDEMPOTENCY_CACHE_MAX_ENTRIES', '10000'))
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("idx_idempotency_keys_created_at", "created_at"),
+    )
+
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(SmallInteger, nullable=True)  # NULL mientras la petición original está en curso
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+@dataclass(frozen=True)
+class RespuestaGuardada:
+    huella: str
+    status_code: Optional[int]
+    cuerpo: Optional[str]
+
+    @property
+    def en_curso(self) -> bool:
+        return self.status_code is None
+
+
+cache_respuestas = registrar_cache('idempotencia', CacheLRUTTL(MAX_ENTRADAS_CACHE, TTL_SEGUNDOS))
+
+_tabla = IdempotencyKey.__table__
+
+
+def respuesta_en_cache(llave: str) -> Optional[RespuestaGuardada]:
+    return cache_respuestas.obtener(llave)
+
+
+def reclamar_llave(llave: str, huella: str) -> Tuple[Optional[datetime], Optional[RespuestaGuardada]]:
+    """Reserva la llave para esta petición
+
+    Devuelve ``(reservada_en, None)`` si la reserva quedó a nombre de quien
+    llama (``reservada_en`` identifica la reserva al guardar o liberar); si no,
+    ``(None, fila existente)`` en curso o completada.
+    """
+    ahora = datetime.utcnow()
+    valores = dict(key=llave, fingerprint=huella, status_code=None, body=None, created_at=ahora)
+    with db.engine.begin() as conn:
+        if conn.dialect.name == 'postgresql':
+            reclamada = conn.execute(
+                pg_insert(_tabla).values(**valores).on_conflict_do_nothing(index_elements=['key']).returning(_tabla.c.key)
+            ).first() is not None
+        else:
+            try:
+                conn.execute(insert(_tabla).values(**valores))
+                reclamada = True
+            except IntegrityError:
+                reclamada = False
+        if reclamada:
+            return ahora, None
+
+        # Una llave vencida, o una reserva que quedó huérfana (proceso caído a mitad), se puede volver a tomar
+        reclamada = conn.execute(
+            update(_tabla)
+            .where(
+                _tabla.c.key == llave,
+                or_(
+                    _tabla.c.created_at < ahora - timedelta(seconds=TTL_SEGUNDOS),
+                    and_(_tabla.c.status_code.is_(None), _tabla.c.created_at < ahora - timedelta(seconds=BLOQUEO_SEGUNDOS))
+                )
+            )
+            .values(**valores)
+            .returning(_tabla.c.key)
+        ).first() is not None
+        if reclamada:
+            logger.warning("Llave de idempotencia %s retomada tras vencer su reserva", llave)
+            return ahora, None
+
+        fila = conn.execute(
+            select(_tabla.c.fingerprint, _tabla.c.status_code, _tabla.c.body).where(_tabla.c.key == llave)
+        ).first()
+
+    if fila is None:
+        # Se borró entre el INSERT y el SELECT (la petición original falló); el cliente puede reintentar
+        return None, RespuestaGuardada(huella, None, None)
+    guardada = RespuestaGuardada(fila.fingerprint, fila.status_code, fila.body)
+    if not guardada.en_curso:
+        cache_respuestas.guardar(llave, guardada)
+    return None, guardada
+
+
+def _es_la_reserva(llave: str, huella: str, reservada_en: datetime):
+    return and_(
+        _tabla.c.key == llave,
+        _tabla.c.fingerprint == huella,
+        _tabla.c.created_at == reservada_en,
+        _tabla.c.status_code.is_(None)
+    )
+
+
+def guardar_respuesta(llave: str, huella: str, reservada_en: datetime, status_code: int, cuerpo: str) -> bool:
+    """Completa la reserva con la respuesta; False si otra petición la retomó entretanto"""
+    with db.engine.begin() as conn:
+        guardada = conn.execute(
+            update(_tabla).where(_es_la_reserva(llave, huella, reservada_en)).values(status_code=status_code, body=cuerpo)
+        ).rowcount > 0
+    if not guardada:
+        logger.warning("La reserva de la llave de idempotencia %s fue retomada; no se guarda la respuesta", llave)
+        return False
+    cache_respuestas.guardar(llave, RespuestaGuardada(huella, status_code, cuerpo))
+    return True
+
+
+def liberar_llave(llave: str, huella: str, reservada_en: datetime):
+    """Borra la reserva en curso de esta petición para que el cliente pueda reintentar"""
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(delete(_tabla).where(_es_la_reserva(llave, huella, reservada_en)))
+    except Exception as e:
+        logger.error("No se pudo liberar la llave de idempotencia %s: %s", llave, e)
+
+
+def purgar_vencidas() -> int:
+    """Borra las llaves creadas hace más de ``IDEMPOTENCY_TTL_SECONDS``; devuelve cuántas"""
+    limite = datetime.utcnow() - timedelta(seconds=TTL_SEGUNDOS)
+    with db.engine.begin() as conn:
+        return conn.execute(delete(_tabla).where(_tabla.c.created_at < limite)).rowcount
+
+
+class PurgaIdempotencia:
+    """Hilo que llama a ``purgar_vencidas`` cada intervalo"""
+
+    def __init__(self, app, intervalo: float = INTERVALO_PURGA_SEGUNDOS):
+        self.app = app
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name='purga-idempotencia', daemon=True)
+            self._hilo.start()
+            logger.info("Purga de llaves de idempotencia iniciada (intervalo=%ss)", self.intervalo)
+
+    def detener(self):
+        self._detener.set()
+
+    def _ejecutar(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                with self.app.app_context():
+                    borradas = purgar_vencidas()
+                if borradas:
+                    logger.info("Purgadas %s llaves de idempotencia vencidas", borradas)
+            except Exception as e:
+                logger.exception("Error purgando llaves de idempotencia: %s", e)
+
+
+purga_idempotencia: Optional[PurgaIdempotencia] = None
+
+
+def iniciar_purga_idempotencia(app) -> Optional[PurgaIdempotencia]:
+    """Inicia la purga periódica; ``IDEMPOTENCY_PURGE_INTERVAL_SECONDS=0`` la desactiva"""
+    global purga_idempotencia
+    if purga_idempotencia is None and INTERVALO_PURGA_SEGUNDOS > 0:
+        purga_idempotencia = PurgaIdempotencia(app)
+        purga_idempotencia.iniciar()
+    return purga_idempotencia
+
+
+def detener_purga_idempotencia():
+    if purga_idempotencia is not None:
+        purga_idempotencia.detener()
@@ -2,12 +2,17 @@
 # ------------------------------------------------------------
 # Publica eventos PENDING de outbox en Pulsar y los marca como PUBLISHED
 # Ahora crea la Flask app y usa app.app_context() para acceder a db/engine.
+# Cada lote se envía con send_async y se marca con dos UPDATE por conjunto.
 # ------------------------------------------------------------
 
+import os
 import json
 import time
 import logging
+import threading
+from collections import defaultdict
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from sqlalchemy import text
 
 from campaign_management.config.db import db
@@ -20,33 +25,106 @@ cfg = PulsarConfig()
 # Use proper topic names with tenant and namespace
 TOPIC_CAMPAIGN = "campaign-events"
 
-def _publish_one(conn, row):
-    rowData = row
-    logger.info(f"publishing to campaign topic content: {rowData}")
-    payload = json.loads(rowData["event_data"])
-    key = row["saga_id"]
-    
-    logger.info(f"Publishing to campaign topic: {TOPIC_CAMPAIGN} with key: {key}")
-    pulsar_publisher.publish_json(key, payload, TOPIC_CAMPAIGN, "success")
-    
-    conn.execute(
-        text("UPDATE outbox_events SET status='PUBLISHED', published_at=:ts WHERE id=:id"),
-        {"id": row["id"], "ts": datetime.utcnow()}
-    )
+# Máximo que se espera la confirmación del broker para una ola de envíos
+ACK_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_ACK_TIMEOUT_SECONDS", "30"))
+# Máximo que un lote mantiene tomadas sus filas, sumando las esperas de todas sus olas
+BATCH_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_BATCH_TIMEOUT_SECONDS", "30"))
+
+
+class _Confirmaciones:
+    """Recoge los callbacks de ``send_async`` de una ola de envíos"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._enviados = []
+        self.confirmados = []
+        self.fallidos = []
+
+    def callback(self, id_evento):
+        """Registra el envío de ``id_evento`` y devuelve su callback"""
+        self._enviados.append(id_evento)
+
+        def confirmado(ok: bool, error: Optional[str]):
+            with self._cond:
+                if ok:
+                    self.confirmados.append(id_evento)
+                else:
+                    logger.error("Pulsar rechazó outbox id=%s: %s", id_evento, error)
+                    self.fallidos.append(id_evento)
+                self._cond.notify_all()
+        return confirmado
+
+    def descartar(self, id_evento):
+        """El envío falló al encolar: no habrá callback"""
+        self._enviados.remove(id_evento)
+
+    def esperar(self, timeout: float):
+        """Espera los callbacks; devuelve (confirmados, fallidos, sin respuesta a tiempo)"""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.confirmados) + len(self.fallidos) >= len(self._enviados), timeout)
+            confirmados, fallidos = list(self.confirmados), list(self.fallidos)
+        respondidos = set(confirmados) | set(fallidos)
+        return confirmados, fallidos, [id_evento for id_evento in self._enviados if id_evento not in respondidos]
+
+
+def _olas(rows) -> List[List]:
+    """Reparte las filas en olas con a lo más un evento por agregado, en orden de ocurrencia
+
+    El n-ésimo evento de un agregado va en la ola n y cada ola se envía cuando
+    la anterior está confirmada, así dos eventos de un mismo agregado nunca
+    están en vuelo a la vez aunque su saga_id los lleve a particiones distintas.
+    """
+    olas: List[List] = []
+    posicion: Dict[Any, int] = defaultdict(int)
+    for r in rows:
+        ola = posicion[r["aggregate_id"]]
+        posicion[r["aggregate_id"]] += 1
+        if ola == len(olas):
+            olas.append([])
+        olas[ola].append(r)
+    return olas
+
+
+def _enviar_ola(filas, timeout: float):
+    """Envía una ola con ``send_async`` y espera sus confirmaciones hasta ``timeout`` segundos
+
+    Devuelve (confirmados, fallidos, sin respuesta a tiempo).
+    """
+    confirmaciones = _Confirmaciones()
+    fallidos = []
+    for r in filas:
+        callback = confirmaciones.callback(r["id"])
+        try:
+            payload = json.loads(r["event_data"])
+            pulsar_publisher.publish_json_async(r["saga_id"], payload, TOPIC_CAMPAIGN, "success", callback)
+        except Exception:
+            logger.exception("Error publicando outbox id=%s", r["id"])
+            confirmaciones.descartar(r["id"])
+            fallidos.append(r["id"])
+    try:
+        pulsar_publisher.flush()
+    except Exception:
+        logger.exception("Error haciendo flush de los producers de Pulsar")
+    confirmados, rechazados, sin_respuesta = confirmaciones.esperar(timeout)
+    if sin_respuesta:
+        logger.error("Sin confirmación de Pulsar tras %.1fs para %d eventos de outbox", timeout, len(sin_respuesta))
+    return confirmados, fallidos + rechazados, sin_respuesta
+
 
 def publish_pending_batch(batch_size: int = 200):
     # db.engine requiere app context
     with db.engine.begin() as conn:
         rows = conn.execute(
             text("""
-                SELECT 
+                SELECT
                     id,
                     saga_id,
-                    aggregate_type as service, 
-                    status, 
-                    aggregate_id as event_id, 
-                    event_type, 
-                    payload as event_data, 
+                    aggregate_id,
+                    aggregate_type as service,
+                    status,
+                    aggregate_id as event_id,
+                    event_type,
+                    payload as event_data,
                     occurred_at as timestamp
                 FROM outbox_events
                 WHERE status in ('PENDING', 'FAILED')
@@ -56,18 +134,44 @@ def publish_pending_batch(batch_size: int = 200):
             """),
             {"n": batch_size}
         ).mappings().all()
+        if not rows:
+            return
+
+        publicados, fallidos, sin_respuesta = [], [], []
+        bloqueados = set()
+        limite = time.monotonic() + BATCH_TIMEOUT_SECONDS
+        for ola in _olas(rows):
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                # Las olas que no alcanzan a salir quedan como estaban para el próximo lote
+                logger.warning("Lote de outbox sin tiempo tras %.0fs, se posponen las olas restantes", BATCH_TIMEOUT_SECONDS)
+                break
+            # Tras un fallo, los eventos siguientes del agregado quedan PENDING para el próximo lote
+            filas = [r for r in ola if r["aggregate_id"] not in bloqueados]
+            confirmados, con_error, sin_confirmar = _enviar_ola(filas, min(ACK_TIMEOUT_SECONDS, restante))
+            publicados.extend(confirmados)
+            fallidos.extend(con_error)
+            sin_respuesta.extend(sin_confirmar)
+            pendientes = set(con_error) | set(sin_confirmar)
+            bloqueados.update(r["aggregate_id"] for r in filas if r["id"] in pendientes)
 
-        for r in rows:
-            try:
-                _publish_one(conn, r)
-            except Exception:
-                logger.exception("Error publicando outbox id=%s", r["id"])
-                conn.execute(
-                    text("UPDATE outbox_events " \
-                         "SET status='FAILED', attempts=attempts+1 " \
-                         "WHERE id=:id"),
-                    {"id": r["id"]}
-                )
+        if publicados:
+            conn.execute(
+                text("UPDATE outbox_events SET status='PUBLISHED', published_at=:ts "
+                     "WHERE id = ANY(CAST(:ids AS uuid[]))"),
+                {"ids": [str(id_evento) for id_evento in publicados], "ts": datetime.utcnow()}
+            )
+        if fallidos:
+            conn.execute(
+                text("UPDATE outbox_events SET status='FAILED', attempts=attempts+1 "
+                     "WHERE id = ANY(CAST(:ids AS uuid[]))"),
+                {"ids": [str(id_evento) for id_evento in fallidos]}
+            )
+        # Los que no tuvieron respuesta se reintentan sin contar un intento: el broker pudo haberlos
+        # recibido, así que pueden llegar dos veces (los consumidores descartan por ``version``)
+        logger.info("Outbox: %d publicados, %d fallidos, %d sin confirmar, %d pospuestos",
+                    len(publicados), len(fallidos), len(sin_respuesta),
+                    len(rows) - len(publicados) - len(fallidos) - len(sin_respuesta))
 
 def run_forever(interval_seconds: float = 1.0):
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,246 @@
+# src/campaign_management/infraestructura/programador.py
+# ------------------------------------------------------------
+# Activa y finaliza campañas al llegar su fecha_inicio / fecha_fin.
+# Las transiciones pendientes viven en un min-heap: se cargan una vez al
+# arrancar y luego se actualizan con los eventos CampaignScheduled (y de
+# cancelación/finalización) del topic de campañas, sin volver a recorrer la
+# tabla. El hilo principal duerme hasta el próximo vencimiento y aplica las
+# vencidas por lotes con el mismo motor de transiciones que usan los comandos.
+# ------------------------------------------------------------
+import heapq
+import itertools
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.pulsar import PulsarConfig, PulsarEventConsumer
+from campaign_management.main import create_app
+from campaign_management.modulos.campaign_management.aplicacion.handlers.transiciones_campana import TRANSICIONES, aplicar_transicion
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+
+logger = logging.getLogger(__name__)
+
+TOPIC_CAMPAIGN = "campaign-events"
+SUBSCRIPTION = "campaign-scheduler"
+
+TAMANO_LOTE = int(os.getenv('SCHEDULER_BATCH_SIZE', '500'))
+# Tope de espera entre vencimientos, para registrar actividad y tolerar relojes que saltan
+ESPERA_MAXIMA_SEGUNDOS = float(os.getenv('SCHEDULER_MAX_SLEEP_SECONDS', '60'))
+REINTENTO_SEGUNDOS = float(os.getenv('SCHEDULER_RETRY_SECONDS', '30'))
+
+# Qué transición dispara cada fecha
+_FECHA_POR_ACCION = {"activar": "fecha_inicio", "finalizar": "fecha_fin"}
+
+
+def _utc_sin_zona(valor) -> Optional[datetime]:
+    """Las columnas son TIMESTAMP sin zona en UTC; normaliza fechas con zona o en texto ISO"""
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, str):
+        try:
+            valor = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if valor.tzinfo is not None:
+        valor = valor.astimezone(timezone.utc).replace(tzinfo=None)
+    return valor
+
+
+class AgendaTransiciones:
+    """Min-heap de (vencimiento, acción, campaña) con invalidación perezosa
+
+    Reprogramar o cancelar no busca en el heap: se actualiza ``_vigentes`` y las
+    entradas que ya no coinciden se descartan al salir del tope.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int, uuid.UUID, str]] = []
+        self._vigentes: Dict[Tuple[uuid.UUID, str], datetime] = {}
+        self._secuencia = itertools.count()
+        self._condicion = threading.Condition(threading.Lock())
+
+    def __len__(self) -> int:
+        return len(self._vigentes)
+
+    def programar(self, id_campana, accion: str, vence_en: Optional[datetime]) -> None:
+        id_campana = uuid.UUID(str(id_campana))
+        with self._condicion:
+            if vence_en is None:
+                self._vigentes.pop((id_campana, accion), None)
+                return
+            if self._vigentes.get((id_campana, accion)) == vence_en:
+                return
+            self._vigentes[(id_campana, accion)] = vence_en
+            heapq.heappush(self._heap, (vence_en, next(self._secuencia), id_campana, accion))
+            if self._heap[0][2] == id_campana and self._heap[0][3] == accion:
+                # Nuevo primer vencimiento: despertar al hilo que duerme hasta el anterior
+                self._condicion.notify()
+
+    def cancelar(self, id_campana, accion: Optional[str] = None) -> None:
+        id_campana = uuid.UUID(str(id_campana))
+        with self._condicion:
+            for nombre in ([accion] if accion else _FECHA_POR_ACCION):
+                self._vigentes.pop((id_campana, nombre), None)
+
+    def _descartar_invalidas(self) -> None:
+        while self._heap:
+            vence_en, _, id_campana, accion = self._heap[0]
+            if self._vigentes.get((id_campana, accion)) == vence_en:
+                return
+            heapq.heappop(self._heap)
+
+    def esperar_vencidas(self, espera_maxima: float, detener: threading.Event) -> Dict[str, List[uuid.UUID]]:
+        """Duerme hasta el próximo vencimiento (o ``espera_maxima``) y extrae las vencidas agrupadas por acción"""
+        with self._condicion:
+            self._descartar_invalidas()
+            ahora = datetime.utcnow()
+            if not self._heap or self._heap[0][0] > ahora:
+                espera = espera_maxima
+                if self._heap:
+                    espera = min(espera, (self._heap[0][0] - ahora).total_seconds())
+                if not detener.is_set():
+                    self._condicion.wait(timeout=max(espera, 0))
+                self._descartar_invalidas()
+                ahora = datetime.utcnow()
+
+            vencidas: Dict[str, List[uuid.UUID]] = {}
+            extraidas = 0
+            while self._heap and self._heap[0][0] <= ahora and extraidas < TAMANO_LOTE:
+                vence_en, _, id_campana, accion = heapq.heappop(self._heap)
+                if self._vigentes.get((id_campana, accion)) != vence_en:
+                    continue
+                del self._vigentes[(id_campana, accion)]
+                vencidas.setdefault(accion, []).append(id_campana)
+                extraidas += 1
+            return vencidas
+
+    def despertar(self) -> None:
+        with self._condicion:
+            self._condicion.notify_all()
+
+
+class ProgramadorCampanas:
+    """Carga la agenda, la mantiene con eventos y aplica las transiciones vencidas"""
+
+    def __init__(self, app, agenda: Optional[AgendaTransiciones] = None):
+        self.app = app
+        self.agenda = agenda or AgendaTransiciones()
+        self.config = PulsarConfig()
+        self.consumer = PulsarEventConsumer()
+        self._detener = threading.Event()
+
+    def cargar(self) -> None:
+        """Única lectura completa: campañas programadas y en curso con fechas pendientes"""
+        with self.app.app_context():
+            filas = db.session.execute(
+                select(CampanaDBModel.id, CampanaDBModel.estado, CampanaDBModel.fecha_inicio, CampanaDBModel.fecha_fin)
+                .where(CampanaDBModel.estado.in_(("programada", "activa", "pausada")))
+                .execution_options(yield_per=1000)
+            )
+            for fila in filas:
+                if fila.estado == "programada":
+                    self.agenda.programar(fila.id, "activar", _utc_sin_zona(fila.fecha_inicio))
+                self.agenda.programar(fila.id, "finalizar", _utc_sin_zona(fila.fecha_fin))
+            db.session.rollback()
+        logger.info("Programador cargado con %s transiciones pendientes", len(self.agenda))
+
+    def _on_message(self, payload: dict) -> None:
+        # El dispatcher de outbox envuelve el evento original en event_data
+        evento = payload.get("event_data") if isinstance(payload.get("event_data"), dict) else payload
+        tipo = evento.get("event_type")
+        datos = evento.get("data") or {}
+        id_campana = datos.get("id") or evento.get("aggregate_id")
+        if not id_campana:
+            return
+        if tipo == "CampaignScheduled":
+            self.agenda.programar(id_campana, "activar", _utc_sin_zona(datos.get("fecha_inicio")))
+            self.agenda.programar(id_campana, "finalizar", _utc_sin_zona(datos.get("fecha_fin")))
+        elif tipo == "CampaignActivated":
+            self.agenda.cancelar(id_campana, "activar")
+        elif tipo in ("CampaignFinished", "CampaignCancelled"):
+            self.agenda.cancelar(id_campana)
+
+    def aplicar(self, accion: str, ids: List[uuid.UUID]) -> int:
+        """Aplica una transición vencida a un lote, en una transacción"""
+        campo_fecha = getattr(CampanaDBModel, _FECHA_POR_ACCION[accion])
+        ahora = datetime.utcnow()
+        with self.app.app_context():
+            try:
+                # La fecha se vuelve a comprobar en la base: una reprogramación aún no recibida no se adelanta
+                filas = aplicar_transicion(
+                    accion,
+                    and_(CampanaDBModel.id.in_(ids), campo_fecha.isnot(None), campo_fecha <= ahora),
+                    datos={"motivo": "programador"} if accion == "finalizar" else None
+                )
+                db.session.commit()
+                self._reprogramar_adelantadas(accion, ids, {fila[0] for fila in filas}, ahora)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Error aplicando '%s' a %s campañas; se reintenta en %ss", accion, len(ids), REINTENTO_SEGUNDOS)
+                reintento = datetime.utcnow() + timedelta(seconds=REINTENTO_SEGUNDOS)
+                for id_campana in ids:
+                    self.agenda.programar(id_campana, accion, reintento)
+                return 0
+        logger.info("Programador: '%s' aplicada a %s de %s campañas vencidas", accion, len(filas), len(ids))
+        return len(filas)
+
+    def _reprogramar_adelantadas(self, accion: str, ids: List[uuid.UUID], aplicadas: set, ahora: datetime) -> None:
+        """Vuelve a agendar las campañas cuya fecha en la base es posterior a la del heap (evento viejo o fuera de orden)"""
+        pendientes = [id_campana for id_campana in ids if id_campana not in aplicadas]
+        if not pendientes:
+            return
+        campo_fecha = getattr(CampanaDBModel, _FECHA_POR_ACCION[accion])
+        filas = db.session.execute(
+            select(CampanaDBModel.id, campo_fecha.label("vence_en")).where(
+                CampanaDBModel.id.in_(pendientes),
+                CampanaDBModel.estado.in_(TRANSICIONES[accion].origenes),
+                campo_fecha > ahora
+            )
+        ).all()
+        db.session.rollback()
+        for fila in filas:
+            self.agenda.programar(fila.id, accion, _utc_sin_zona(fila.vence_en))
+
+    def ejecutar(self) -> None:
+        self.cargar()
+        try:
+            self.consumer.subscribe_to_topic(self.config.get_topic_name(TOPIC_CAMPAIGN), SUBSCRIPTION, self._on_message)
+        except Exception as e:
+            # Sin broker se sigue con la agenda cargada; los cambios llegarán al reiniciar
+            logger.error("Programador sin suscripción a eventos de campañas: %s", e)
+        # Primero activar y luego finalizar, para que una campaña vencida de ambos pase por activa
+        orden = list(_FECHA_POR_ACCION)
+        while not self._detener.is_set():
+            vencidas = self.agenda.esperar_vencidas(ESPERA_MAXIMA_SEGUNDOS, self._detener)
+            for accion in orden:
+                if vencidas.get(accion):
+                    self.aplicar(accion, vencidas[accion])
+
+    def detener(self) -> None:
+        self._detener.set()
+        self.agenda.despertar()
+        try:
+            self.consumer.close()
+        except Exception as e:
+            logger.error("Error cerrando el consumidor del programador: %s", e)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+    programador = ProgramadorCampanas(app)
+    logger.info("Programador de campañas iniciado (lote=%s, espera máxima=%ss)", TAMANO_LOTE, ESPERA_MAXIMA_SEGUNDOS)
+    try:
+        programador.ejecutar()
+    finally:
+        programador.detener()
+
+
+if __name__ == "__main__":
+    main()
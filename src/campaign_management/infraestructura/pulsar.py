@@ -5,13 +5,16 @@ En este archivo se define la configuración y utilidades para Pulsar
 """
 
 import os
-import json
+import re
 import uuid
 import logging
+import dataclasses
 import pulsar
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional
 from pulsar import Client, Producer, Consumer
 from campaign_management.seedwork.dominio.eventos import EventoDominio
+from campaign_management.seedwork.infraestructura.codecs import codec_configurado, decodificar_mensaje, propiedades_mensaje
+from campaign_management.seedwork.infraestructura.serializacion import codificar, valor_json
 
 # Try to import ConsumerType, fallback to string if not available
 try:
@@ -26,6 +29,73 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Perfiles de producer predefinidos; ``default`` conserva la configuración por defecto del cliente
+PERFILES_PRODUCTOR: Dict[str, Dict[str, Any]] = {
+    'default': {},
+    # Lotes cortos con LZ4: más mensajes por round trip con poco costo de CPU
+    'throughput': {'batching': True, 'batch_delay_ms': 5, 'compression': 'lz4',
+                   'block_if_queue_full': True, 'max_pending': 5000},
+    # Lotes más largos con ZSTD: menos bytes en el broker a cambio de latencia y CPU
+    'compact': {'batching': True, 'batch_delay_ms': 20, 'batch_max_bytes': 512 * 1024, 'compression': 'zstd',
+                'block_if_queue_full': True, 'max_pending': 5000},
+}
+
+_COMPRESIONES = {'none': 'NONE', 'lz4': 'LZ4', 'zlib': 'ZLib', 'zstd': 'ZSTD', 'snappy': 'SNAPPY'}
+_TIPOS_LOTE = {'default': 'Default', 'key_based': 'KeyBased'}
+
+
+def _bool_entorno(valor: str) -> bool:
+    return valor.lower() in ('1', 'true', 'yes')
+
+
+@dataclasses.dataclass(frozen=True)
+class PerfilProductor:
+    """Opciones de batching, compresión y cola de envío de un producer"""
+    batching: bool = False
+    batch_delay_ms: int = 10
+    batch_max_messages: int = 1000
+    batch_max_bytes: int = 128 * 1024
+    batching_type: str = 'default'
+    compression: str = 'none'
+    block_if_queue_full: bool = False
+    max_pending: int = 1000
+
+    def __post_init__(self):
+        if self.compression not in _COMPRESIONES:
+            raise ValueError(f"Compresión desconocida '{self.compression}'. Opciones: {', '.join(_COMPRESIONES)}")
+        if self.batching_type not in _TIPOS_LOTE:
+            raise ValueError(f"Tipo de lote desconocido '{self.batching_type}'. Opciones: {', '.join(_TIPOS_LOTE)}")
+
+    def opciones_producer(self) -> Dict[str, Any]:
+        """Argumentos de ``Client.create_producer``"""
+        opciones = {
+            'batching_enabled': self.batching,
+            'batching_max_publish_delay_ms': self.batch_delay_ms,
+            'batching_max_messages': self.batch_max_messages,
+            'batching_max_allowed_size_in_bytes': self.batch_max_bytes,
+            'compression_type': getattr(pulsar.CompressionType, _COMPRESIONES[self.compression]),
+            'block_if_queue_full': self.block_if_queue_full,
+            'max_pending_messages': self.max_pending,
+        }
+        if self.batching_type != 'default':
+            # Con partition_key y suscripciones Key_Shared, cada lote lleva una sola clave
+            opciones['batching_type'] = getattr(pulsar.BatchingType, _TIPOS_LOTE[self.batching_type])
+        return opciones
+
+
+# Campo del perfil -> (sufijo de la variable de entorno, conversión)
+_OPCIONES_ENTORNO = {
+    'batching': ('BATCHING', _bool_entorno),
+    'batch_delay_ms': ('BATCH_DELAY_MS', int),
+    'batch_max_messages': ('BATCH_MAX_MESSAGES', int),
+    'batch_max_bytes': ('BATCH_MAX_BYTES', int),
+    'batching_type': ('BATCHING_TYPE', str.lower),
+    'compression': ('COMPRESSION', str.lower),
+    'block_if_queue_full': ('BLOCK_IF_QUEUE_FULL', _bool_entorno),
+    'max_pending': ('MAX_PENDING_MESSAGES', int),
+}
+
+
 class PulsarConfig:
     def __init__(self):
         self.service_url = os.getenv('PULSAR_SERVICE_URL', 'pulsar://localhost:6650')
@@ -40,11 +110,34 @@ class PulsarConfig:
 
         return f"persistent://{self.tenant}/{self.namespace}/{event_type}"
 
+    def perfil_productor(self, topic_name: str) -> PerfilProductor:
+        """Perfil del producer de un topic
+
+        Se parte del perfil ``PULSAR_PRODUCER_PROFILE`` (o ``PULSAR_PRODUCER_<TOPIC>_PROFILE``)
+        y se aplican las variables ``PULSAR_PRODUCER_<OPCION>`` y luego las del topic,
+        ``PULSAR_PRODUCER_<TOPIC>_<OPCION>``, con TOPIC el nombre corto en mayúsculas
+        (``campaign-events`` -> ``CAMPAIGN_EVENTS``).
+        """
+        prefijo_topic = 'PULSAR_PRODUCER_' + re.sub(r'[^A-Z0-9]', '_', topic_name.rsplit('/', 1)[-1].upper()) + '_'
+        nombre = os.getenv(prefijo_topic + 'PROFILE') or os.getenv('PULSAR_PRODUCER_PROFILE', 'default')
+        if nombre not in PERFILES_PRODUCTOR:
+            raise ValueError(f"Perfil de producer desconocido '{nombre}'. Opciones: {', '.join(PERFILES_PRODUCTOR)}")
+        valores = dict(PERFILES_PRODUCTOR[nombre])
+        for prefijo in ('PULSAR_PRODUCER_', prefijo_topic):
+            for campo, (sufijo, convertir) in _OPCIONES_ENTORNO.items():
+                valor = os.getenv(prefijo + sufijo)
+                if valor is not None:
+                    valores[campo] = convertir(valor)
+        return PerfilProductor(**valores)
+
 class PulsarEventPublisher:
     def __init__(self):
         self.config = PulsarConfig()
         self.client = None
         self.producers: Dict[str, Producer] = {}
+        # JSON o binario compacto (PULSAR_MESSAGE_CODEC); el consumidor acepta ambos
+        self.codec = codec_configurado()
+        self.propiedades = propiedades_mensaje(self.codec)
         
     def _get_client(self) -> Client:
         """Obtiene o crea el cliente de Pulsar"""
@@ -56,7 +149,9 @@ class PulsarEventPublisher:
         """Obtiene o crea un producer para el topic especificado"""
         if topic_name not in self.producers:
             client = self._get_client()
-            self.producers[topic_name] = client.create_producer(topic_name)
+            perfil = self.config.perfil_productor(topic_name)
+            logger.info("Producer para %s con %s", topic_name, perfil)
+            self.producers[topic_name] = client.create_producer(topic_name, **perfil.opciones_producer())
         return self.producers[topic_name]
     
     def publish_event(self, evento: EventoDominio, saga_id: uuid, topic: str, event_type: str, status: str):
@@ -67,18 +162,18 @@ class PulsarEventPublisher:
             
             # Serializar el evento
             event_dict = {
-                'saga_id': saga_id,
+                'saga_id': valor_json(saga_id),
                 'service': 'Campaign',
                 'status': status, 
                 #'event_id': evento.id,
                 'event_type': event_type,
-                'event_data': evento.__dict__,
+                'event_data': codificar(evento),
                 #'timestamp': evento.fecha_evento.isoformat() if hasattr(evento, 'fecha_evento') else None
             }
-            event_data=json.dumps(event_dict, default=str)
+            event_data = self.codec.codificar(event_dict)
             
             # Publicar el evento
-            producer.send(event_data.encode('utf-8'))
+            producer.send(event_data, properties=self.propiedades)
             logger.info(f"Evento publicado en {topic_name}: {evento.__class__.__name__}")
             
         except Exception as e:
@@ -86,45 +181,75 @@ class PulsarEventPublisher:
             raise
                 
     
+    def _sobre_json(self, saga_id: uuid, event_data: dict, status: str) -> bytes:
+        """Sobre con el que se publica un payload JSON, codificado con el codec configurado"""
+        if event_data is None:
+            event_data = {}
+        return self.codec.codificar({
+            'saga_id': valor_json(saga_id),
+            'service': 'Campaign',
+            'status': status, 
+            'event_id': event_data.get('event_id'),
+            'event_type': "EventCampaignCreated",
+            'event_data': event_data,
+            'timestamp': event_data.get('timestamp')
+        })
+
     def publish_json(self, saga_id: uuid, event_data: dict, event_type: str, status: str):
         """Publica un payload JSON en Pulsar"""
         try:
             topic_name = self.config.get_topic_name(event_type)
             producer = self._get_producer(topic_name)
             
-            # Serializar el payload a JSON
-            if event_data is None:
-                event_data = {}
-
-            event_dict = {
-                'saga_id': saga_id,
-                'service': 'Campaign',
-                'status': status, 
-                'event_id': event_data.get('event_id'),
-                'event_type': "EventCampaignCreated",
-                'event_data': event_data,
-                'timestamp': event_data.get('timestamp')
-            }
-
-            json_data = json.dumps(event_dict, default=str)
-            
             # Crear el mensaje con key si se proporciona
-            message = json_data.encode('utf-8')
+            message = self._sobre_json(saga_id, event_data, status)
 
             logger.info(f"Evento a publicar desde campañas {message}")
             
             if saga_id:
                 # Convertir key a string si es necesario (para UUIDs, etc.)
                 partition_key = str(saga_id) if saga_id is not None else None
-                producer.send(message, partition_key=partition_key)
+                producer.send(message, properties=self.propiedades, partition_key=partition_key)
                 logger.info(f"JSON publicado en {topic_name} con key {partition_key}")
             else:
-                producer.send(message)
+                producer.send(message, properties=self.propiedades)
                 logger.info(f"JSON publicado en {topic_name}")
             
         except Exception as e:
             logger.error(f"Error publicando JSON en Pulsar: {e}")
             raise
+
+    def publish_json_async(self, saga_id: uuid, event_data: dict, event_type: str, status: str,
+                           callback: Callable[[bool, Optional[str]], None]):
+        """Encola un payload JSON sin esperar la confirmación del broker
+
+        ``callback(ok, error)`` se invoca desde el hilo del cliente de Pulsar
+        cuando el broker confirma o rechaza el mensaje. Los errores al encolar
+        (p. ej. cola llena) se lanzan aquí mismo y no llaman al callback.
+        """
+        topic_name = self.config.get_topic_name(event_type)
+        producer = self._get_producer(topic_name)
+        message = self._sobre_json(saga_id, event_data, status)
+
+        def confirmado(resultado, _message_id):
+            if resultado == pulsar.Result.Ok:
+                callback(True, None)
+            else:
+                callback(False, str(resultado))
+
+        if saga_id:
+            producer.send_async(message, confirmado, properties=self.propiedades, partition_key=str(saga_id))
+        else:
+            producer.send_async(message, confirmado, properties=self.propiedades)
+
+    def verificar_conexion(self, topic: str) -> None:
+        """Consulta los metadatos del topic con el cliente compartido; lanza una excepción si el broker no responde"""
+        self._get_client().get_topic_partitions(self.config.get_topic_name(topic))
+
+    def flush(self):
+        """Envía de inmediato los lotes pendientes de todos los producers"""
+        for producer in self.producers.values():
+            producer.flush()
     
     def close(self):
         """Cierra todas las conexiones del publisher"""
@@ -149,6 +274,7 @@ class PulsarEventConsumer:
         self.config = PulsarConfig()
         self.client = None
         self.consumers = {}
+        self.readers = {}
         self.service_name = service_name or os.getenv('SERVICE_NAME', 'campaign-management')
         
     def _get_client(self) -> Client:
@@ -157,6 +283,41 @@ class PulsarEventConsumer:
             self.client = Client(self.config.service_url)
         return self.client
     
+    def read_topic(self, topic_name: str, callback, start_timestamp_ms: Optional[int] = None):
+        """Lee un topic con un Reader sin suscripción: cada proceso recibe todos los mensajes
+
+        Empieza por los mensajes publicados desde ``start_timestamp_ms`` (epoch en ms) o,
+        sin él, por los que lleguen a partir de ahora. No hay ack: un mensaje que
+        falla se registra y se sigue con el siguiente.
+        """
+        client = self._get_client()
+        reader = client.create_reader(topic_name, pulsar.MessageId.latest)
+        if start_timestamp_ms is not None:
+            reader.seek(start_timestamp_ms)
+        self.readers[topic_name] = reader
+
+        import threading
+        thread = threading.Thread(target=self._read_messages, args=(reader, callback))
+        thread.daemon = True
+        thread.start()
+        logger.info(f"Reading topic {topic_name} without subscription")
+
+    def _read_messages(self, reader, callback):
+        while True:
+            try:
+                msg = reader.read_next(timeout_millis=1000)
+            except pulsar.Timeout:
+                continue
+            except pulsar.AlreadyClosed:
+                return
+            except Exception as e:
+                logger.error(f"Error leyendo mensaje: {e}")
+                continue
+            try:
+                callback(decodificar_mensaje(msg.data(), msg.properties()))
+            except Exception as e:
+                logger.error(f"Error procesando mensaje leído: {e}")
+    
     def subscribe_to_topic(self, topic_name: str, subscription_name: str, callback):
         """Se suscribe a un topic específico con mejor manejo de errores"""
         try:
@@ -202,7 +363,8 @@ class PulsarEventConsumer:
                 try:
                     msg = consumer.receive(timeout_millis=1000)
                     # Deserializar el mensaje
-                    event_data = json.loads(msg.data().decode('utf-8'))
+                    # JSON o binario, según content-type o los bytes mágicos del mensaje
+                    event_data = decodificar_mensaje(msg.data(), msg.properties())
                     logger.debug(f"Received message: {event_data.get('event_type', 'unknown')}")
                     callback(event_data)
                     consumer.acknowledge(msg)
@@ -235,18 +397,19 @@ class PulsarEventConsumer:
             
             # Serializar el evento
             event_dict = {
-                'saga_id': uuid.uuid4(),
+                'saga_id': str(uuid.uuid4()),
                 'service': 'Loyalty',
                 'status': status, 
-                'event_id': evento.id,
+                'event_id': valor_json(evento.id),
                 'event_type': event_type,
-                'event_data': evento.__dict__,
+                'event_data': codificar(evento),
                 'timestamp': evento.fecha_evento.isoformat() if hasattr(evento, 'fecha_evento') else None
             }
-            event_data=json.dumps(event_dict, default=str)
+            codec = codec_configurado()
+            event_data = codec.codificar(event_dict)
             
             # Publicar el evento
-            producer.send(event_data.encode('utf-8'))
+            producer.send(event_data, properties=propiedades_mensaje(codec))
             logger.info(f"Evento publicado en {topic_name}: {evento.__class__.__name__}")
             
         except Exception as e:
@@ -257,6 +420,8 @@ class PulsarEventConsumer:
         """Cierra todas las conexiones"""
         for consumer in self.consumers.values():
             consumer.close()
+        for reader in self.readers.values():
+            reader.close()
         if self.client:
             self.client.close()
 
@@ -5,6 +5,8 @@ from typing import Any, Dict, List, Optional
 import uuid
 from datetime import datetime
 
+from sqlalchemy import func, select
+
 from campaign_management.seedwork.infraestructura.repositories import (
     CampaignRepository, 
     OutboxRepository, 
@@ -12,6 +14,9 @@ from campaign_management.seedwork.infraestructura.repositories import (
 )
 from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
 from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel
+from campaign_management.modulos.campaign_management.infraestructura.resumen_marca import aplicar_delta_resumen, instantanea
+from campaign_management.modulos.campaign_management.infraestructura.indice_rangos import indice_rangos
+from campaign_management.modulos.campaign_management.infraestructura.proyeccion_campanas import aplicar_instantanea
 from campaign_management.infraestructura.outbox.model import OutboxEvent
 
 logger = logging.getLogger(__name__)
@@ -48,7 +53,8 @@ class SQLAlchemyCampaignRepository(CampaignRepository):
     def update(self, campaign_id: uuid.UUID, updates: Dict[str, Any]) -> None:
         """Update campaign"""
         try:
-            campaign = self.session.get(CampanaDBModel, campaign_id)
+            # Row lock so concurrent writers cannot hand out the same version
+            campaign = self.session.get(CampanaDBModel, campaign_id, with_for_update=True)
             if not campaign:
                 raise ValueError(f"Campaign {campaign_id} not found")
             
@@ -57,6 +63,7 @@ class SQLAlchemyCampaignRepository(CampaignRepository):
                     setattr(campaign, key, value)
             
             campaign.fecha_actualizacion = datetime.utcnow()
+            campaign.version = (campaign.version or 0) + 1
             self.session.add(campaign)
             self.session.commit()  # Commit to database
             logger.info(f"Campaign {campaign_id} updated successfully")
@@ -112,7 +119,8 @@ class SQLAlchemyCampaignRepository(CampaignRepository):
             "terminos_condiciones": campaign.terminos_condiciones,
             "fecha_creacion": campaign.fecha_creacion,
             "fecha_ultima_actividad": campaign.fecha_ultima_actividad,
-            "fecha_actualizacion": campaign.fecha_actualizacion
+            "fecha_actualizacion": campaign.fecha_actualizacion,
+            "version": campaign.version
         }
     
     def _dict_to_model(self, data: Dict[str, Any]) -> CampanaDBModel:
@@ -254,6 +262,8 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
         try:
             campaign = self._dict_to_model(campaign_data)
             self.session.add(campaign)
+            aplicar_delta_resumen(self.session, None, instantanea(campaign))
+            indice_rangos.registrar(self.session, campaign)
             self.session.commit()  # Commit to database
             logger.info(f"Campaign read model {campaign.id} saved successfully")
         except Exception as e:
@@ -268,11 +278,14 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
             if not campaign:
                 raise ValueError(f"Campaign read model {campaign_id} not found")
             
+            before = instantanea(campaign)
             for key, value in updates.items():
                 if hasattr(campaign, key):
                     setattr(campaign, key, value)
             
             self.session.add(campaign)
+            aplicar_delta_resumen(self.session, before, instantanea(campaign))
+            indice_rangos.registrar(self.session, campaign)
             self.session.commit()  # Commit to database
             logger.info(f"Campaign read model {campaign_id} updated successfully")
         except Exception as e:
@@ -280,11 +293,24 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
             self.session.rollback()
             raise
     
+    def apply_snapshot(self, snapshot: Dict[str, Any]) -> bool:
+        """Apply a campaign snapshot (see ``valores_instantanea``) unless the read model already has that version"""
+        try:
+            applied = aplicar_instantanea(self.session, snapshot)
+            self.session.commit()
+            return applied
+        except Exception as e:
+            logger.error(f"Error applying snapshot to campaign read model {snapshot.get('id')}: {e}")
+            self.session.rollback()
+            raise
+    
     def delete(self, campaign_id: uuid.UUID) -> None:
         """Delete campaign read model"""
         try:
             campaign = self.session.get(CampanaReadDBModel, campaign_id)
             if campaign:
+                aplicar_delta_resumen(self.session, instantanea(campaign), None)
+                indice_rangos.eliminar(self.session, campaign.id)
                 self.session.delete(campaign)
                 self.session.commit()  # Commit to database
                 logger.info(f"Campaign read model {campaign_id} deleted successfully")
@@ -326,6 +352,16 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
             logger.error(f"Error getting campaigns by estado {estado}: {e}")
             raise
     
+    def get_last_update(self) -> Optional[datetime]:
+        """Get the newest write-model update already projected, used to measure read model lag"""
+        try:
+            return self.session.execute(
+                select(func.max(CampanaReadDBModel.fecha_actualizacion))
+            ).scalar()
+        except Exception as e:
+            logger.error(f"Error getting read model last update: {e}")
+            raise
+    
     def _model_to_dict(self, campaign: CampanaReadDBModel) -> Dict[str, Any]:
         """Convert model to dictionary"""
         return {
@@ -342,6 +378,13 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
             "ventas_actuales": campaign.ventas_actuales,
             "meta_engagement": campaign.meta_engagement,
             "engagement_actual": campaign.engagement_actual,
+            "descripcion": campaign.descripcion,
+            "objetivo": campaign.objetivo,
+            "target_audiencia": campaign.target_audiencia,
+            "canales_distribucion": campaign.canales_distribucion,
+            "terminos_condiciones": campaign.terminos_condiciones,
+            "fecha_creacion": campaign.fecha_creacion,
+            "fecha_actualizacion": campaign.fecha_actualizacion,
             "last_version": campaign.last_version,
             "fecha_ultima_actividad": campaign.fecha_ultima_actividad
         }
@@ -362,6 +405,13 @@ class SQLAlchemyCampaignReadRepository(CampaignReadRepository):
             ventas_actuales=data.get("ventas_actuales", 0),
             meta_engagement=data.get("meta_engagement", 0),
             engagement_actual=data.get("engagement_actual", 0),
+            descripcion=data.get("descripcion"),
+            objetivo=data.get("objetivo"),
+            target_audiencia=data.get("target_audiencia"),
+            canales_distribucion=data.get("canales_distribucion"),
+            terminos_condiciones=data.get("terminos_condiciones"),
+            fecha_creacion=data.get("fecha_creacion"),
+            fecha_actualizacion=data.get("fecha_actualizacion"),
             last_version=data.get("last_version", 0),
             fecha_ultima_actividad=data.get("fecha_ultima_actividad")
         )
@@ -0,0 +1,122 @@
+"""Caching decorator for the campaign repository port
+
+``get_by_id`` is served from a bounded LRU+TTL cache. Entries are evicted
+when this process writes the campaign (after the write commits, see
+``invalidate_on_commit``) and when a consumed event carries a newer version
+of the row than the cached one.
+"""
+
+import logging
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from campaign_management.seedwork.infraestructura.cache import CacheLRUTTL, registrar_cache
+from campaign_management.seedwork.infraestructura.repositories import CampaignRepository
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = int(os.getenv('CAMPAIGN_REPO_CACHE_MAX_ENTRIES', '10000'))
+TTL_SECONDS = float(os.getenv('CAMPAIGN_REPO_CACHE_TTL_SECONDS', '60'))
+NEGATIVE_TTL_SECONDS = float(os.getenv('CAMPAIGN_REPO_CACHE_NEGATIVE_TTL_SECONDS', '5'))
+
+# Marker stored for ids known not to exist (negative caching)
+_MISSING = object()
+
+_PENDING = 'campaign_cache_pending'
+
+campaign_cache = registrar_cache('repositorio_campanas', CacheLRUTTL(MAX_ENTRIES, TTL_SECONDS))
+
+
+def _key(campaign_id) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(campaign_id)))
+    except (TypeError, ValueError):
+        return None
+
+
+def invalidate_campaign(campaign_id, version: Optional[int] = None) -> bool:
+    """Drop a cached campaign; with ``version``, only if the cached row is older (or cached as missing)"""
+    key = _key(campaign_id)
+    if key is None:
+        return False
+    if version is None:
+        return campaign_cache.invalidar_si(key, lambda cached: True)
+    return campaign_cache.invalidar_si(
+        key, lambda cached: cached is _MISSING or (cached.get("version") or 0) < version
+    )
+
+
+def invalidate_on_commit(session, campaign_ids: Iterable) -> None:
+    """Schedule the eviction of campaigns written in ``session`` for when it commits"""
+    keys = [key for key in map(_key, campaign_ids) if key is not None]
+    if keys:
+        session.info.setdefault(_PENDING, set()).update(keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_pending(session):
+    for key in session.info.pop(_PENDING, ()):
+        campaign_cache.invalidar(key)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    # A rolled back SAVEPOINT keeps the ids of the rest of the transaction (e.g. a group commit)
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING, None)
+
+
+class CachedCampaignRepository(CampaignRepository):
+    """CampaignRepository decorator with an LRU+TTL cache on get_by_id"""
+
+    def __init__(self, inner: CampaignRepository, cache: CacheLRUTTL = campaign_cache):
+        self.inner = inner
+        self.cache = cache
+
+    def get_by_id(self, campaign_id) -> Optional[Dict[str, Any]]:
+        key = _key(campaign_id)
+        if key is None:
+            return self.inner.get_by_id(campaign_id)
+        cached = self.cache.obtener(key)
+        if cached is _MISSING:
+            return None
+        if cached is not None:
+            return dict(cached)
+
+        campaign = self.inner.get_by_id(campaign_id)
+        if campaign is None:
+            self.cache.guardar(key, _MISSING, NEGATIVE_TTL_SECONDS)
+            return None
+        self.cache.guardar(key, dict(campaign))
+        return campaign
+
+    def save(self, campaign_data: Dict[str, Any]) -> None:
+        try:
+            self.inner.save(campaign_data)
+        finally:
+            self._invalidate(campaign_data.get("id"))
+
+    def update(self, campaign_id, updates: Dict[str, Any]) -> None:
+        try:
+            self.inner.update(campaign_id, updates)
+        finally:
+            self._invalidate(campaign_id)
+
+    def delete(self, campaign_id) -> None:
+        try:
+            self.inner.delete(campaign_id)
+        finally:
+            self._invalidate(campaign_id)
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        return self.inner.get_all()
+
+    def _invalidate(self, campaign_id) -> None:
+        key = _key(campaign_id)
+        if key is not None:
+            self.cache.invalidar(key)
+
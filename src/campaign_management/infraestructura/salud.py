@@ -0,0 +1,149 @@
+"""Verificación de dependencias en segundo plano
+
+En este archivo se define el verificador que alimenta ``/health/ready``: un
+hilo revisa la base de datos (y la base de lectura si es otra) y el broker de
+Pulsar cada ``HEALTH_CHECK_INTERVAL_SECONDS`` y deja el resultado en memoria,
+de modo que las sondas solo leen ese resultado. Para Pulsar se reutiliza el
+cliente del publisher compartido en lugar de abrir una conexión por sonda.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import text
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.pulsar import pulsar_publisher
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_SEGUNDOS = float(os.getenv('HEALTH_CHECK_INTERVAL_SECONDS', '5'))
+# Pasado este tiempo sin una verificación nueva, el resultado se considera vencido y la sonda falla
+VENCIMIENTO_SEGUNDOS = float(os.getenv('HEALTH_CHECK_STALE_SECONDS', str(INTERVALO_SEGUNDOS * 3)))
+TOPIC_VERIFICACION = os.getenv('HEALTH_CHECK_PULSAR_TOPIC', 'campaign-events')
+# Sin el verificador (p. ej. en pruebas) /health/ready responde 503 por dependencias sin verificar
+VERIFICADOR_HABILITADO = os.getenv('HEALTH_CHECK_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+
+class _Resultado:
+    __slots__ = ('ok', 'latencia_ms', 'error', 'verificado_en', 'instante')
+
+    def __init__(self, ok: bool, latencia_ms: float, error: Optional[str]):
+        self.ok = ok
+        self.latencia_ms = latencia_ms
+        self.error = error
+        self.verificado_en = datetime.utcnow()
+        self.instante = time.monotonic()
+
+    def a_dict(self, ahora: float) -> dict:
+        return {
+            'ok': self.ok,
+            'latencia_ms': round(self.latencia_ms, 2),
+            'error': self.error,
+            'verificado_en': self.verificado_en.isoformat(),
+            'antiguedad_segundos': round(ahora - self.instante, 3),
+        }
+
+
+class VerificadorSalud:
+    """Refresca el estado de las dependencias por intervalo y lo sirve desde memoria"""
+
+    def __init__(self, app, intervalo: float = INTERVALO_SEGUNDOS, vencimiento: float = VENCIMIENTO_SEGUNDOS):
+        self.app = app
+        self.intervalo = intervalo
+        self.vencimiento = vencimiento
+        self._verificaciones: Dict[str, Callable[[], None]] = {
+            'db': self._verificar_db,
+            'pulsar': self._verificar_pulsar,
+        }
+        if app.config.get('SQLALCHEMY_BINDS', {}).get('read') not in (None, app.config.get('SQLALCHEMY_DATABASE_URI')):
+            self._verificaciones['db_lectura'] = self._verificar_db_lectura
+        self._resultados: Dict[str, _Resultado] = {}
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name='verificador-salud', daemon=True)
+            self._hilo.start()
+            logger.info("Verificador de salud iniciado (intervalo=%ss, vencimiento=%ss)", self.intervalo, self.vencimiento)
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self.intervalo)
+
+    def estado(self) -> dict:
+        """Último resultado por dependencia; ``listo`` es falso si alguna falla, falta o está vencida"""
+        ahora = time.monotonic()
+        resultados = dict(self._resultados)
+        dependencias = {}
+        listo = True
+        for nombre in self._verificaciones:
+            resultado = resultados.get(nombre)
+            if resultado is None:
+                dependencias[nombre] = {'ok': False, 'error': 'sin verificar'}
+                listo = False
+                continue
+            vencido = ahora - resultado.instante > self.vencimiento
+            dependencias[nombre] = dict(resultado.a_dict(ahora), vencido=vencido)
+            if not resultado.ok or vencido:
+                listo = False
+        return {'listo': listo, 'dependencias': dependencias}
+
+    def verificar(self):
+        """Corre todas las verificaciones una vez y reemplaza los resultados"""
+        for nombre, verificacion in self._verificaciones.items():
+            inicio = time.perf_counter()
+            try:
+                verificacion()
+                error = None
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            resultado = _Resultado(error is None, (time.perf_counter() - inicio) * 1000, error)
+            anterior = self._resultados.get(nombre)
+            if anterior is not None and anterior.ok != resultado.ok:
+                logger.warning("Dependencia %s pasó a %s: %s", nombre, 'ok' if resultado.ok else 'caída', error)
+            self._resultados[nombre] = resultado
+
+    def _ejecutar(self):
+        while not self._detener.is_set():
+            try:
+                self.verificar()
+            except Exception as e:
+                logger.exception("Error en el verificador de salud: %s", e)
+            self._detener.wait(self.intervalo)
+
+    def _verificar_db(self):
+        with self.app.app_context():
+            with db.engines[None].connect() as conexion:
+                conexion.execute(text("SELECT 1"))
+
+    def _verificar_db_lectura(self):
+        with self.app.app_context():
+            with db.engines['read'].connect() as conexion:
+                conexion.execute(text("SELECT 1"))
+
+    def _verificar_pulsar(self):
+        # Una consulta de metadatos del topic es un round trip al broker sobre la conexión ya abierta
+        pulsar_publisher.verificar_conexion(TOPIC_VERIFICACION)
+
+
+verificador_salud: Optional[VerificadorSalud] = None
+
+
+def iniciar_verificador_salud(app) -> VerificadorSalud:
+    global verificador_salud
+    if verificador_salud is None:
+        verificador_salud = VerificadorSalud(app)
+        verificador_salud.iniciar()
+    return verificador_salud
+
+
+def detener_verificador_salud():
+    if verificador_salud is not None:
+        verificador_salud.detener()
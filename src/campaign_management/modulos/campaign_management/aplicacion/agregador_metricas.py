@@ -0,0 +1,180 @@
+"""Agregador write-behind de métricas de campaña
+
+En este archivo se define el agregador opcional de métricas. Cuando está
+activo, los incrementos de ``actualizar-metricas`` se acumulan en memoria por
+campaña y se vacían periódicamente como un único UPDATE sumado y un único
+evento ``CampaignMetricsUpdated`` por campaña.
+
+Semántica: el 202 indica que el incremento fue aceptado en memoria, no que sea
+durable. Un incremento puede perderse si el proceso muere sin pasar por
+``detener()``. Al vaciar, los rechazos del dominio (campaña inexistente o no
+activa) descartan los incrementos de esa campaña y solo quedan en el log; los
+demás errores (conexión perdida, deadlock, base caída) los devuelven al buffer
+para la próxima ventana. Al detener se reintenta ``INTENTOS_AL_DETENER`` veces
+antes de darlos por perdidos.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+AGREGACION_HABILITADA = os.getenv('CAMPAIGN_METRICS_AGGREGATION', 'false').lower() in ('1', 'true', 'yes')
+VENTANA_MS = int(os.getenv('CAMPAIGN_METRICS_FLUSH_MS', '200'))
+MAX_DELTAS = int(os.getenv('CAMPAIGN_METRICS_MAX_DELTAS', '1000'))
+INTENTOS_AL_DETENER = 3
+
+
+class _Acumulado:
+    __slots__ = ('ventas', 'engagement', 'presupuesto_utilizado', 'deltas')
+
+    def __init__(self):
+        self.ventas = 0
+        self.engagement = 0
+        self.presupuesto_utilizado = 0.0
+        self.deltas = 0
+
+
+class AgregadorMetricas:
+    """Acumula incrementos por campaña y los vacía por ventana de tiempo o por cantidad"""
+
+    def __init__(self, app, ventana_ms: int = VENTANA_MS, max_deltas: int = MAX_DELTAS):
+        self.app = app
+        self.ventana = ventana_ms / 1000.0
+        self.max_deltas = max_deltas
+        self._pendientes: Dict[uuid.UUID, _Acumulado] = {}
+        self._total_deltas = 0
+        self._inicio_ventana: Optional[float] = None
+        self._condicion = threading.Condition(threading.Lock())
+        self._detenido = False
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._ejecutar, name='agregador-metricas', daemon=True)
+            self._hilo.start()
+            logger.info("Agregador de métricas iniciado (ventana=%sms, max_deltas=%s)",
+                        int(self.ventana * 1000), self.max_deltas)
+
+    def registrar(self, id_campana, ventas: int = 0, engagement: int = 0, presupuesto_utilizado: float = 0.0) -> bool:
+        """Acumula un incremento; devuelve False si el agregador ya fue detenido"""
+        id_campana = uuid.UUID(str(id_campana))
+        with self._condicion:
+            if self._detenido:
+                return False
+            acumulado = self._pendientes.get(id_campana)
+            if acumulado is None:
+                acumulado = self._pendientes[id_campana] = _Acumulado()
+            acumulado.ventas += ventas
+            acumulado.engagement += engagement
+            acumulado.presupuesto_utilizado += presupuesto_utilizado
+            acumulado.deltas += 1
+            self._total_deltas += 1
+            if self._inicio_ventana is None:
+                self._inicio_ventana = time.monotonic()
+                self._condicion.notify()
+            elif self._total_deltas >= self.max_deltas:
+                self._condicion.notify()
+        return True
+
+    def detener(self):
+        """Detiene el hilo y vacía lo pendiente; se llama al cerrar la aplicación"""
+        with self._condicion:
+            if self._detenido:
+                return
+            self._detenido = True
+            self._condicion.notify()
+        if self._hilo is not None:
+            self._hilo.join()
+        for intento in range(INTENTOS_AL_DETENER):
+            if intento:
+                time.sleep(intento)
+            self._vaciar(self._tomar_pendientes())
+            if not self._pendientes:
+                break
+        for id_campana, acumulado in self._tomar_pendientes().items():
+            logger.error("Se pierden %s incrementos de métricas de la campaña %s al detener el agregador",
+                         acumulado.deltas, id_campana)
+        logger.info("Agregador de métricas detenido")
+
+    def _reencolar(self, id_campana: uuid.UUID, fallido: _Acumulado):
+        """Devuelve al buffer los incrementos de un vaciado fallido, sumados a los que llegaron entre tanto
+
+        No cuentan para ``max_deltas``: con la base caída se reintenta una vez por ventana.
+        """
+        with self._condicion:
+            acumulado = self._pendientes.get(id_campana)
+            if acumulado is None:
+                acumulado = self._pendientes[id_campana] = _Acumulado()
+            acumulado.ventas += fallido.ventas
+            acumulado.engagement += fallido.engagement
+            acumulado.presupuesto_utilizado += fallido.presupuesto_utilizado
+            acumulado.deltas += fallido.deltas
+            if self._inicio_ventana is None:
+                self._inicio_ventana = time.monotonic()
+                self._condicion.notify()
+
+    def _tomar_pendientes(self) -> Dict[uuid.UUID, _Acumulado]:
+        with self._condicion:
+            pendientes, self._pendientes = self._pendientes, {}
+            self._total_deltas = 0
+            self._inicio_ventana = None
+            return pendientes
+
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                while not self._detenido:
+                    if self._inicio_ventana is None:
+                        self._condicion.wait()
+                        continue
+                    restante = self._inicio_ventana + self.ventana - time.monotonic()
+                    if restante <= 0 or self._total_deltas >= self.max_deltas:
+                        break
+                    self._condicion.wait(restante)
+                if self._detenido:
+                    return
+            self._vaciar(self._tomar_pendientes())
+
+    def _vaciar(self, pendientes: Dict[uuid.UUID, _Acumulado]):
+        if not pendientes:
+            return
+        from campaign_management.modulos.campaign_management.aplicacion.handlers.actualizar_metricas_campana_handler import incrementar_metricas_campana
+
+        with self.app.app_context():
+            for id_campana, acumulado in pendientes.items():
+                try:
+                    incrementar_metricas_campana(
+                        id_campana,
+                        ventas=acumulado.ventas,
+                        engagement=acumulado.engagement,
+                        presupuesto_utilizado=acumulado.presupuesto_utilizado
+                    )
+                except ValueError as e:
+                    # Rechazo del dominio: reintentar daría el mismo resultado
+                    logger.error("Se descartan %s incrementos de métricas de la campaña %s: %s",
+                                 acumulado.deltas, id_campana, e)
+                except Exception as e:
+                    logger.warning("Se reintentarán %s incrementos de métricas de la campaña %s: %s",
+                                   acumulado.deltas, id_campana, e)
+                    self._reencolar(id_campana, acumulado)
+
+
+agregador_metricas: Optional[AgregadorMetricas] = None
+
+
+def iniciar_agregador_metricas(app) -> Optional[AgregadorMetricas]:
+    global agregador_metricas
+    if AGREGACION_HABILITADA and agregador_metricas is None:
+        agregador_metricas = AgregadorMetricas(app)
+        agregador_metricas.iniciar()
+    return agregador_metricas
+
+
+def detener_agregador_metricas():
+    if agregador_metricas is not None:
+        agregador_metricas.detener()
@@ -4,11 +4,11 @@ En este archivo se definen los comandos para la gestión de campañas
 
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from campaign_management.seedwork.aplicacion.comandos import Comando
 from campaign_management.modulos.campaign_management.dominio.entidades import TipoCampana, EstadoCampana, ObjetivoCampana
 from datetime import datetime
-from typing import Optional
+from typing import ClassVar, List, Optional
 import uuid
 
 @dataclass
@@ -65,8 +65,22 @@ class CancelarCampana(Comando):
 
 @dataclass
 class ActualizarMetricasCampana(Comando):
+    # Dos incrementos iguales son dos incrementos: no se deduplican
+    DEDUPLICABLE: ClassVar[bool] = False
+
     id_campana: str
     ventas: int = 0
     engagement: int = 0
     presupuesto_utilizado: float = 0.0
     fecha_actualizacion: Optional[str] = None
+
+@dataclass
+class CrearCampanasLote(Comando):
+    campanas: List[CrearCampana] = field(default_factory=list)
+
+@dataclass
+class TransicionarCampanasMarca(Comando):
+    id_marca: str
+    accion: str
+    motivo: str = ""
+    estados: Optional[List[str]] = None
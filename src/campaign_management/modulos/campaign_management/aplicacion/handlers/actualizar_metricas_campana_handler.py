@@ -5,51 +5,57 @@ En este archivo se define el handler para actualizar métricas de campañas
 
 import json
 import logging
+import uuid
 from datetime import datetime
 
+from sqlalchemy import select, update
+
+from campaign_management.modulos.campaign_management.aplicacion import agregador_metricas
 from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import ActualizarMetricasCampana
 from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import columnas_retorno, evento_campana
 from campaign_management.config.db import db
+from campaign_management.infraestructura.commit_grupal import commit_diferido
 from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.infraestructura.repositories_cache import invalidate_on_commit
 
 logger = logging.getLogger(__name__)
 
-def manejar_actualizar_metricas_campana(cmd: ActualizarMetricasCampana):
+def incrementar_metricas_campana(id_campana, ventas: int = 0, engagement: int = 0, presupuesto_utilizado: float = 0.0) -> str:
+    """Suma los deltas en un único UPDATE condicional y deja el evento en outbox
+
+    El incremento lo resuelve la base de datos (``x = x + :dx``), por lo que las
+    actualizaciones concurrentes sobre la misma campaña no se pisan entre sí.
+    """
     try:
-        # Buscar la campaña
-        campana = CampanaDBModel.query.filter_by(id=cmd.id_campana).first()
-        if not campana:
-            raise ValueError(f"Campaña con id {cmd.id_campana} no encontrada")
-        
-        # Verificar que esté en estado activa
-        if campana.estado != "activa":
-            raise ValueError(f"La campaña debe estar en estado 'activa' para actualizar métricas. Estado actual: {campana.estado}")
-        
-        # Actualizar las métricas
-        campana.ventas_actuales += cmd.ventas
-        campana.engagement_actual += cmd.engagement
-        campana.presupuesto_utilizado += cmd.presupuesto_utilizado
-        campana.fecha_actualizacion = datetime.utcnow()
-        
-        db.session.flush()
+        id_campana = uuid.UUID(str(id_campana))
+        ahora = datetime.utcnow()
+
+        campana = db.session.execute(
+            update(CampanaDBModel)
+            .where(CampanaDBModel.id == id_campana, CampanaDBModel.estado == "activa")
+            .values(
+                ventas_actuales=CampanaDBModel.ventas_actuales + ventas,
+                engagement_actual=CampanaDBModel.engagement_actual + engagement,
+                presupuesto_utilizado=CampanaDBModel.presupuesto_utilizado + presupuesto_utilizado,
+                fecha_actualizacion=ahora,
+                version=CampanaDBModel.version + 1
+            )
+            .returning(*columnas_retorno(CampanaDBModel.__table__))
+            .execution_options(synchronize_session=False)
+        ).first()
 
-        # Crear evento
-        evento = {
-            "event_type": "CampaignMetricsUpdated",
-            "aggregate_id": str(campana.id),
-            "version": 1,
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": {
-                "id": str(campana.id),
-                "id_marca": str(campana.id_marca),
-                "nombre": campana.nombre,
-                "ventas_actuales": campana.ventas_actuales,
-                "engagement_actual": campana.engagement_actual,
-                "presupuesto_utilizado": campana.presupuesto_utilizado,
-                "fecha_actualizacion": datetime.utcnow().isoformat()
-            },
-            "metadata": {}
-        }
+        if campana is None:
+            # Solo en el camino de error se consulta el estado para explicar el rechazo
+            estado = db.session.execute(
+                select(CampanaDBModel.estado).where(CampanaDBModel.id == id_campana)
+            ).scalar_one_or_none()
+            if estado is None:
+                raise ValueError(f"Campaña con id {id_campana} no encontrada")
+            raise ValueError(f"La campaña debe estar en estado 'activa' para actualizar métricas. Estado actual: {estado}")
+
+        # Crear evento con la fila ya sumada
+        evento = evento_campana("CampaignMetricsUpdated", campana, ahora)
 
         out = OutboxEvent(
             aggregate_id=campana.id,
@@ -58,11 +64,34 @@ def manejar_actualizar_metricas_campana(cmd: ActualizarMetricasCampana):
             payload=json.dumps(evento)
         )
         db.session.add(out)
-        db.session.commit()
+        invalidate_on_commit(db.session, [campana.id])
+        if commit_diferido():
+            db.session.flush()
+        else:
+            db.session.commit()
         logger.info("Métricas de campaña actualizadas %s y evento almacenado en outbox %s", campana.id, out.id)
         return str(campana.id)
 
     except Exception as e:
-        db.session.rollback()
+        if not commit_diferido():
+            db.session.rollback()
         logger.exception("Error actualizando métricas de campaña: %s", e)
         raise
+
+def manejar_actualizar_metricas_campana(cmd: ActualizarMetricasCampana):
+    agregador = agregador_metricas.agregador_metricas
+    # Modo write-behind: el incremento se acepta en memoria y se aplica al vaciar la ventana
+    if agregador is not None and agregador.registrar(
+        cmd.id_campana,
+        ventas=cmd.ventas,
+        engagement=cmd.engagement,
+        presupuesto_utilizado=cmd.presupuesto_utilizado
+    ):
+        return str(cmd.id_campana)
+
+    return incrementar_metricas_campana(
+        cmd.id_campana,
+        ventas=cmd.ventas,
+        engagement=cmd.engagement,
+        presupuesto_utilizado=cmd.presupuesto_utilizado
+    )
@@ -8,6 +8,7 @@ from typing import Dict, Any
 
 from campaign_management.seedwork.aplicacion.event_handlers import EventHandler
 from campaign_management.seedwork.infraestructura.repositories import CampaignRepository, OutboxRepository
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import evento_campana
 
 logger = logging.getLogger(__name__)
 
@@ -65,14 +66,15 @@ class CampaignCreatedEventHandler(EventHandler):
             
             # Save to write model
             self.campaign_repository.save(campaign_data)
+            campaign = self.campaign_repository.get_by_id(aggregate_id)
             
-            # Save to outbox for event publishing
+            # Save to outbox for event publishing, with the stored row as snapshot
             outbox_event = {
                 "saga_id": data.get("saga_id"),
                 "aggregate_id": aggregate_id,
                 "aggregate_type": "Campaign",
                 "event_type": "EventCampaignCreated",
-                "payload": json.dumps(event_data, default=str),
+                "payload": json.dumps(evento_campana("EventCampaignCreated", campaign, datetime.utcnow(), data)),
                 "status": "PENDING"
             }
             self.outbox_repository.save(outbox_event)
@@ -126,13 +128,14 @@ class CampaignStatusChangedEventHandler(EventHandler):
                 "fecha_ultima_actividad": datetime.utcnow()
             }
             self.campaign_repository.update(aggregate_id, updates)
+            campaign = self.campaign_repository.get_by_id(aggregate_id)
             
-            # Save to outbox for event publishing
+            # Save to outbox for event publishing, with the updated row as snapshot
             outbox_event = {
                 "aggregate_id": aggregate_id,
                 "aggregate_type": "Campaign",
                 "event_type": event_data.get("event_type"),
-                "payload": json.dumps(event_data, default=str),
+                "payload": json.dumps(evento_campana(event_data.get("event_type"), campaign, datetime.utcnow())),
                 "status": "PENDING"
             }
             self.outbox_repository.save(outbox_event)
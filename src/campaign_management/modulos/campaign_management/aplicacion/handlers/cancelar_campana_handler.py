@@ -3,62 +3,8 @@
 En este archivo se define el handler para cancelar campañas
 """
 
-import json
-import logging
-from datetime import datetime
-
 from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import CancelarCampana
-from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
-from campaign_management.config.db import db
-from campaign_management.infraestructura.outbox.model import OutboxEvent
-
-logger = logging.getLogger(__name__)
+from campaign_management.modulos.campaign_management.aplicacion.handlers.transiciones_campana import transicionar_campana
 
 def manejar_cancelar_campana(cmd: CancelarCampana):
-    try:
-        # Buscar la campaña
-        campana = CampanaDBModel.query.filter_by(id=cmd.id_campana).first()
-        if not campana:
-            raise ValueError(f"Campaña con id {cmd.id_campana} no encontrada")
-        
-        # Verificar que no esté ya finalizada o cancelada
-        if campana.estado in ["finalizada", "cancelada"]:
-            raise ValueError(f"La campaña ya está en estado '{campana.estado}' y no puede ser cancelada")
-        
-        # Actualizar la campaña
-        campana.estado = "cancelada"
-        campana.fecha_actualizacion = datetime.utcnow()
-        
-        db.session.flush()
-
-        # Crear evento
-        evento = {
-            "event_type": "CampaignCancelled",
-            "aggregate_id": str(campana.id),
-            "version": 1,
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": {
-                "id": str(campana.id),
-                "id_marca": str(campana.id_marca),
-                "nombre": campana.nombre,
-                "motivo": cmd.motivo,
-                "fecha_cancelacion": datetime.utcnow().isoformat()
-            },
-            "metadata": {}
-        }
-
-        out = OutboxEvent(
-            aggregate_id=campana.id,
-            aggregate_type="Campaign",
-            event_type="CampaignCancelled",
-            payload=json.dumps(evento)
-        )
-        db.session.add(out)
-        db.session.commit()
-        logger.info("Campaña cancelada %s y evento almacenado en outbox %s", campana.id, out.id)
-        return str(campana.id)
-
-    except Exception as e:
-        db.session.rollback()
-        logger.exception("Error cancelando campaña: %s", e)
-        raise
+    return transicionar_campana("cancelar", cmd.id_campana, datos={"motivo": cmd.motivo})
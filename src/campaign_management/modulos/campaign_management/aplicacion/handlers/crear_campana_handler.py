@@ -1,24 +1,29 @@
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import CrearCampana
 from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import evento_campana
 from campaign_management.config.db import db
 from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.infraestructura.repositories_cache import invalidate_on_commit
 
 logger = logging.getLogger(__name__)
 
 def _parse_iso(dt: str):
+    """Fecha ISO-8601 como UTC sin zona (las columnas son TIMESTAMP sin zona), o None si no es válida"""
     if not dt:
         return None
     try:
         if dt.endswith('Z'):
             dt = dt.replace('Z', '+00:00')
-        from datetime import datetime
-        return datetime.fromisoformat(dt)
+        fecha = datetime.fromisoformat(dt)
     except Exception:
         return None
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
 
 def manejar_crear_campana(cmd: CrearCampana):
     try:
@@ -28,7 +33,6 @@ def manejar_crear_campana(cmd: CrearCampana):
 
         camp = CampanaDBModel(
             id_marca          = cmd.id_marca,
-            saga_id           = cmd.saga_id,
             nombre            = cmd.nombre,
             descripcion       = cmd.descripcion,
             tipo_campana      = cmd.tipo_campana,
@@ -48,21 +52,8 @@ def manejar_crear_campana(cmd: CrearCampana):
         db.session.add(camp)
         db.session.flush()
 
-        evento = {
-            "event_type": "CampaignCreated",
-            "aggregate_id": str(camp.id),
-            "version": 1,
-            "timestamp": datetime.utcnow().isoformat(),
-            "data": {
-                "id": str(camp.id),
-                "id_marca": str(camp.id_marca),
-                "nombre": camp.nombre,
-                "tipo_campana": camp.tipo_campana,
-                "fecha_inicio": camp.fecha_inicio.isoformat() if camp.fecha_inicio else None,
-                "fecha_fin": camp.fecha_fin.isoformat() if camp.fecha_fin else None
-            },
-            "metadata": {}
-        }
+        # Tras el flush la fila ya tiene id, fechas y versión por defecto
+        evento = evento_campana("CampaignCreated", camp, datetime.utcnow())
 
         out = OutboxEvent(
             saga_id=cmd.saga_id,
@@ -72,6 +63,7 @@ def manejar_crear_campana(cmd: CrearCampana):
             payload=json.dumps(evento)
         )
         db.session.add(out)
+        invalidate_on_commit(db.session, [camp.id])
         db.session.commit()
         logger.info("Campaña creada %s y evento almacenado en outbox %s", camp.id, out.id)
         return str(camp.id)
@@ -0,0 +1,148 @@
+"""Handler para crear campañas en lote
+
+En este archivo se define el handler para crear muchas campañas en una sola
+transacción: se validan todos los items, y los válidos se insertan junto con
+sus eventos de outbox usando INSERTs multi-fila.
+"""
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import CrearCampana, CrearCampanasLote
+from campaign_management.modulos.campaign_management.aplicacion.handlers.crear_campana_handler import _parse_iso
+from campaign_management.modulos.campaign_management.dominio.entidades import TipoCampana, ObjetivoCampana
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import evento_campana
+from campaign_management.config.db import db
+from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.infraestructura.repositories_cache import invalidate_on_commit
+from campaign_management.seedwork.dominio.excepciones import ExcepcionDominio
+
+logger = logging.getLogger(__name__)
+
+MAX_CAMPANAS_POR_LOTE = int(os.getenv('CAMPAIGN_BATCH_MAX_ITEMS', '1000'))
+
+_TIPOS_VALIDOS = {t.value for t in TipoCampana}
+_OBJETIVOS_VALIDOS = {o.value for o in ObjetivoCampana}
+
+
+def _como_uuid(valor):
+    try:
+        return uuid.UUID(str(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def _validar_campana(cmd: CrearCampana) -> list:
+    """Devuelve la lista de errores de validación de un item del lote"""
+    errores = []
+    if _como_uuid(cmd.id_marca) is None:
+        errores.append("id_marca debe ser UUID válido")
+    if not cmd.nombre:
+        errores.append("nombre es obligatorio")
+    if cmd.tipo_campana not in _TIPOS_VALIDOS:
+        errores.append(f"tipo_campana inválido: {cmd.tipo_campana}")
+    if cmd.objetivo and cmd.objetivo not in _OBJETIVOS_VALIDOS:
+        errores.append(f"objetivo inválido: {cmd.objetivo}")
+
+    fi = _parse_iso(cmd.fecha_inicio)
+    ff = _parse_iso(cmd.fecha_fin)
+    if cmd.fecha_inicio and fi is None:
+        errores.append("fecha_inicio debe ser ISO-8601")
+    if cmd.fecha_fin and ff is None:
+        errores.append("fecha_fin debe ser ISO-8601")
+    if fi and ff and ff < fi:
+        errores.append("fecha_fin debe ser posterior a fecha_inicio")
+
+    for campo in ("presupuesto_total", "meta_ventas", "meta_engagement"):
+        valor = getattr(cmd, campo)
+        if valor is None:
+            continue
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool) or valor < 0:
+            errores.append(f"{campo} debe ser un número no negativo")
+    return errores
+
+
+def manejar_crear_campanas_lote(cmd: CrearCampanasLote) -> dict:
+    if len(cmd.campanas) > MAX_CAMPANAS_POR_LOTE:
+        raise ExcepcionDominio(f"El lote excede el máximo de {MAX_CAMPANAS_POR_LOTE} campañas")
+
+    resultados = []
+    campanas = []
+    eventos = []
+    ahora = datetime.utcnow()
+
+    for indice, item in enumerate(cmd.campanas):
+        errores = _validar_campana(item)
+        if errores:
+            resultados.append({"indice": indice, "id": None, "errores": errores})
+            continue
+
+        id_campana = uuid.uuid4()
+        fi = _parse_iso(item.fecha_inicio)
+        ff = _parse_iso(item.fecha_fin)
+        campana = {
+            "id": id_campana,
+            "id_marca": _como_uuid(item.id_marca),
+            "nombre": item.nombre,
+            "descripcion": item.descripcion,
+            "tipo_campana": item.tipo_campana,
+            "objetivo": item.objetivo or "ventas",
+            "estado": "borrador",
+            "fecha_inicio": fi,
+            "fecha_fin": ff,
+            "presupuesto_total": item.presupuesto_total or 0.0,
+            "presupuesto_utilizado": 0.0,
+            "meta_ventas": item.meta_ventas or 0,
+            "ventas_actuales": 0,
+            "meta_engagement": item.meta_engagement or 0,
+            "engagement_actual": 0,
+            "target_audiencia": item.target_audiencia,
+            "canales_distribucion": item.canales_distribucion,
+            "terminos_condiciones": item.terminos_condiciones,
+            "fecha_creacion": ahora,
+            "fecha_ultima_actividad": ahora,
+            "fecha_actualizacion": ahora,
+            "version": 1,
+        }
+        campanas.append(campana)
+
+        evento = evento_campana("CampaignCreated", campana, ahora)
+        eventos.append({
+            "id": uuid.uuid4(),
+            "saga_id": _como_uuid(item.saga_id) or uuid.uuid4(),
+            "aggregate_id": id_campana,
+            "aggregate_type": "Campaign",
+            "event_type": "CampaignCreated",
+            "payload": json.dumps(evento),
+            "occurred_at": ahora,
+            "status": "PENDING",
+            "attempts": 0,
+        })
+        resultados.append({"indice": indice, "id": str(id_campana), "errores": []})
+
+    if campanas:
+        try:
+            # executemany sobre insert() usa "insertmanyvalues": un INSERT multi-fila por página
+            db.session.execute(insert(CampanaDBModel), campanas)
+            db.session.execute(insert(OutboxEvent), eventos)
+            # Puede haber ids pedidos antes de existir en la cache negativa
+            invalidate_on_commit(db.session, (campana["id"] for campana in campanas))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Error creando lote de campañas: %s", e)
+            raise
+
+    logger.info("Lote de campañas procesado: %s creadas, %s rechazadas",
+                len(campanas), len(resultados) - len(campanas))
+    return {
+        "creadas": len(campanas),
+        "rechazadas": len(resultados) - len(campanas),
+        "resultados": resultados
+    }
@@ -14,6 +14,7 @@ from campaign_management.infraestructura.repositories import (
     SQLAlchemyOutboxRepository,
     SQLAlchemyCampaignReadRepository
 )
+from campaign_management.infraestructura.repositories_cache import CachedCampaignRepository, invalidate_campaign
 from campaign_management.config.db import db
 
 logger = logging.getLogger(__name__)
@@ -35,7 +36,7 @@ class EventHandlerFactory:
     def create_campaign_event_handler() -> EventHandler:
         """Create a campaign event handler with repositories"""
         try:
-            campaign_repository = SQLAlchemyCampaignRepository(db.session)
+            campaign_repository = CachedCampaignRepository(SQLAlchemyCampaignRepository(db.session))
             outbox_repository = SQLAlchemyOutboxRepository(db.session)
             return CampaignCreatedEventHandler(campaign_repository, outbox_repository)
         except Exception as e:
@@ -46,7 +47,7 @@ class EventHandlerFactory:
     def create_campaign_status_change_handler() -> EventHandler:
         """Create a campaign status change event handler with repositories"""
         try:
-            campaign_repository = SQLAlchemyCampaignRepository(db.session)
+            campaign_repository = CachedCampaignRepository(SQLAlchemyCampaignRepository(db.session))
             outbox_repository = SQLAlchemyOutboxRepository(db.session)
             return CampaignStatusChangedEventHandler(campaign_repository, outbox_repository)
         except Exception as e:
@@ -62,35 +63,32 @@ class EventHandlerFactory:
             logger.info(f"Handling event: {event_type}")
             
             if event_type == "CommandCreateCampaign" and event_status == "success":
-                # Handle with both write model and read model handlers
-                try:
-                    # Read model handler (saves to campaigns_read table)
-                    read_handler = EventHandlerFactory.create_campaign_read_event_handler()
-                    read_handler.handle(event_data)
-                    logger.info(f"CampaignCreated event handled by read model handler")
-                except Exception as e:
-                    logger.error(f"Error in read model handler: {e}")
+                # The campaign service writes the campaign; the read model gets it from campaign-events
+                logger.info("CampaignCreated is projected from the campaign-events outbox event")
                     
             elif event_type in ["CampaignActivated", "CampaignPaused", "CampaignFinalized"]:
-                # Handle with both write model and read model handlers
                 try:
-                    # Write model handler (updates campaigns table and outbox)
+                    # Write model handler (updates campaigns table and outbox); the read model
+                    # is updated when its outbox event arrives through campaign-events
                     write_handler = EventHandlerFactory.create_campaign_status_change_handler()
                     write_handler.handle(event_data)
                     logger.info(f"{event_type} event handled by write model handler")
                 except Exception as e:
                     logger.error(f"Error in write model handler: {e}")
-                
-                try:
-                    # Read model handler (updates campaigns_read table)
-                    read_handler = EventHandlerFactory.create_campaign_read_event_handler()
-                    read_handler.handle(event_data)
-                    logger.info(f"{event_type} event handled by read model handler")
-                except Exception as e:
-                    logger.error(f"Error in read model handler: {e}")
             else:
                 logger.info(f"No handler for event type: {event_type}")
                 
         except Exception as e:
             logger.error(f"Error handling event: {e}")
             logger.error(f"Event data: {event_data}")
+    
+    @staticmethod
+    def handle_campaign_event(event_data: Dict[str, Any]) -> None:
+        """Project a campaign-events outbox event (row snapshot) into the read model"""
+        # The write may come from another process: drop the cached row only if it is older than the event
+        aggregate_id = event_data.get("aggregate_id") or (event_data.get("data") or {}).get("id")
+        version = event_data.get("version")
+        if aggregate_id and isinstance(version, int):
+            invalidate_campaign(aggregate_id, version)
+        read_handler = EventHandlerFactory.create_campaign_read_event_handler()
+        read_handler.handle(event_data)
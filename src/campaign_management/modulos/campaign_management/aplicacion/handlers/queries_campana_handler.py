@@ -4,87 +4,482 @@ En este archivo se definen los handlers para queries de campañas
 """
 
 import logging
-from typing import List, Optional
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Iterator, List, Optional
+from sqlalchemy import and_, any_, bindparam, func, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from campaign_management.modulos.campaign_management.aplicacion.queries.queries_campana import (
-    ObtenerCampana, ObtenerCampanasPorMarca, ObtenerCampanasPorTipo,
-    ObtenerCampanasPorEstado, ObtenerCampanasActivas
+    ObtenerCampana, ObtenerVersionCampana, ObtenerCampanasPorMarca, ObtenerCampanasPorTipo,
+    ObtenerCampanasPorEstado, ObtenerCampanasActivas, ObtenerCampanasPorIds, ObtenerResumenMarca,
+    BuscarCampanas, ObtenerCampanasEnRango
 )
+from campaign_management.modulos.campaign_management.aplicacion.paginacion import (
+    normalizar_limite, codificar_cursor, decodificar_cursor
+)
+from campaign_management.modulos.campaign_management.aplicacion.modelo_lectura import modelo_lectura
 from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
-from campaign_management.modulos.campaign_management.aplicacion.mapeadores import MapeadorCampanaDTOJson
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel, CampanaResumenDBModel
+from campaign_management.modulos.campaign_management.infraestructura.indice_rangos import indice_rangos
+from campaign_management.modulos.campaign_management.infraestructura.indice_busqueda import IndiceBusqueda
 from campaign_management.config.db import db
+from campaign_management.seedwork.dominio.excepciones import ExcepcionDominio
 
 logger = logging.getLogger(__name__)
 
+FILAS_POR_LOTE_STREAM = int(os.getenv('CAMPAIGN_STREAM_YIELD_PER', '500'))
+MAX_IDS_POR_CONSULTA = int(os.getenv('CAMPAIGN_MULTIGET_MAX_IDS', '1000'))
+# Configuración de texto de la columna ``busqueda`` (debe coincidir con init.sql)
+CONFIGURACION_BUSQUEDA = "'spanish'::regconfig"
+
+def _texto(valor):
+    return valor or ''
+
+def _fecha(valor):
+    return valor.isoformat() if valor else ''
+
+def _identidad(valor):
+    return valor
+
+# Campos expuestos en el DTO y su conversión a JSON, en el orden de respuesta. Las
+# columnas se toman del modelo de lectura vigente (campaigns o campaigns_read)
+CAMPOS_CAMPANA = {
+    'id': str,
+    'id_marca': str,
+    'nombre': _identidad,
+    'descripcion': _texto,
+    'tipo_campana': _identidad,
+    'objetivo': _identidad,
+    'estado': _identidad,
+    'fecha_inicio': _fecha,
+    'fecha_fin': _fecha,
+    'presupuesto_total': _identidad,
+    'presupuesto_utilizado': _identidad,
+    'meta_ventas': _identidad,
+    'ventas_actuales': _identidad,
+    'meta_engagement': _identidad,
+    'engagement_actual': _identidad,
+    'target_audiencia': _texto,
+    'canales_distribucion': _texto,
+    'terminos_condiciones': _texto,
+    'fecha_creacion': _fecha,
+    'fecha_ultima_actividad': _fecha,
+    'fecha_actualizacion': _fecha,
+}
+
+# Columnas que siempre se leen porque forman la llave del cursor
+_COLUMNAS_LLAVE = ('id', 'fecha_creacion')
+
+
+class CamposInvalidosExcepcion(ExcepcionDominio):
+    def __init__(self, campos):
+        self.__mensaje = f"Campos desconocidos: {', '.join(sorted(campos))}"
+    def __str__(self):
+        return str(self.__mensaje)
+
+
+def _resolver_campos(campos: Optional[List[str]]) -> List[str]:
+    if not campos:
+        return list(CAMPOS_CAMPANA)
+    desconocidos = set(campos) - set(CAMPOS_CAMPANA)
+    if desconocidos:
+        raise CamposInvalidosExcepcion(desconocidos)
+    return [campo for campo in CAMPOS_CAMPANA if campo in campos]
+
+def _seleccionar(modelo, campos: List[str]):
+    """SELECT solo de las columnas pedidas más la llave del cursor"""
+    columnas = list(campos) + [c for c in _COLUMNAS_LLAVE if c not in campos]
+    return select(*(getattr(modelo, c).label(c) for c in columnas))
+
+def _convertir_fila_a_dto(fila, campos: List[str]) -> dict:
+    """Convierte una fila (id, nombre, ...) al DTO con únicamente los campos pedidos"""
+    mapeo = fila._mapping
+    return {campo: CAMPOS_CAMPANA[campo](mapeo[campo]) for campo in campos}
+
 def manejar_obtener_campana(query: ObtenerCampana) -> Optional[dict]:
     """Obtiene una campaña por su ID"""
     try:
-        campana = CampanaDBModel.query.filter_by(id=query.id_campana).first()
-        if not campana:
+        campos = _resolver_campos(query.campos)
+        id_campana = uuid.UUID(str(query.id_campana))
+        modelo = modelo_lectura()
+        fila = db.session.execute(_seleccionar(modelo, campos).where(modelo.id == id_campana)).first()
+        if not fila and modelo is not CampanaDBModel:
+            # Recién creada y aún no proyectada
+            fila = db.session.execute(
+                _seleccionar(CampanaDBModel, campos).where(CampanaDBModel.id == id_campana)
+            ).first()
+        if not fila:
             return None
         
-        return _convertir_campana_a_dto(campana)
+        return _convertir_fila_a_dto(fila, campos)
     except Exception as e:
         logger.exception("Error obteniendo campaña: %s", e)
         raise
 
-def _convertir_campana_a_dto(campana: CampanaDBModel) -> dict:
-    """Convierte un modelo de BD a DTO"""
+def manejar_obtener_version_campana(query: ObtenerVersionCampana) -> Optional[datetime]:
+    """Obtiene solo la fecha de actualización de una campaña, sin hidratar el modelo"""
+    try:
+        _resolver_campos(query.campos)
+        id_campana = uuid.UUID(str(query.id_campana))
+        modelo = modelo_lectura()
+        version = db.session.execute(
+            select(modelo.fecha_actualizacion).where(modelo.id == id_campana)
+        ).scalar_one_or_none()
+        if version is None and modelo is not CampanaDBModel:
+            version = db.session.execute(
+                select(CampanaDBModel.fecha_actualizacion).where(CampanaDBModel.id == id_campana)
+            ).scalar_one_or_none()
+        return version
+    except Exception as e:
+        logger.exception("Error obteniendo versión de campaña: %s", e)
+        raise
+
+def _despues_del_cursor(modelo, consulta, cursor: Optional[str]):
+    """Restringe la consulta a las filas posteriores al cursor (orden descendente)"""
+    if not cursor:
+        return consulta
+    fecha_creacion, id_campana = decodificar_cursor(cursor)
+    return consulta.where(
+        tuple_(modelo.fecha_creacion, modelo.id) < tuple_(fecha_creacion, id_campana)
+    )
+
+def _paginar(modelo, consulta, campos: List[str], limite: Optional[int]) -> dict:
+    """Aplica paginación keyset sobre (fecha_creacion, id), del más reciente al más antiguo"""
+    limite = normalizar_limite(limite)
+    consulta = consulta.order_by(
+        modelo.fecha_creacion.desc(), modelo.id.desc()
+    ).limit(limite + 1)
+
+    return _pagina(db.session.execute(consulta).all(), campos, limite)
+
+def _pagina(filas, campos: List[str], limite: int) -> dict:
+    """Arma la página con hasta ``limite`` filas; una fila de más indica que hay página siguiente"""
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente = codificar_cursor(ultima.fecha_creacion, ultima.id)
     return {
-        'id': str(campana.id),
-        'id_marca': str(campana.id_marca),
-        'nombre': campana.nombre,
-        'descripcion': campana.descripcion or '',
-        'tipo_campana': campana.tipo_campana,
-        'objetivo': campana.objetivo,
-        'estado': campana.estado,
-        'fecha_inicio': campana.fecha_inicio.isoformat() if campana.fecha_inicio else '',
-        'fecha_fin': campana.fecha_fin.isoformat() if campana.fecha_fin else '',
-        'presupuesto_total': campana.presupuesto_total,
-        'presupuesto_utilizado': campana.presupuesto_utilizado,
-        'meta_ventas': campana.meta_ventas,
-        'ventas_actuales': campana.ventas_actuales,
-        'meta_engagement': campana.meta_engagement,
-        'engagement_actual': campana.engagement_actual,
-        'target_audiencia': campana.target_audiencia or '',
-        'canales_distribucion': campana.canales_distribucion or '',
-        'terminos_condiciones': campana.terminos_condiciones or '',
-        'fecha_creacion': campana.fecha_creacion.isoformat() if campana.fecha_creacion else '',
-        'fecha_ultima_actividad': campana.fecha_ultima_actividad.isoformat() if campana.fecha_ultima_actividad else '',
-        'fecha_actualizacion': campana.fecha_actualizacion.isoformat() if campana.fecha_actualizacion else ''
+        'items': [_convertir_fila_a_dto(fila, campos) for fila in filas],
+        'next_cursor': siguiente
     }
 
-def manejar_obtener_campanas_por_marca(query: ObtenerCampanasPorMarca) -> List[dict]:
-    """Obtiene campañas por ID de marca"""
+def _iterar(modelo, consulta, campos: List[str]) -> Iterator[dict]:
+    """Recorre todas las filas con un cursor del servidor, trayendo lotes de yield_per filas
+
+    La consulta y la primera lectura se hacen aquí mismo, dentro del handler, para
+    que un error de base llegue antes de enviar la respuesta; el resto se lee al
+    recorrer el iterador.
+    """
+    consulta = consulta.order_by(
+        modelo.fecha_creacion.desc(), modelo.id.desc()
+    ).execution_options(yield_per=FILAS_POR_LOTE_STREAM)
+
+    resultado = db.session.execute(consulta)
+    try:
+        primera = resultado.fetchone()
+    except Exception:
+        resultado.close()
+        raise
+    return _recorrer(resultado, primera, campos)
+
+def _recorrer(resultado, primera, campos: List[str]) -> Iterator[dict]:
+    try:
+        if primera is None:
+            return
+        yield _convertir_fila_a_dto(primera, campos)
+        for fila in resultado:
+            yield _convertir_fila_a_dto(fila, campos)
+    finally:
+        resultado.close()
+
+def _listar(modelo, filtro, query):
+    """Devuelve un iterador de filas en modo stream o una página keyset en otro caso"""
+    campos = _resolver_campos(query.campos)
+    consulta = _despues_del_cursor(modelo, _seleccionar(modelo, campos).where(filtro), query.cursor)
+    if query.stream:
+        return _iterar(modelo, consulta, campos)
+    return _paginar(modelo, consulta, campos, query.limite)
+
+def manejar_obtener_campanas_por_marca(query: ObtenerCampanasPorMarca) -> dict:
+    """Obtiene una página de campañas por ID de marca"""
     try:
-        campanas = CampanaDBModel.query.filter_by(id_marca=query.id_marca).all()
-        return [_convertir_campana_a_dto(campana) for campana in campanas]
+        modelo = modelo_lectura()
+        return _listar(modelo, modelo.id_marca == uuid.UUID(str(query.id_marca)), query)
     except Exception as e:
         logger.exception("Error obteniendo campañas por marca: %s", e)
         raise
 
-def manejar_obtener_campanas_por_tipo(query: ObtenerCampanasPorTipo) -> List[dict]:
-    """Obtiene campañas por tipo"""
+def manejar_obtener_campanas_por_tipo(query: ObtenerCampanasPorTipo) -> dict:
+    """Obtiene una página de campañas por tipo"""
     try:
-        campanas = CampanaDBModel.query.filter_by(tipo_campana=query.tipo_campana).all()
-        return [_convertir_campana_a_dto(campana) for campana in campanas]
+        modelo = modelo_lectura()
+        return _listar(modelo, modelo.tipo_campana == query.tipo_campana, query)
     except Exception as e:
         logger.exception("Error obteniendo campañas por tipo: %s", e)
         raise
 
-def manejar_obtener_campanas_por_estado(query: ObtenerCampanasPorEstado) -> List[dict]:
-    """Obtiene campañas por estado"""
+def manejar_obtener_campanas_por_estado(query: ObtenerCampanasPorEstado) -> dict:
+    """Obtiene una página de campañas por estado"""
     try:
-        campanas = CampanaDBModel.query.filter_by(estado=query.estado).all()
-        return [_convertir_campana_a_dto(campana) for campana in campanas]
+        modelo = modelo_lectura()
+        return _listar(modelo, modelo.estado == query.estado, query)
     except Exception as e:
         logger.exception("Error obteniendo campañas por estado: %s", e)
         raise
 
-def manejar_obtener_campanas_activas(query: ObtenerCampanasActivas) -> List[dict]:
-    """Obtiene todas las campañas activas"""
+def manejar_obtener_campanas_activas(query: ObtenerCampanasActivas) -> dict:
+    """Obtiene una página de las campañas activas"""
     try:
-        campanas = CampanaDBModel.query.filter_by(estado="activa").all()
-        return [_convertir_campana_a_dto(campana) for campana in campanas]
+        modelo = modelo_lectura()
+        return _listar(modelo, modelo.estado == "activa", query)
     except Exception as e:
         logger.exception("Error obteniendo campañas activas: %s", e)
         raise
+
+def _id_en(modelo, ids: List[uuid.UUID]):
+    """``id = ANY(:ids)`` con un único parámetro arreglo en PostgreSQL; IN en otros motores"""
+    if db.session.get_bind(mapper=modelo.__mapper__).dialect.name == 'postgresql':
+        return modelo.id == any_(bindparam('ids', value=ids, type_=ARRAY(UUID(as_uuid=True))))
+    return modelo.id.in_(ids)
+
+def _buscar_por_ids(modelo, ids: List[uuid.UUID], campos: List[str]) -> dict:
+    filas = db.session.execute(_seleccionar(modelo, campos).where(_id_en(modelo, ids))).all()
+    return {fila.id: _convertir_fila_a_dto(fila, campos) for fila in filas}
+
+def manejar_obtener_campanas_por_ids(query: ObtenerCampanasPorIds) -> dict:
+    """Obtiene varias campañas por ID en una sola consulta, en el orden pedido"""
+    if len(query.ids) > MAX_IDS_POR_CONSULTA:
+        raise ExcepcionDominio(f"Se admiten como máximo {MAX_IDS_POR_CONSULTA} ids por consulta")
+    try:
+        ids = [uuid.UUID(str(id_campana)) for id_campana in query.ids]
+    except ValueError:
+        raise ExcepcionDominio("ids debe contener solo UUID válidos") from None
+    try:
+        campos = _resolver_campos(query.campos)
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {'items': [], 'faltantes': []}
+
+        modelo = modelo_lectura()
+        encontradas = _buscar_por_ids(modelo, ids, campos)
+        pendientes = [id_campana for id_campana in ids if id_campana not in encontradas]
+        if pendientes and modelo is not CampanaDBModel:
+            # Las que aún no llegaron a la proyección se buscan en el modelo de escritura
+            encontradas.update(_buscar_por_ids(CampanaDBModel, pendientes, campos))
+
+        return {
+            'items': [encontradas[id_campana] for id_campana in ids if id_campana in encontradas],
+            'faltantes': [str(id_campana) for id_campana in ids if id_campana not in encontradas]
+        }
+    except Exception as e:
+        logger.exception("Error obteniendo campañas por ids: %s", e)
+        raise
+
+
+def manejar_obtener_resumen_marca(query: ObtenerResumenMarca) -> dict:
+    """Resumen de campañas de una marca por estado y tipo, leído de los contadores de la proyección"""
+    try:
+        id_marca = uuid.UUID(str(query.id_marca))
+    except ValueError:
+        raise ExcepcionDominio("id_marca debe ser un UUID válido") from None
+    try:
+        filas = db.session.execute(
+            select(CampanaResumenDBModel)
+            .where(CampanaResumenDBModel.id_marca == id_marca, CampanaResumenDBModel.cantidad > 0)
+            .order_by(CampanaResumenDBModel.estado, CampanaResumenDBModel.tipo_campana)
+        ).scalars().all()
+
+        def _acumular(totales: dict, fila) -> None:
+            totales['cantidad'] = totales.get('cantidad', 0) + fila.cantidad
+            totales['presupuesto_total'] = totales.get('presupuesto_total', 0.0) + fila.presupuesto_total
+            totales['presupuesto_utilizado'] = totales.get('presupuesto_utilizado', 0.0) + fila.presupuesto_utilizado
+            totales['ventas_actuales'] = totales.get('ventas_actuales', 0) + fila.ventas_actuales
+
+        total, por_estado, por_tipo, detalle = {}, {}, {}, []
+        for fila in filas:
+            _acumular(total, fila)
+            _acumular(por_estado.setdefault(fila.estado, {}), fila)
+            _acumular(por_tipo.setdefault(fila.tipo_campana, {}), fila)
+            detalle.append({
+                'estado': fila.estado,
+                'tipo_campana': fila.tipo_campana,
+                'cantidad': fila.cantidad,
+                'presupuesto_total': fila.presupuesto_total,
+                'presupuesto_utilizado': fila.presupuesto_utilizado,
+                'ventas_actuales': fila.ventas_actuales,
+                'fecha_actualizacion': _fecha(fila.fecha_actualizacion)
+            })
+
+        return {
+            'id_marca': str(id_marca),
+            'total': total or {'cantidad': 0, 'presupuesto_total': 0.0, 'presupuesto_utilizado': 0.0, 'ventas_actuales': 0},
+            'por_estado': por_estado,
+            'por_tipo': por_tipo,
+            'detalle': detalle
+        }
+    except Exception as e:
+        logger.exception("Error obteniendo resumen de la marca %s: %s", query.id_marca, e)
+        raise
+
+
+def _escapar_like(texto: str) -> str:
+    return texto.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+
+def _buscar_postgres(modelo, texto: str, filtro, campos: List[str], limite: int, offset: int) -> list:
+    """Búsqueda rankeada con la columna tsvector ``busqueda`` (GIN) y pg_trgm sobre el nombre"""
+    terminos = re.findall(r'\w+', texto.lower())
+    # Todos los términos deben aparecer; el último se busca como prefijo (type-ahead)
+    tsquery = func.to_tsquery(literal_column(CONFIGURACION_BUSQUEDA), ' & '.join(terminos[:-1] + [terminos[-1] + ':*']))
+    busqueda = literal_column(f"{modelo.__tablename__}.busqueda")
+    relevancia = (func.ts_rank_cd(busqueda, tsquery) + func.similarity(modelo.nombre, texto)).label('relevancia')
+    consulta = _seleccionar(modelo, campos).add_columns(relevancia).where(or_(
+        busqueda.op('@@')(tsquery),
+        modelo.nombre.op('%')(texto),
+        modelo.nombre.ilike(_escapar_like(texto) + '%', escape='!')
+    ))
+    if filtro is not None:
+        consulta = consulta.where(filtro)
+    consulta = consulta.order_by(
+        relevancia.desc(), modelo.fecha_creacion.desc(), modelo.id.desc()
+    ).limit(limite).offset(offset)
+    return [(fila, fila.relevancia) for fila in db.session.execute(consulta)]
+
+def _buscar_en_memoria(modelo, texto: str, filtro, campos: List[str], limite: int, offset: int) -> list:
+    """Búsqueda equivalente con IndiceBusqueda para bases sin tsvector/pg_trgm (SQLite en pruebas)"""
+    candidatas = select(modelo.id, modelo.nombre, modelo.descripcion, modelo.target_audiencia).order_by(
+        modelo.fecha_creacion.desc(), modelo.id.desc()
+    )
+    if filtro is not None:
+        candidatas = candidatas.where(filtro)
+    indice = IndiceBusqueda().agregar_todos((fila.id, fila._mapping) for fila in db.session.execute(candidatas))
+    ranking = indice.buscar(texto)[offset:offset + limite]
+    if not ranking:
+        return []
+    filas = {fila.id: fila for fila in db.session.execute(
+        _seleccionar(modelo, campos).where(modelo.id.in_([id_campana for id_campana, _ in ranking]))
+    )}
+    return [(filas[id_campana], relevancia) for id_campana, relevancia in ranking if id_campana in filas]
+
+def manejar_buscar_campanas(query: BuscarCampanas) -> dict:
+    """Busca campañas por nombre, descripción y audiencia, de la más a la menos relevante"""
+    texto = (query.texto or '').strip()
+    if not re.search(r'\w', texto):
+        raise ExcepcionDominio("q debe contener al menos una palabra")
+    if query.offset < 0:
+        raise ExcepcionDominio("offset no puede ser negativo")
+    try:
+        filtro_marca = uuid.UUID(str(query.id_marca)) if query.id_marca else None
+    except ValueError:
+        raise ExcepcionDominio("id_marca debe ser un UUID válido") from None
+    try:
+        campos = _resolver_campos(query.campos)
+        limite = normalizar_limite(query.limite)
+        modelo = modelo_lectura()
+        filtro = modelo.id_marca == filtro_marca if filtro_marca else None
+
+        dialecto = db.session.get_bind(mapper=modelo.__mapper__).dialect.name
+        buscar = _buscar_postgres if dialecto == 'postgresql' else _buscar_en_memoria
+        # Se pide una fila de más para saber si hay página siguiente
+        resultados = buscar(modelo, texto, filtro, campos, limite + 1, query.offset)
+
+        return {
+            'items': [
+                dict(_convertir_fila_a_dto(fila, campos), relevancia=round(float(relevancia), 4))
+                for fila, relevancia in resultados[:limite]
+            ],
+            'next_offset': query.offset + limite if len(resultados) > limite else None
+        }
+    except Exception as e:
+        logger.exception("Error buscando campañas: %s", e)
+        raise
+
+
+def _fecha_rango(valor: Optional[str], nombre: str) -> datetime:
+    try:
+        fecha = datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    except ValueError:
+        raise ExcepcionDominio(f"{nombre} debe ser una fecha ISO 8601") from None
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+def _vigente_en(modelo, desde: datetime, hasta: datetime):
+    """Campañas con fecha_inicio cuya vigencia [fecha_inicio, fecha_fin] se solapa con [desde, hasta]"""
+    # Mismo predicado que el índice parcial: sin inicio o con fin anterior al inicio no hay rango
+    con_rango = and_(
+        modelo.fecha_inicio.isnot(None),
+        or_(modelo.fecha_fin.is_(None), modelo.fecha_fin >= modelo.fecha_inicio)
+    )
+    if db.session.get_bind(mapper=modelo.__mapper__).dialect.name == 'postgresql':
+        # Usa el índice GiST sobre tsrange(fecha_inicio, fecha_fin, '[]'); fecha_fin NULL es un rango abierto
+        # Los límites van como literal para que la expresión coincida con la del índice
+        cerrado = literal_column("'[]'")
+        return and_(con_rango, func.tsrange(modelo.fecha_inicio, modelo.fecha_fin, cerrado).op('&&')(
+            func.tsrange(desde, hasta, cerrado)
+        ))
+    return and_(con_rango, modelo.fecha_inicio <= hasta, or_(modelo.fecha_fin.is_(None), modelo.fecha_fin >= desde))
+
+def _bloques_de_ids(llaves: list) -> List[List[uuid.UUID]]:
+    """Ids de las llaves en bloques de a lo más MAX_IDS_POR_CONSULTA, conservando el orden"""
+    return [
+        [id_campana for _, id_campana in llaves[inicio:inicio + MAX_IDS_POR_CONSULTA]]
+        for inicio in range(0, len(llaves), MAX_IDS_POR_CONSULTA)
+    ]
+
+def _listar_por_llaves(modelo, llaves: list, filtros: list, query):
+    """Como ``_listar``, pero sobre llaves (fecha_creacion, id) ya ordenadas de mayor a menor
+
+    Los ids se consultan por bloques en ese orden; como los bloques no se
+    intercalan, basta concatenar sus resultados ordenados. En modo página se
+    deja de consultar cuando la página está completa.
+    """
+    campos = _resolver_campos(query.campos)
+    if query.cursor:
+        posicion = decodificar_cursor(query.cursor)
+        llaves = [llave for llave in llaves if llave < posicion]
+
+    def consulta(ids):
+        return _seleccionar(modelo, campos).where(_id_en(modelo, ids), *filtros)
+
+    bloques = _bloques_de_ids(llaves)
+    if query.stream:
+        if not bloques:
+            return iter(())
+        # El primer bloque se consulta aquí, igual que en ``_iterar``; los demás al recorrer
+        primero = _iterar(modelo, consulta(bloques[0]), campos)
+        return chain(primero, chain.from_iterable(_iterar(modelo, consulta(ids), campos) for ids in bloques[1:]))
+
+    limite = normalizar_limite(query.limite)
+    filas = []
+    for ids in bloques:
+        filas.extend(db.session.execute(consulta(ids).order_by(
+            modelo.fecha_creacion.desc(), modelo.id.desc()
+        ).limit(limite + 1 - len(filas))).all())
+        if len(filas) > limite:
+            break
+    return _pagina(filas, campos, limite)
+
+def manejar_obtener_campanas_en_rango(query: ObtenerCampanasEnRango) -> dict:
+    """Obtiene una página de las campañas vigentes en algún momento entre desde y hasta"""
+    desde = _fecha_rango(query.desde, 'desde')
+    hasta = _fecha_rango(query.hasta, 'hasta')
+    if hasta < desde:
+        raise ExcepcionDominio("hasta no puede ser anterior a desde")
+    try:
+        modelo = modelo_lectura()
+        filtros = []
+        if query.id_marca:
+            filtros.append(modelo.id_marca == uuid.UUID(str(query.id_marca)))
+        if query.estado:
+            filtros.append(modelo.estado == query.estado)
+        if modelo is CampanaReadDBModel and indice_rangos.habilitado:
+            llaves = indice_rangos.solapadas(db.session, desde, hasta)
+            return _listar_por_llaves(modelo, llaves, filtros, query)
+        return _listar(modelo, and_(_vigente_en(modelo, desde, hasta), *filtros), query)
+    except Exception as e:
+        logger.exception("Error obteniendo campañas en rango: %s", e)
+        raise
@@ -0,0 +1,50 @@
+"""Handler para transiciones masivas de campañas por marca
+
+En este archivo se define el handler que pausa, activa, finaliza o cancela
+todas las campañas de una marca con un único UPDATE por conjunto
+"""
+
+import logging
+import uuid
+
+from sqlalchemy import and_
+
+from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import TransicionarCampanasMarca
+from campaign_management.modulos.campaign_management.aplicacion.handlers.transiciones_campana import TRANSICIONES, aplicar_transicion
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.config.db import db
+from campaign_management.seedwork.dominio.excepciones import ExcepcionDominio
+
+logger = logging.getLogger(__name__)
+
+# programar exige fechas por campaña, no tiene sentido aplicarla en bloque
+ACCIONES_MASIVAS = ("activar", "pausar", "finalizar", "cancelar")
+
+
+def manejar_transicionar_campanas_marca(cmd: TransicionarCampanasMarca) -> dict:
+    if cmd.accion not in ACCIONES_MASIVAS:
+        raise ExcepcionDominio(f"Acción masiva inválida: {cmd.accion}. Válidas: {', '.join(ACCIONES_MASIVAS)}")
+    try:
+        id_marca = uuid.UUID(str(cmd.id_marca))
+    except (TypeError, ValueError):
+        raise ExcepcionDominio("id_marca debe ser UUID válido") from None
+
+    filtros = [CampanaDBModel.id_marca == id_marca]
+    if cmd.estados:
+        invalidos = set(cmd.estados) - set(TRANSICIONES[cmd.accion].origenes)
+        if invalidos:
+            raise ExcepcionDominio(f"Estados no válidos para '{cmd.accion}': {', '.join(sorted(invalidos))}")
+        filtros.append(CampanaDBModel.estado.in_(cmd.estados))
+
+    datos = {} if cmd.accion == "activar" else {"motivo": cmd.motivo}
+    try:
+        filas = aplicar_transicion(cmd.accion, and_(*filtros), datos=datos)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Error en transición masiva '%s' de la marca %s: %s", cmd.accion, id_marca, e)
+        raise
+
+    ids = [str(id_campana) for id_campana, _ in filas]
+    logger.info("Transición masiva '%s' de la marca %s: %s campañas", cmd.accion, id_marca, len(ids))
+    return {"accion": cmd.accion, "afectadas": len(ids), "ids": ids}
@@ -0,0 +1,182 @@
+"""Motor de transiciones de estado de campañas
+
+En este archivo se define la tabla de transiciones del ciclo de vida
+(programar, activar, pausar, finalizar, cancelar) y el motor que las aplica.
+Cada transición es un UPDATE condicional sobre el estado de origen; en
+PostgreSQL el UPDATE va en un CTE junto con el INSERT del evento de outbox, de
+modo que cada comando cuesta un solo round trip y una carrera entre dos
+transiciones deja pasar solo a una.
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import String, Text, cast, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import (
+    columnas_retorno, evento_campana, jsonb_instantanea
+)
+from campaign_management.config.db import db
+from campaign_management.infraestructura.commit_grupal import commit_diferido
+from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.infraestructura.repositories_cache import invalidate_on_commit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Transicion:
+    tipo_evento: str
+    destino: str
+    origenes: Tuple[str, ...]
+    campo_fecha: str
+    participio: str
+    error_estado: str
+
+
+TRANSICIONES: Dict[str, Transicion] = {
+    "programar": Transicion(
+        "CampaignScheduled", "programada", ("borrador",), "fecha_programacion", "programada",
+        "La campaña debe estar en estado 'borrador' para ser programada. Estado actual: {estado}"
+    ),
+    "activar": Transicion(
+        "CampaignActivated", "activa", ("programada",), "fecha_activacion", "activada",
+        "La campaña debe estar en estado 'programada' para ser activada. Estado actual: {estado}"
+    ),
+    "pausar": Transicion(
+        "CampaignPaused", "pausada", ("activa",), "fecha_pausa", "pausada",
+        "La campaña debe estar en estado 'activa' para ser pausada. Estado actual: {estado}"
+    ),
+    "finalizar": Transicion(
+        "CampaignFinished", "finalizada", ("activa", "pausada"), "fecha_finalizacion", "finalizada",
+        "La campaña debe estar en estado 'activa' o 'pausada' para ser finalizada. Estado actual: {estado}"
+    ),
+    "cancelar": Transicion(
+        "CampaignCancelled", "cancelada", ("borrador", "programada", "activa", "pausada"), "fecha_cancelacion", "cancelada",
+        "La campaña ya está en estado '{estado}' y no puede ser cancelada"
+    ),
+}
+
+_COLUMNAS_OUTBOX = [
+    "id", "saga_id", "aggregate_id", "aggregate_type", "event_type",
+    "payload", "occurred_at", "status", "attempts"
+]
+
+
+def _datos_evento(transicion: Transicion, ahora: datetime, datos: dict) -> dict:
+    """Datos del comando que acompañan a la instantánea de la fila"""
+    return {**datos, transicion.campo_fecha: ahora.isoformat()}
+
+
+def _aplicar_postgres(transicion: Transicion, filtro, valores: dict, datos: dict, ahora: datetime) -> List[Tuple]:
+    tabla = CampanaDBModel.__table__
+    upd = (
+        update(tabla)
+        .where(filtro, CampanaDBModel.estado.in_(transicion.origenes))
+        .values(estado=transicion.destino, fecha_actualizacion=ahora, version=tabla.c.version + 1, **valores)
+        .returning(*columnas_retorno(tabla))
+        .cte("upd")
+    )
+    encabezado = {"event_type": transicion.tipo_evento, "timestamp": ahora.isoformat(), "metadata": {}}
+    # La versión y la instantánea salen de la fila actualizada; el resto ya viene armado desde Python
+    payload = cast(
+        cast(literal(json.dumps(encabezado)), JSONB).op("||")(func.jsonb_build_object(
+            "aggregate_id", cast(upd.c.id, String),
+            "version", upd.c.version,
+            "data", cast(literal(json.dumps(_datos_evento(transicion, ahora, datos))), JSONB).op("||")(
+                jsonb_instantanea(upd)
+            )
+        )),
+        Text
+    )
+    consulta = insert(OutboxEvent).from_select(
+        _COLUMNAS_OUTBOX,
+        select(
+            func.gen_random_uuid(), func.gen_random_uuid(), upd.c.id,
+            literal("Campaign"), literal(transicion.tipo_evento), payload,
+            literal(ahora), literal("PENDING"), literal(0)
+        ).select_from(upd)
+    ).returning(OutboxEvent.aggregate_id, OutboxEvent.id)
+    return db.session.execute(consulta).all()
+
+
+def _aplicar_generico(transicion: Transicion, filtro, valores: dict, datos: dict, ahora: datetime) -> List[Tuple]:
+    """Camino para motores sin DML en CTE: UPDATE ... RETURNING y un INSERT multi-fila en la misma transacción"""
+    filas = db.session.execute(
+        update(CampanaDBModel)
+        .where(filtro, CampanaDBModel.estado.in_(transicion.origenes))
+        .values(estado=transicion.destino, fecha_actualizacion=ahora, version=CampanaDBModel.version + 1, **valores)
+        .returning(*columnas_retorno(CampanaDBModel.__table__))
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not filas:
+        return []
+
+    datos_evento = _datos_evento(transicion, ahora, datos)
+    eventos = []
+    for fila in filas:
+        evento = evento_campana(transicion.tipo_evento, fila, ahora, datos_evento)
+        eventos.append({
+            "id": uuid.uuid4(),
+            "saga_id": uuid.uuid4(),
+            "aggregate_id": fila.id,
+            "aggregate_type": "Campaign",
+            "event_type": transicion.tipo_evento,
+            "payload": json.dumps(evento),
+            "occurred_at": ahora,
+            "status": "PENDING",
+            "attempts": 0,
+        })
+    db.session.execute(insert(OutboxEvent), eventos)
+    return [(e["aggregate_id"], e["id"]) for e in eventos]
+
+
+def aplicar_transicion(accion: str, filtro, valores: Optional[dict] = None, datos: Optional[dict] = None) -> List[Tuple]:
+    """Aplica la transición a las campañas del filtro que estén en un estado de origen
+
+    Devuelve ``(id_campana, id_evento_outbox)`` por cada campaña transicionada.
+    No hace commit: lo decide quien llama.
+    """
+    transicion = TRANSICIONES[accion]
+    ahora = datetime.utcnow()
+    if db.session.get_bind().dialect.name == "postgresql":
+        filas = _aplicar_postgres(transicion, filtro, valores or {}, datos or {}, ahora)
+    else:
+        filas = _aplicar_generico(transicion, filtro, valores or {}, datos or {}, ahora)
+    invalidate_on_commit(db.session, (id_campana for id_campana, _ in filas))
+    return filas
+
+
+def transicionar_campana(accion: str, id_campana, valores: Optional[dict] = None, datos: Optional[dict] = None) -> str:
+    transicion = TRANSICIONES[accion]
+    try:
+        id_campana = uuid.UUID(str(id_campana))
+        filas = aplicar_transicion(accion, CampanaDBModel.id == id_campana, valores, datos)
+
+        if not filas:
+            # Solo en el camino de error se consulta el estado para explicar el rechazo
+            estado = db.session.execute(
+                select(CampanaDBModel.estado).where(CampanaDBModel.id == id_campana)
+            ).scalar_one_or_none()
+            if estado is None:
+                raise ValueError(f"Campaña con id {id_campana} no encontrada")
+            raise ValueError(transicion.error_estado.format(estado=estado))
+
+        if not commit_diferido():
+            db.session.commit()
+        id_aplicado, id_evento = filas[0]
+        logger.info("Campaña %s %s y evento almacenado en outbox %s", transicion.participio, id_aplicado, id_evento)
+        return str(id_aplicado)
+
+    except Exception as e:
+        # En un lote agrupado el SAVEPOINT del comando se descarta desde afuera
+        if not commit_diferido():
+            db.session.rollback()
+        logger.exception("Error en transición '%s' de campaña: %s", accion, e)
+        raise
@@ -0,0 +1,71 @@
+"""Selección del modelo de lectura para las queries de campañas
+
+En este archivo se decide si las queries se sirven desde la proyección
+``campaigns_read`` o desde la tabla de escritura ``campaigns``. Con
+``CAMPAIGN_READ_MODEL=projection`` se usa la proyección mientras la última
+escritura que tiene aplicada (``fecha_actualizacion``, copiada de la fila de
+``campaigns`` en cada evento) no quede más de ``CAMPAIGN_READ_MAX_LAG_SECONDS``
+por detrás de la última escritura de ``campaigns``; si se atrasa, o no se
+puede consultar, se vuelve al modelo de escritura.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.repositories import SQLAlchemyCampaignReadRepository
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel
+
+logger = logging.getLogger(__name__)
+
+MODO_LECTURA = os.getenv('CAMPAIGN_READ_MODEL', 'write').lower()
+MAX_RETRASO_SEGUNDOS = float(os.getenv('CAMPAIGN_READ_MAX_LAG_SECONDS', '5'))
+INTERVALO_VERIFICACION_SEGUNDOS = float(os.getenv('CAMPAIGN_READ_LAG_CHECK_SECONDS', '1'))
+
+_lock = threading.Lock()
+_verificado_en = None
+_al_dia = False
+
+
+def _medir_proyeccion() -> bool:
+    try:
+        ultima_escritura = db.session.execute(select(func.max(CampanaDBModel.fecha_actualizacion))).scalar()
+        ultima_proyeccion = SQLAlchemyCampaignReadRepository(db.session).get_last_update()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("No se pudo medir el retraso de la proyección, se lee del modelo de escritura: %s", e)
+        return False
+    if ultima_escritura is None:
+        return True
+    if ultima_proyeccion is None:
+        return False
+    retraso = (ultima_escritura - ultima_proyeccion).total_seconds()
+    if retraso > MAX_RETRASO_SEGUNDOS:
+        logger.info("Proyección retrasada %.1fs, se lee del modelo de escritura", retraso)
+        return False
+    return True
+
+
+def proyeccion_al_dia() -> bool:
+    """Indica si la proyección está dentro del retraso permitido (medido a lo más una vez por intervalo)"""
+    global _verificado_en, _al_dia
+    ahora = time.monotonic()
+    if _verificado_en is not None and ahora - _verificado_en < INTERVALO_VERIFICACION_SEGUNDOS:
+        return _al_dia
+    with _lock:
+        if _verificado_en is None or ahora - _verificado_en >= INTERVALO_VERIFICACION_SEGUNDOS:
+            _al_dia = _medir_proyeccion()
+            _verificado_en = time.monotonic()
+        return _al_dia
+
+
+def modelo_lectura():
+    """Modelo contra el que se arman las queries"""
+    if MODO_LECTURA == 'projection' and proyeccion_al_dia():
+        return CampanaReadDBModel
+    return CampanaDBModel
@@ -0,0 +1,48 @@
+"""Paginación por cursor (keyset) para los listados de campañas
+
+En este archivo se define el cursor opaco usado por los listados. El cursor
+codifica la llave de orden ``(fecha_creacion, id)`` de la última fila entregada,
+de modo que la siguiente página se obtiene con un rango sobre el índice en vez
+de un OFFSET.
+"""
+
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from campaign_management.seedwork.dominio.excepciones import ExcepcionDominio
+
+LIMITE_POR_DEFECTO = int(os.getenv('CAMPAIGN_PAGE_DEFAULT_LIMIT', '100'))
+LIMITE_MAXIMO = int(os.getenv('CAMPAIGN_PAGE_MAX_LIMIT', '1000'))
+
+
+class CursorInvalidoExcepcion(ExcepcionDominio):
+    def __init__(self, mensaje='Cursor de paginación inválido'):
+        self.__mensaje = mensaje
+    def __str__(self):
+        return str(self.__mensaje)
+
+
+def normalizar_limite(limite: Optional[int]) -> int:
+    if limite is None:
+        return LIMITE_POR_DEFECTO
+    if limite < 1:
+        raise CursorInvalidoExcepcion('limit debe ser mayor que 0')
+    return min(limite, LIMITE_MAXIMO)
+
+
+def codificar_cursor(fecha_creacion: datetime, id_campana) -> str:
+    crudo = json.dumps([fecha_creacion.isoformat(), str(id_campana)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, id_campana = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(fecha), uuid.UUID(id_campana)
+    except Exception:
+        raise CursorInvalidoExcepcion() from None
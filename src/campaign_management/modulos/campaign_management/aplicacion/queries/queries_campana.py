@@ -4,23 +4,74 @@ En este archivo se definen las queries para la gestión de campañas
 """
 
 from dataclasses import dataclass
+from typing import List, Optional
 
 @dataclass
 class ObtenerCampana:
     id_campana: str
+    campos: Optional[List[str]] = None
+
+@dataclass
+class ObtenerVersionCampana:
+    id_campana: str
+    # Campos de la representación pedida: se validan igual que en ObtenerCampana
+    campos: Optional[List[str]] = None
 
 @dataclass
 class ObtenerCampanasPorMarca:
     id_marca: str
+    limite: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    campos: Optional[List[str]] = None
 
 @dataclass
 class ObtenerCampanasPorTipo:
     tipo_campana: str
+    limite: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    campos: Optional[List[str]] = None
 
 @dataclass
 class ObtenerCampanasPorEstado:
     estado: str
+    limite: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    campos: Optional[List[str]] = None
 
 @dataclass
 class ObtenerCampanasActivas:
-    pass
\ No newline at end of file
+    limite: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    campos: Optional[List[str]] = None
+
+@dataclass
+class ObtenerCampanasPorIds:
+    ids: List[str]
+    campos: Optional[List[str]] = None
+
+@dataclass
+class ObtenerResumenMarca:
+    id_marca: str
+
+@dataclass
+class BuscarCampanas:
+    texto: str
+    id_marca: Optional[str] = None
+    limite: Optional[int] = None
+    offset: int = 0
+    campos: Optional[List[str]] = None
+
+@dataclass
+class ObtenerCampanasEnRango:
+    desde: str
+    hasta: str
+    id_marca: Optional[str] = None
+    estado: Optional[str] = None
+    limite: Optional[int] = None
+    cursor: Optional[str] = None
+    stream: bool = False
+    campos: Optional[List[str]] = None
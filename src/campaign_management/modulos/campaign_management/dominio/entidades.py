@@ -33,8 +33,9 @@ class ObjetivoCampana(Enum):
     LEAD_GENERATION = "lead_generation"
     CONVERSION = "conversion"
 
-@dataclass
+@dataclass(slots=True)
 class Campana(AgregacionRaiz):
+    saga_id: uuid.UUID = field(default=None)
     id_marca: uuid.UUID = field(default=None)
     nombre: str = field(default="")
     descripcion: str = field(default="")
@@ -133,7 +134,7 @@ class Campana(AgregacionRaiz):
                 fecha_actualizacion=datetime.now()
             ))
 
-@dataclass
+@dataclass(slots=True)
 class CampanaCreada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -142,7 +143,7 @@ class CampanaCreada(EventoDominio):
     objetivo: str = None
     fecha_creacion: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class CampanaProgramada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -151,14 +152,14 @@ class CampanaProgramada(EventoDominio):
     fecha_fin: datetime = None
     fecha_programacion: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class CampanaActivada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
     nombre: str = None
     fecha_activacion: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class CampanaPausada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -166,7 +167,7 @@ class CampanaPausada(EventoDominio):
     motivo: str = None
     fecha_pausa: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class CampanaFinalizada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -174,7 +175,7 @@ class CampanaFinalizada(EventoDominio):
     motivo: str = None
     fecha_finalizacion: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class CampanaCancelada(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -182,7 +183,7 @@ class CampanaCancelada(EventoDominio):
     motivo: str = None
     fecha_cancelacion: datetime = None
 
-@dataclass
+@dataclass(slots=True)
 class MetricasCampanaActualizadas(EventoDominio):
     id_campana: uuid.UUID = None
     id_marca: uuid.UUID = None
@@ -0,0 +1,94 @@
+"""Payloads de outbox con la instantánea completa de una campaña
+
+En este archivo se arma el evento que se deja en outbox por cada escritura
+sobre ``campaigns``: el encabezado lleva la versión de la fila (``version``,
+que cada escritura incrementa) y ``data`` la fila completa tal como quedó,
+fechas incluidas. La proyección de lectura se reconstruye solo con estos
+datos: aplica un evento si su versión es mayor que la última aplicada.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import func
+
+from campaign_management.seedwork.infraestructura.serializacion import valor_json
+
+COLUMNAS_INSTANTANEA = (
+    "id", "id_marca", "nombre", "descripcion", "tipo_campana", "objetivo", "estado",
+    "fecha_inicio", "fecha_fin", "presupuesto_total", "presupuesto_utilizado",
+    "meta_ventas", "ventas_actuales", "meta_engagement", "engagement_actual",
+    "target_audiencia", "canales_distribucion", "terminos_condiciones",
+    "fecha_creacion", "fecha_ultima_actividad", "fecha_actualizacion",
+)
+
+_FECHAS = ("fecha_inicio", "fecha_fin", "fecha_creacion", "fecha_ultima_actividad", "fecha_actualizacion")
+_OBLIGATORIAS = ("id_marca", "nombre", "tipo_campana", "estado", "fecha_creacion")
+
+
+def _obtener(fila: Any):
+    return fila.get if isinstance(fila, Mapping) else lambda campo: getattr(fila, campo, None)
+
+
+def columnas_retorno(tabla):
+    """Columnas que un ``UPDATE ... RETURNING`` debe devolver para armar el evento"""
+    return [tabla.c[columna] for columna in COLUMNAS_INSTANTANEA + ("version",)]
+
+
+def instantanea_campana(fila: Any) -> dict:
+    """Fila de ``campaigns`` (modelo, Row o dict) lista para JSON"""
+    obtener = _obtener(fila)
+    return {columna: valor_json(obtener(columna)) for columna in COLUMNAS_INSTANTANEA}
+
+
+def jsonb_instantanea(tabla):
+    """Misma instantánea armada en PostgreSQL a partir de las columnas de ``tabla`` (p. ej. un CTE)"""
+    return func.jsonb_build_object(*chain.from_iterable((columna, tabla.c[columna]) for columna in COLUMNAS_INSTANTANEA))
+
+
+def evento_campana(tipo_evento: str, fila: Any, ahora: datetime, datos: Optional[dict] = None) -> dict:
+    """Evento de outbox de una escritura; ``datos`` agrega campos propios del evento a la instantánea"""
+    obtener = _obtener(fila)
+    return {
+        "event_type": tipo_evento,
+        "aggregate_id": str(obtener("id")),
+        "version": obtener("version"),
+        "timestamp": ahora.isoformat(),
+        "data": {**(datos or {}), **instantanea_campana(fila)},
+        "metadata": {}
+    }
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    fecha = datetime.fromisoformat(valor.replace("Z", "+00:00"))
+    # Las columnas son TIMESTAMP sin zona
+    return fecha.astimezone(timezone.utc).replace(tzinfo=None) if fecha.tzinfo is not None else fecha
+
+
+def valores_instantanea(evento: dict) -> Optional[dict]:
+    """Columnas de ``campaigns_read`` a partir de un evento con instantánea, o None si no la trae
+
+    Los eventos anteriores a las instantáneas (solo id, marca y nombre, sin
+    ``version`` de la fila) no alcanzan para reconstruir la proyección y se
+    descartan.
+    """
+    data = evento.get("data") or {}
+    version = evento.get("version")
+    if not isinstance(version, int) or isinstance(version, bool) or not data.get("id"):
+        return None
+    if any(data.get(columna) is None for columna in _OBLIGATORIAS):
+        return None
+    try:
+        valores = {columna: data.get(columna) for columna in COLUMNAS_INSTANTANEA}
+        valores["id"] = uuid.UUID(str(valores["id"]))
+        valores["id_marca"] = uuid.UUID(str(valores["id_marca"]))
+        for columna in _FECHAS:
+            valores[columna] = _fecha(valores[columna])
+    except (TypeError, ValueError):
+        return None
+    valores["last_version"] = version
+    return valores
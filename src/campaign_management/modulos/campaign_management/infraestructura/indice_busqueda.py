@@ -0,0 +1,116 @@
+"""Índice de búsqueda en memoria para bases sin PostgreSQL
+
+En este archivo se define el índice que reemplaza a ``tsvector``/``pg_trgm``
+cuando la base no es PostgreSQL (por ejemplo SQLite en pruebas). Imita la
+semántica de la búsqueda en PostgreSQL: todos los términos deben aparecer (el
+último como prefijo), los campos pesan distinto en la relevancia y el nombre
+admite coincidencias aproximadas por similitud de trigramas.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Pesos por campo, en el mismo orden que setweight A/B/C de la columna tsvector
+PESOS = {'nombre': 1.0, 'descripcion': 0.4, 'target_audiencia': 0.2}
+# Umbral por defecto de pg_trgm (pg_trgm.similarity_threshold)
+UMBRAL_SIMILITUD = 0.3
+
+_PALABRA = re.compile(r'\w+', re.UNICODE)
+
+
+def normalizar(texto: Optional[str]) -> List[str]:
+    """Palabras en minúsculas y sin tildes"""
+    if not texto:
+        return []
+    sin_tildes = unicodedata.normalize('NFKD', texto)
+    sin_tildes = ''.join(c for c in sin_tildes if not unicodedata.combining(c))
+    return _PALABRA.findall(sin_tildes.lower())
+
+
+def trigramas(texto: Optional[str]) -> Set[str]:
+    """Trigramas al estilo pg_trgm: cada palabra con dos espacios al inicio y uno al final"""
+    resultado = set()
+    for palabra in normalizar(texto):
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+def similitud(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class IndiceBusqueda:
+    """Índice invertido de palabras por campo más los trigramas del nombre"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[object, float]] = defaultdict(dict)
+        self._palabras: List[str] = []
+        self._ordenado = True
+        self._trigramas_nombre: Dict[object, Set[str]] = {}
+        self._nombres: Dict[object, str] = {}
+
+    def agregar(self, id_documento, campos: Dict[str, Optional[str]]) -> None:
+        for campo, peso in PESOS.items():
+            for palabra in normalizar(campos.get(campo)):
+                if palabra not in self._postings:
+                    self._ordenado = False
+                posting = self._postings[palabra]
+                posting[id_documento] = max(posting.get(id_documento, 0.0), peso)
+        self._trigramas_nombre[id_documento] = trigramas(campos.get('nombre'))
+        self._nombres[id_documento] = ' '.join(normalizar(campos.get('nombre')))
+
+    def agregar_todos(self, documentos: Iterable[Tuple[object, Dict[str, Optional[str]]]]) -> 'IndiceBusqueda':
+        for id_documento, campos in documentos:
+            self.agregar(id_documento, campos)
+        return self
+
+    def _con_prefijo(self, prefijo: str) -> Iterable[str]:
+        if not self._ordenado:
+            self._palabras = sorted(self._postings)
+            self._ordenado = True
+        i = bisect_left(self._palabras, prefijo)
+        while i < len(self._palabras) and self._palabras[i].startswith(prefijo):
+            yield self._palabras[i]
+            i += 1
+
+    def _puntajes_texto(self, terminos: List[str]) -> Dict[object, float]:
+        puntajes: Optional[Dict[object, float]] = None
+        for posicion, termino in enumerate(terminos):
+            palabras = self._con_prefijo(termino) if posicion == len(terminos) - 1 else [termino]
+            del_termino: Dict[object, float] = {}
+            for palabra in palabras:
+                for id_documento, peso in self._postings.get(palabra, {}).items():
+                    del_termino[id_documento] = max(del_termino.get(id_documento, 0.0), peso)
+            if puntajes is None:
+                puntajes = del_termino
+            else:
+                puntajes = {d: p + del_termino[d] for d, p in puntajes.items() if d in del_termino}
+            if not puntajes:
+                return {}
+        return puntajes or {}
+
+    def buscar(self, texto: str) -> List[Tuple[object, float]]:
+        """Documentos que coinciden, del más al menos relevante"""
+        terminos = normalizar(texto)
+        if not terminos:
+            return []
+        puntajes = self._puntajes_texto(terminos)
+        consulta = ' '.join(terminos)
+        trigramas_consulta = trigramas(texto)
+        resultado = {}
+        for id_documento, trigramas_nombre in self._trigramas_nombre.items():
+            parecido = similitud(trigramas_consulta, trigramas_nombre)
+            coincide = (
+                id_documento in puntajes
+                or parecido >= UMBRAL_SIMILITUD
+                or self._nombres[id_documento].startswith(consulta)
+            )
+            if coincide:
+                resultado[id_documento] = puntajes.get(id_documento, 0.0) + parecido
+        return sorted(resultado.items(), key=lambda par: -par[1])
@@ -0,0 +1,139 @@
+"""Índice en memoria de vigencias de campañas para la proyección
+
+En este archivo se define el índice opcional (``CAMPAIGN_RANGE_INDEX=memory``)
+que mantiene en un árbol de intervalos el rango ``[fecha_inicio, fecha_fin]``
+de cada fila de ``campaigns_read``, junto con la versión y la fecha de
+creación de la fila. Se carga desde la base la primera vez que se consulta y
+luego se actualiza con cada escritura de la proyección confirmada en el
+proceso y con los eventos de ``campaign-events`` que lee el proceso de la API
+(ver ``EventConsumerService``). Cada cambio se aplica solo si trae una versión
+igual o más nueva que la conocida, así que el orden en que llegan la carga,
+las escrituras y los eventos no importa.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel
+from campaign_management.seedwork.infraestructura.arbol_intervalos import ArbolIntervalos
+
+logger = logging.getLogger(__name__)
+
+INDICE_HABILITADO = os.getenv('CAMPAIGN_RANGE_INDEX', 'sql').lower() == 'memory'
+
+_PENDIENTES = 'indice_rangos_pendientes'
+
+
+def _sin_zona(fecha: datetime) -> datetime:
+    # Las columnas son TIMESTAMP sin zona: una fecha con zona se lleva a UTC antes de comparar
+    if fecha.tzinfo is not None:
+        return fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+
+def vigencia(fecha_inicio, fecha_fin):
+    """Intervalo indexable de una campaña, o None si no tiene uno válido (sin inicio o fin anterior al inicio)"""
+    if fecha_inicio is None:
+        return None
+    fecha_inicio = _sin_zona(fecha_inicio)
+    fin = _sin_zona(fecha_fin) if fecha_fin is not None else datetime.max
+    if fin < fecha_inicio:
+        return None
+    return fecha_inicio, fin
+
+
+class IndiceRangosCampanas:
+    """Árbol de intervalos de vigencia por campaña, protegido por un lock"""
+
+    def __init__(self, habilitado: bool = INDICE_HABILITADO):
+        self.habilitado = habilitado
+        self._arbol = ArbolIntervalos()
+        # id -> (versión, fecha_creacion) de la última fila aplicada
+        self._filas: Dict[uuid.UUID, Tuple[Optional[int], datetime]] = {}
+        self._lock = threading.Lock()
+        self._cargado = False
+
+    def registrar(self, session, fila: Any) -> None:
+        """Agenda la actualización del índice con la fila para cuando la sesión confirme"""
+        if self.habilitado:
+            session.info.setdefault(_PENDIENTES, {})[uuid.UUID(str(fila.id))] = (
+                getattr(fila, 'last_version', None), fila.fecha_creacion, vigencia(fila.fecha_inicio, fila.fecha_fin)
+            )
+
+    def eliminar(self, session, id_campana) -> None:
+        if self.habilitado:
+            session.info.setdefault(_PENDIENTES, {})[uuid.UUID(str(id_campana))] = None
+
+    def actualizar(self, id_campana, version: Optional[int], fecha_creacion: datetime, fecha_inicio, fecha_fin) -> bool:
+        """Aplica la vigencia de una versión de la campaña; False si ya se conocía una más nueva"""
+        if not self.habilitado:
+            return False
+        with self._lock:
+            return self._actualizar(uuid.UUID(str(id_campana)), version, fecha_creacion, vigencia(fecha_inicio, fecha_fin))
+
+    def aplicar(self, cambios: dict) -> None:
+        with self._lock:
+            for id_campana, cambio in cambios.items():
+                if cambio is None:
+                    self._filas.pop(id_campana, None)
+                    self._arbol.eliminar(id_campana)
+                else:
+                    self._actualizar(id_campana, *cambio)
+
+    def _actualizar(self, id_campana: uuid.UUID, version: Optional[int], fecha_creacion: datetime, intervalo) -> bool:
+        conocida = self._filas.get(id_campana)
+        if conocida is not None and None not in (version, conocida[0]) and version < conocida[0]:
+            return False
+        self._filas[id_campana] = (version, fecha_creacion or datetime.min)
+        if intervalo is None:
+            self._arbol.eliminar(id_campana)
+        else:
+            self._arbol.guardar(id_campana, *intervalo)
+        return True
+
+    def _cargar(self, session) -> None:
+        # No se limpia lo ya aplicado: los eventos leídos antes de la carga pueden ser más nuevos que la base
+        filas = session.execute(
+            select(CampanaReadDBModel.id, CampanaReadDBModel.last_version, CampanaReadDBModel.fecha_creacion,
+                   CampanaReadDBModel.fecha_inicio, CampanaReadDBModel.fecha_fin)
+            .where(CampanaReadDBModel.fecha_inicio.isnot(None))
+            .execution_options(yield_per=1000)
+        )
+        for fila in filas:
+            self._actualizar(fila.id, fila.last_version, fila.fecha_creacion, vigencia(fila.fecha_inicio, fila.fecha_fin))
+        self._cargado = True
+        logger.info("Índice de vigencias cargado con %s campañas", len(self._arbol))
+
+    def solapadas(self, session, desde: datetime, hasta: datetime) -> List[Tuple[datetime, uuid.UUID]]:
+        """Llaves (fecha_creacion, id) de las campañas vigentes en algún momento de [desde, hasta]
+
+        Vienen en el mismo orden que los listados: de la más reciente a la más antigua.
+        """
+        with self._lock:
+            if not self._cargado:
+                # Se carga con el lock tomado: las confirmaciones concurrentes esperan y se aplican después
+                self._cargar(session)
+            llaves = [(self._filas[id_campana][1], id_campana) for id_campana in self._arbol.solapados(desde, hasta)]
+        return sorted(llaves, reverse=True)
+
+
+indice_rangos = IndiceRangosCampanas()
+
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_pendientes(session):
+    cambios = session.info.pop(_PENDIENTES, None)
+    if cambios:
+        indice_rangos.aplicar(cambios)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_pendientes(session):
+    session.info.pop(_PENDIENTES, None)
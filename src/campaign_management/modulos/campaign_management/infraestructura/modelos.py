@@ -5,7 +5,7 @@ En este archivo se definen los modelos de base de datos para campañas
 """
 
 from campaign_management.config.db import db
-from sqlalchemy import Column, String, DateTime, Float, Integer, Text, Enum
+from sqlalchemy import Column, String, DateTime, Float, Integer, Text, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from datetime import datetime
@@ -35,6 +35,14 @@ class ObjetivoCampanaEnum(PyEnum):
 
 class CampanaDBModel(db.Model):
     __tablename__ = "campaigns"
+    __table_args__ = (
+        # Respaldan la paginación keyset (filtro, fecha_creacion, id) de los listados
+        Index("idx_campaigns_marca_creacion", "id_marca", "fecha_creacion", "id"),
+        Index("idx_campaigns_tipo_creacion", "tipo_campana", "fecha_creacion", "id"),
+        Index("idx_campaigns_estado_creacion", "estado", "fecha_creacion", "id"),
+        # MAX(fecha_actualizacion) para medir el retraso de la proyección de lectura
+        Index("idx_campaigns_fecha_actualizacion", "fecha_actualizacion"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     id_marca = Column(UUID(as_uuid=True), nullable=False)
@@ -57,6 +65,8 @@ class CampanaDBModel(db.Model):
     fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
     fecha_ultima_actividad = Column(DateTime, nullable=False, default=datetime.utcnow)
     fecha_actualizacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Cada escritura la incrementa; la proyección aplica un evento solo si trae una versión mayor
+    version = Column(Integer, nullable=False, default=1)
     
     def __repr__(self):
         return f"<Campana {self.nombre} ({self.estado})>"
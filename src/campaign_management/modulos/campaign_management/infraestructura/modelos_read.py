@@ -1,14 +1,26 @@
 from campaign_management.config.db import db
-from sqlalchemy import Column, String, DateTime, Float, Integer
+from sqlalchemy import Column, String, DateTime, Float, Integer, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
 
 class CampanaReadDBModel(db.Model):
     __tablename__ = "campaigns_read"
+    # La proyección vive en el bind 'read' (READ_DATABASE_URL, por defecto la misma base)
+    __bind_key__ = "read"
+    __table_args__ = (
+        Index("idx_campaigns_read_marca_creacion", "id_marca", "fecha_creacion", "id"),
+        Index("idx_campaigns_read_tipo_creacion", "tipo_campana", "fecha_creacion", "id"),
+        Index("idx_campaigns_read_estado_creacion", "estado", "fecha_creacion", "id"),
+        # MAX(fecha_actualizacion), copiada de la fila de escritura, mide el retraso de la proyección
+        Index("idx_campaigns_read_fecha_actualizacion", "fecha_actualizacion"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True)
     id_marca = Column(UUID(as_uuid=True), nullable=False)
     nombre = Column(String(255), nullable=False)
+    descripcion = Column(Text, nullable=True)
     tipo_campana = Column(String(50), nullable=False)
+    objetivo = Column(String(50), nullable=True)
     estado = Column(String(30), nullable=False, default="borrador")
     fecha_inicio = Column(DateTime, nullable=True)
     fecha_fin = Column(DateTime, nullable=True)
@@ -18,6 +30,25 @@ class CampanaReadDBModel(db.Model):
     ventas_actuales = Column(Integer, nullable=False, default=0)
     meta_engagement = Column(Integer, nullable=False, default=0)
     engagement_actual = Column(Integer, nullable=False, default=0)
+    target_audiencia = Column(Text, nullable=True)
+    canales_distribucion = Column(Text, nullable=True)
+    terminos_condiciones = Column(Text, nullable=True)
+    fecha_creacion = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fecha_actualizacion = Column(DateTime, nullable=True)
 
     last_version = Column(Integer, nullable=False, default=0)
     fecha_ultima_actividad = Column(DateTime, nullable=True)
+
+class CampanaResumenDBModel(db.Model):
+    """Contadores por (marca, estado, tipo) mantenidos con deltas por la proyección"""
+    __tablename__ = "campaigns_resumen"
+    __bind_key__ = "read"
+
+    id_marca = Column(UUID(as_uuid=True), primary_key=True)
+    estado = Column(String(30), primary_key=True)
+    tipo_campana = Column(String(50), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    presupuesto_total = Column(Float, nullable=False, default=0.0)
+    presupuesto_utilizado = Column(Float, nullable=False, default=0.0)
+    ventas_actuales = Column(Integer, nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime, nullable=False, default=datetime.utcnow)
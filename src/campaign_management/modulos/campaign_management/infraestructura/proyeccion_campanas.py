@@ -0,0 +1,45 @@
+"""Aplicación de eventos de campañas sobre la proyección de lectura
+
+En este archivo se define cómo la proyección incorpora un evento de
+``campaign-events``: la instantánea del evento reemplaza la fila de
+``campaigns_read`` si su versión es mayor que la última aplicada, y en la
+misma transacción se actualizan el resumen por marca y el índice de vigencias.
+Los eventos repetidos o que llegan después de uno más nuevo no cambian nada.
+"""
+
+import logging
+
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel
+from campaign_management.modulos.campaign_management.infraestructura.resumen_marca import aplicar_delta_resumen, instantanea
+from campaign_management.modulos.campaign_management.infraestructura.indice_rangos import indice_rangos
+
+logger = logging.getLogger(__name__)
+
+# Eventos del modelo de escritura que llevan la instantánea de la campaña
+EVENTOS_CAMPANA = frozenset({
+    "CampaignCreated", "EventCampaignCreated", "CampaignScheduled", "CampaignActivated", "CampaignPaused",
+    "CampaignFinished", "CampaignFinalized", "CampaignCancelled", "CampaignMetricsUpdated",
+})
+
+
+def aplicar_instantanea(session, valores: dict) -> bool:
+    """Lleva la fila de ``campaigns_read`` a ``valores`` (ver ``valores_instantanea``)
+
+    Devuelve False si la proyección ya tenía esa versión o una posterior. No
+    hace commit.
+    """
+    fila = session.get(CampanaReadDBModel, valores["id"], with_for_update=True)
+    if fila is not None and fila.last_version >= valores["last_version"]:
+        logger.info("Campaña %s ya proyectada en la versión %s", valores["id"], fila.last_version)
+        return False
+
+    antes = instantanea(fila)
+    if fila is None:
+        fila = CampanaReadDBModel(**valores)
+        session.add(fila)
+    else:
+        for columna, valor in valores.items():
+            setattr(fila, columna, valor)
+    aplicar_delta_resumen(session, antes, instantanea(fila))
+    indice_rangos.registrar(session, fila)
+    return True
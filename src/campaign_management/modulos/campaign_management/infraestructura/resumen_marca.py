@@ -0,0 +1,104 @@
+"""Mantenimiento incremental del resumen por marca
+
+En este archivo se define cómo la proyección mantiene ``campaigns_resumen``:
+por cada cambio de una fila de ``campaigns_read`` se resta la contribución
+anterior y se suma la nueva con un upsert de deltas, dentro de la misma
+transacción que actualiza la fila. PostgreSQL y SQLite usan ``INSERT ... ON
+CONFLICT``; el resto de los motores, un ``UPDATE`` y, si no había fila, un
+``INSERT``.
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import and_, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaResumenDBModel
+
+_SUMAS = ("presupuesto_total", "presupuesto_utilizado", "ventas_actuales")
+
+
+def instantanea(fila: Any) -> Optional[dict]:
+    """Copia de los campos de una fila de la proyección que alimentan el resumen"""
+    if fila is None:
+        return None
+    obtener = fila.get if isinstance(fila, Mapping) else lambda campo: getattr(fila, campo, None)
+    id_marca = obtener("id_marca")
+    return {
+        "id_marca": uuid.UUID(str(id_marca)) if id_marca is not None else None,
+        "estado": obtener("estado"),
+        "tipo_campana": obtener("tipo_campana"),
+        **{campo: obtener(campo) or 0 for campo in _SUMAS},
+    }
+
+
+_UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _insertar(session):
+    """``insert`` con ``on_conflict_do_update`` del dialecto, o None si no lo tiene"""
+    return _UPSERTS.get(session.get_bind(mapper=CampanaResumenDBModel.__mapper__).dialect.name)
+
+
+def _sumar_generico(session, llave: tuple, delta: dict, ahora: datetime) -> None:
+    """UPDATE de la fila del resumen y, si no existía, INSERT (para motores sin upsert)"""
+    tabla = CampanaResumenDBModel.__table__
+    id_marca, estado, tipo_campana = llave
+    sumar = (
+        update(tabla)
+        .where(and_(tabla.c.id_marca == id_marca, tabla.c.estado == estado, tabla.c.tipo_campana == tipo_campana))
+        .values(fecha_actualizacion=ahora, **{campo: tabla.c[campo] + valor for campo, valor in delta.items()})
+    )
+    bind = {"mapper": CampanaResumenDBModel}
+    if session.execute(sumar, bind_arguments=bind).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(tabla).values(
+                id_marca=id_marca, estado=estado, tipo_campana=tipo_campana, fecha_actualizacion=ahora, **delta
+            ), bind_arguments=bind)
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT
+        session.execute(sumar, bind_arguments=bind)
+
+
+def aplicar_delta_resumen(session, antes: Optional[dict], despues: Optional[dict]) -> None:
+    """Lleva el resumen del estado ``antes`` al estado ``despues`` de una campaña
+
+    ``antes`` y ``despues`` son instantáneas (``None`` si la campaña no existía o
+    se borró). No hace commit.
+    """
+    deltas = defaultdict(lambda: dict(cantidad=0, **{campo: 0 for campo in _SUMAS}))
+    for signo, estado in ((-1, antes), (1, despues)):
+        if not estado:
+            continue
+        llave = (estado["id_marca"], estado["estado"], estado["tipo_campana"])
+        deltas[llave]["cantidad"] += signo
+        for campo in _SUMAS:
+            deltas[llave][campo] += signo * estado[campo]
+
+    deltas = {llave: delta for llave, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+
+    upsert = _insertar(session)
+    tabla = CampanaResumenDBModel.__table__
+    ahora = datetime.utcnow()
+    for (id_marca, estado, tipo_campana), delta in deltas.items():
+        if upsert is None:
+            _sumar_generico(session, (id_marca, estado, tipo_campana), delta, ahora)
+            continue
+        consulta = upsert(tabla).values(
+            id_marca=id_marca, estado=estado, tipo_campana=tipo_campana, fecha_actualizacion=ahora, **delta
+        )
+        session.execute(consulta.on_conflict_do_update(
+            index_elements=[tabla.c.id_marca, tabla.c.estado, tabla.c.tipo_campana],
+            set_={
+                **{campo: tabla.c[campo] + consulta.excluded[campo] for campo in delta},
+                "fecha_actualizacion": consulta.excluded.fecha_actualizacion,
+            }
+        ), bind_arguments={"mapper": CampanaResumenDBModel})
@@ -1,8 +1,15 @@
+import os
 from functools import singledispatch
 from abc import ABC, abstractmethod
+from typing import ClassVar
+
+from campaign_management.seedwork.aplicacion.middleware import (
+    BusMensajes, DeduplicacionEnVuelo, MetricasLatencia, RegistroLentos, ReintentoConflictos
+)
 
 class Comando:
-    ...
+    # Comandos idénticos en vuelo se ejecutan una sola vez; False para comandos cuyo efecto se acumula
+    DEDUPLICABLE: ClassVar[bool] = True
 
 class ComandoHandler(ABC):
     @abstractmethod
@@ -10,5 +17,17 @@ class ComandoHandler(ABC):
         raise NotImplementedError()
 
 @singledispatch
-def ejecutar_commando(comando):
+def _despachar_comando(comando):
     raise NotImplementedError(f'No existe implementación para el comando de tipo {type(comando).__name__}')
+
+# Se registra igual que antes (ejecutar_commando.register); la ejecución pasa por los middlewares
+ejecutar_commando = BusMensajes(_despachar_comando, [
+    MetricasLatencia('comandos'),
+    RegistroLentos(float(os.getenv('BUS_SLOW_COMMAND_MS', '500'))),
+    DeduplicacionEnVuelo(),
+    ReintentoConflictos(
+        intentos=int(os.getenv('BUS_RETRY_ATTEMPTS', '3')),
+        base_ms=float(os.getenv('BUS_RETRY_BASE_MS', '50')),
+        maximo_ms=float(os.getenv('BUS_RETRY_MAX_MS', '1000'))
+    ),
+])
@@ -0,0 +1,277 @@
+""" Pipeline de middlewares para los buses de comandos y queries del seedwork
+
+En este archivo usted encontrará el bus que envuelve a las funciones
+``singledispatch`` (``ejecutar_commando``/``ejecutar_query``) conservando su
+``register``, y los middlewares incluidos: histogramas de latencia por tipo,
+reintento ante errores de serialización/deadlock de PostgreSQL, deduplicación
+de comandos idénticos en vuelo y registro de comandos lentos.
+
+Un middleware es un invocable ``middleware(mensaje, siguiente)`` que debe
+llamar a ``siguiente(mensaje)`` para continuar la cadena. Si el handler
+devuelve un generador (listados en stream), la latencia y el registro de
+lentos se miden hasta que el generador se agota o falla.
+
+"""
+
+import bisect
+import dataclasses
+import json
+import logging
+import random
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Siguiente = Callable[[Any], Any]
+Middleware = Callable[[Any, Siguiente], Any]
+
+# SQLSTATE de PostgreSQL que indican que la transacción puede reintentarse tal cual
+CODIGOS_REINTENTABLES = frozenset({'40001', '40P01'})  # serialization_failure, deadlock_detected
+
+
+class BusMensajes:
+    """Ejecuta un despachador ``singledispatch`` a través de una cadena de middlewares"""
+
+    def __init__(self, despachador, middlewares: Optional[List[Middleware]] = None):
+        self.despachador = despachador
+        self.middlewares: List[Middleware] = list(middlewares or [])
+        # Misma API de registro que la función singledispatch envuelta
+        self.register = despachador.register
+        self.dispatch = despachador.dispatch
+        self.registry = despachador.registry
+
+    def agregar_middleware(self, middleware: Middleware) -> None:
+        self.middlewares.append(middleware)
+
+    def __call__(self, mensaje):
+        return self._ejecutar(0, mensaje)
+
+    def _ejecutar(self, posicion: int, mensaje):
+        if posicion == len(self.middlewares):
+            return self.despachador(mensaje)
+        return self.middlewares[posicion](mensaje, lambda m: self._ejecutar(posicion + 1, m))
+
+
+def _al_terminar(resultado, terminar: Callable[[bool], None]):
+    """Llama ``terminar(error)`` ahora o, si el resultado es un generador, cuando se agote o falle"""
+    if not isinstance(resultado, types.GeneratorType):
+        terminar(False)
+        return resultado
+    return _envolver_generador(resultado, terminar)
+
+
+def _envolver_generador(generador, terminar: Callable[[bool], None]):
+    error = False
+    try:
+        yield from generador
+    except Exception:
+        error = True
+        raise
+    finally:
+        terminar(error)
+
+
+# ---------------------------------------------------------------- latencia
+
+LIMITES_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_metricas: Dict[str, 'MetricasLatencia'] = {}
+
+
+class _Histograma:
+    __slots__ = ('cubetas', 'cantidad', 'suma_ms', 'maximo_ms', 'errores')
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES_MS) + 1)
+        self.cantidad = 0
+        self.suma_ms = 0.0
+        self.maximo_ms = 0.0
+        self.errores = 0
+
+    def a_dict(self) -> dict:
+        return {
+            'cantidad': self.cantidad,
+            'errores': self.errores,
+            'promedio_ms': round(self.suma_ms / self.cantidad, 3) if self.cantidad else 0.0,
+            'maximo_ms': round(self.maximo_ms, 3),
+            # Conteos por cubeta (no acumulados): hasta_X = entre el límite anterior y X ms
+            'cubetas_ms': {
+                **{f'hasta_{limite}': valor for limite, valor in zip(LIMITES_MS, self.cubetas)},
+                f'mas_de_{LIMITES_MS[-1]}': self.cubetas[-1],
+            },
+        }
+
+
+class MetricasLatencia:
+    """Histograma de latencia (ms) por tipo de mensaje, con conteo de errores"""
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._histogramas: Dict[str, _Histograma] = {}
+        self._lock = threading.Lock()
+        _metricas[nombre] = self
+
+    def __call__(self, mensaje, siguiente: Siguiente):
+        inicio = time.perf_counter()
+        tipo = type(mensaje).__name__
+
+        def terminar(error: bool) -> None:
+            self._observar(tipo, (time.perf_counter() - inicio) * 1000, error)
+
+        try:
+            resultado = siguiente(mensaje)
+        except Exception:
+            terminar(True)
+            raise
+        return _al_terminar(resultado, terminar)
+
+    def _observar(self, tipo: str, duracion_ms: float, error: bool) -> None:
+        with self._lock:
+            histograma = self._histogramas.get(tipo)
+            if histograma is None:
+                histograma = self._histogramas[tipo] = _Histograma()
+            histograma.cubetas[bisect.bisect_left(LIMITES_MS, duracion_ms)] += 1
+            histograma.cantidad += 1
+            histograma.suma_ms += duracion_ms
+            histograma.maximo_ms = max(histograma.maximo_ms, duracion_ms)
+            histograma.errores += error
+
+    def estadisticas(self) -> Dict[str, dict]:
+        with self._lock:
+            return {tipo: histograma.a_dict() for tipo, histograma in self._histogramas.items()}
+
+
+def estadisticas_buses() -> Dict[str, Dict[str, dict]]:
+    return {nombre: metricas.estadisticas() for nombre, metricas in _metricas.items()}
+
+
+# ---------------------------------------------------------------- reintentos
+
+def _sqlstate(error: BaseException) -> Optional[str]:
+    """SQLSTATE del error del driver, también si viene envuelto por SQLAlchemy (``.orig``)"""
+    for candidato in (error, getattr(error, 'orig', None), error.__cause__):
+        codigo = getattr(candidato, 'pgcode', None) or getattr(candidato, 'sqlstate', None)
+        if codigo:
+            return codigo
+    return None
+
+
+class ReintentoConflictos:
+    """Reintenta el mensaje ante serialization_failure/deadlock con backoff exponencial y jitter completo
+
+    Los handlers hacen rollback al fallar, así que reintentar repite la transacción entera.
+    """
+
+    def __init__(self, intentos: int = 3, base_ms: float = 50, maximo_ms: float = 1000):
+        self.intentos = intentos
+        self.base_ms = base_ms
+        self.maximo_ms = maximo_ms
+
+    def __call__(self, mensaje, siguiente: Siguiente):
+        intento = 0
+        while True:
+            try:
+                return siguiente(mensaje)
+            except Exception as e:
+                codigo = _sqlstate(e)
+                if codigo not in CODIGOS_REINTENTABLES or intento >= self.intentos:
+                    raise
+                espera_ms = random.uniform(0, min(self.maximo_ms, self.base_ms * (2 ** intento)))
+                intento += 1
+                logger.warning("%s falló con SQLSTATE %s; reintento %s/%s en %.0f ms",
+                               type(mensaje).__name__, codigo, intento, self.intentos, espera_ms)
+                time.sleep(espera_ms / 1000)
+
+
+# ---------------------------------------------------------------- deduplicación
+
+class _EnVuelo:
+    __slots__ = ('listo', 'resultado', 'error')
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error: Optional[BaseException] = None
+
+
+def _huella(mensaje) -> Optional[Tuple[str, str]]:
+    if not dataclasses.is_dataclass(mensaje):
+        return None
+    try:
+        contenido = json.dumps(dataclasses.asdict(mensaje), sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        return None
+    return type(mensaje).__name__, contenido
+
+
+class DeduplicacionEnVuelo:
+    """Une comandos idénticos concurrentes: el primero se ejecuta y los demás reciben su resultado
+
+    Solo mientras el primero está en curso; no es una cache. Los comandos cuyo
+    efecto se acumula (``DEDUPLICABLE = False``) siempre se ejecutan.
+    """
+
+    def __init__(self):
+        self._en_vuelo: Dict[Tuple[str, str], _EnVuelo] = {}
+        self._lock = threading.Lock()
+        self.deduplicados = 0
+
+    def __call__(self, mensaje, siguiente: Siguiente):
+        huella = _huella(mensaje) if getattr(mensaje, 'DEDUPLICABLE', True) else None
+        if huella is None:
+            return siguiente(mensaje)
+
+        with self._lock:
+            existente = self._en_vuelo.get(huella)
+            if existente is None:
+                propio = self._en_vuelo[huella] = _EnVuelo()
+            else:
+                self.deduplicados += 1
+        if existente is not None:
+            existente.listo.wait()
+            if existente.error is not None:
+                raise existente.error
+            return existente.resultado
+
+        try:
+            propio.resultado = siguiente(mensaje)
+            return propio.resultado
+        except BaseException as e:
+            propio.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_vuelo[huella]
+            propio.listo.set()
+
+
+# ---------------------------------------------------------------- lentos
+
+class RegistroLentos:
+    """Deja en el log (WARNING) los mensajes que tardan más que el umbral"""
+
+    def __init__(self, umbral_ms: float = 500, largo_maximo: int = 500):
+        self.umbral_ms = umbral_ms
+        self.largo_maximo = largo_maximo
+
+    def __call__(self, mensaje, siguiente: Siguiente):
+        inicio = time.perf_counter()
+
+        def terminar(error: bool) -> None:
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            if duracion_ms >= self.umbral_ms:
+                detalle = repr(mensaje)
+                if len(detalle) > self.largo_maximo:
+                    detalle = detalle[:self.largo_maximo] + '...'
+                logger.warning("%s lento: %.0f ms (umbral %.0f ms): %s",
+                               type(mensaje).__name__, duracion_ms, self.umbral_ms, detalle)
+
+        try:
+            resultado = siguiente(mensaje)
+        except Exception:
+            terminar(True)
+            raise
+        return _al_terminar(resultado, terminar)
@@ -1,6 +1,9 @@
+import os
 from functools import singledispatch
 from abc import ABC, abstractmethod
 
+from campaign_management.seedwork.aplicacion.middleware import BusMensajes, MetricasLatencia, RegistroLentos
+
 class Query:
     ...
 
@@ -10,5 +13,11 @@ class QueryHandler(ABC):
         raise NotImplementedError()
 
 @singledispatch
-def ejecutar_query(query):
+def _despachar_query(query):
     raise NotImplementedError(f'No existe implementación para la query de tipo {type(query).__name__}')
+
+# Se registra igual que antes (ejecutar_query.register); la ejecución pasa por los middlewares
+ejecutar_query = BusMensajes(_despachar_query, [
+    MetricasLatencia('queries'),
+    RegistroLentos(float(os.getenv('BUS_SLOW_QUERY_MS', '500'))),
+])
@@ -5,36 +5,24 @@ En este archivo usted encontrará las entidades reusables parte del seedwork del
 """
 
 from dataclasses import dataclass, field
-from .eventos import EventoDominio
+from .eventos import EventoDominio, id_inmutable
 from .mixins import ValidarReglasMixin
-from .reglas import IdEntidadEsInmutable
-from .excepciones import IdDebeSerInmutableExcepcion
 from datetime import datetime
 import uuid
 
-@dataclass
+@id_inmutable
+@dataclass(slots=True)
 class Entidad:
-    id: uuid.UUID = field(hash=True)
-    _id: uuid.UUID = field(init=False, repr=False, hash=True)
-    fecha_creacion: datetime =  field(default=datetime.now())
-    fecha_actualizacion: datetime = field(default=datetime.now())
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    fecha_creacion: datetime = field(default_factory=datetime.now)
+    fecha_actualizacion: datetime = field(default_factory=datetime.now)
 
     @classmethod
     def siguiente_id(self) -> uuid.UUID:
         return uuid.uuid4()
-
-    @property
-    def id(self):
-        return self._id
-
-    @id.setter
-    def id(self, id: uuid.UUID) -> None:
-        if not IdEntidadEsInmutable(self).es_valido():
-            raise IdDebeSerInmutableExcepcion()
-        self._id = self.siguiente_id()
         
 
-@dataclass
+@dataclass(slots=True)
 class AgregacionRaiz(Entidad, ValidarReglasMixin):
     eventos: list[EventoDominio] = field(default_factory=list)
 
@@ -45,7 +33,7 @@ class AgregacionRaiz(Entidad, ValidarReglasMixin):
         self.eventos = list()
 
 
-@dataclass
+@dataclass(slots=True)
 class Locacion(Entidad):
     def __str__(self) -> str:
         ...
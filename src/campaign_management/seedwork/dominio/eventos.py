@@ -5,28 +5,37 @@ En este archivo usted encontrará las clases para eventos reusables parte del se
 """
 
 from dataclasses import dataclass, field
-from .reglas import IdEntidadEsInmutable
 from .excepciones import IdDebeSerInmutableExcepcion
 from datetime import datetime
 import uuid
 
-@dataclass
-class EventoDominio():
-    id: uuid.UUID = field(hash=True)
-    _id: uuid.UUID = field(init=False, repr=False, hash=True)
-    fecha_evento: datetime =  field(default=datetime.now())
 
+def id_inmutable(cls):
+    """Convierte el slot ``id`` de la clase en una propiedad que solo admite la asignación del constructor
 
-    @classmethod
-    def siguiente_id(self) -> uuid.UUID:
-        return uuid.uuid4()
+    Reemplaza a la regla ``IdEntidadEsInmutable`` en la construcción: sin objeto
+    de regla ni excepción de por medio, solo se comprueba si el slot ya tiene valor.
+    """
+    cls._id = cls.__dict__['id']
 
-    @property
-    def id(self):
+    def obtener(self) -> uuid.UUID:
         return self._id
 
-    @id.setter
-    def id(self, id: uuid.UUID) -> None:
-        if not IdEntidadEsInmutable(self).es_valido():
+    def asignar(self, id: uuid.UUID) -> None:
+        if hasattr(self, '_id'):
             raise IdDebeSerInmutableExcepcion()
-        self._id = self.siguiente_id()
+        self._id = id
+
+    cls.id = property(obtener, asignar)
+    return cls
+
+
+@id_inmutable
+@dataclass(slots=True)
+class EventoDominio():
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    fecha_evento: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def siguiente_id(self) -> uuid.UUID:
+        return uuid.uuid4()
@@ -8,6 +8,7 @@ from abc import ABC, abstractmethod
 from .reglas import ReglaNegocio, ReglaNegocioExcepcion
 
 class ValidarReglasMixin(ABC):
+    __slots__ = ()
 
     def validar_regla(self, regla: ReglaNegocio):
         if not regla.es_valido():
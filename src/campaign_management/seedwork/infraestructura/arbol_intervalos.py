@@ -0,0 +1,138 @@
+""" Árbol de intervalos en memoria reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará un árbol de intervalos cerrados [inicio, fin]
+implementado como treap aumentado: cada nodo guarda el mayor ``fin`` de su
+subárbol, lo que permite podar las ramas que no pueden solaparse. Inserción y
+borrado son O(log n) esperados y la consulta de solapamiento O(log n + k).
+No es seguro para hilos; quien lo comparta debe sincronizar el acceso.
+
+"""
+
+import random
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class _Nodo:
+    __slots__ = ('llave', 'fin', 'prioridad', 'max_fin', 'izquierdo', 'derecho')
+
+    def __init__(self, llave: Tuple[Any, Any], fin: Any):
+        self.llave = llave
+        self.fin = fin
+        self.prioridad = random.random()
+        self.max_fin = fin
+        self.izquierdo: Optional['_Nodo'] = None
+        self.derecho: Optional['_Nodo'] = None
+
+    def recalcular(self):
+        max_fin = self.fin
+        if self.izquierdo is not None and self.izquierdo.max_fin > max_fin:
+            max_fin = self.izquierdo.max_fin
+        if self.derecho is not None and self.derecho.max_fin > max_fin:
+            max_fin = self.derecho.max_fin
+        self.max_fin = max_fin
+
+
+def _dividir(nodo: Optional[_Nodo], llave) -> Tuple[Optional[_Nodo], Optional[_Nodo]]:
+    """Separa en (< llave, >= llave)"""
+    if nodo is None:
+        return None, None
+    if nodo.llave < llave:
+        menor, mayor = _dividir(nodo.derecho, llave)
+        nodo.derecho = menor
+        nodo.recalcular()
+        return nodo, mayor
+    menor, mayor = _dividir(nodo.izquierdo, llave)
+    nodo.izquierdo = mayor
+    nodo.recalcular()
+    return menor, nodo
+
+
+def _unir(a: Optional[_Nodo], b: Optional[_Nodo]) -> Optional[_Nodo]:
+    """Une dos treaps donde todas las llaves de ``a`` son menores que las de ``b``"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prioridad > b.prioridad:
+        a.derecho = _unir(a.derecho, b)
+        a.recalcular()
+        return a
+    b.izquierdo = _unir(a, b.izquierdo)
+    b.recalcular()
+    return b
+
+
+class ArbolIntervalos:
+    """Intervalos cerrados identificados por un id; un id tiene a lo más un intervalo"""
+
+    def __init__(self):
+        self._raiz: Optional[_Nodo] = None
+        self._intervalos: Dict[Hashable, Tuple[Any, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._intervalos)
+
+    def __contains__(self, id_intervalo: Hashable) -> bool:
+        return id_intervalo in self._intervalos
+
+    def guardar(self, id_intervalo: Hashable, inicio, fin) -> None:
+        """Inserta o reemplaza el intervalo del id"""
+        if fin < inicio:
+            raise ValueError("El fin del intervalo no puede ser anterior al inicio")
+        self.eliminar(id_intervalo)
+        llave = (inicio, id_intervalo)
+        menor, mayor = _dividir(self._raiz, llave)
+        self._raiz = _unir(_unir(menor, _Nodo(llave, fin)), mayor)
+        self._intervalos[id_intervalo] = (inicio, fin)
+
+    def eliminar(self, id_intervalo: Hashable) -> bool:
+        intervalo = self._intervalos.pop(id_intervalo, None)
+        if intervalo is None:
+            return False
+        llave = (intervalo[0], id_intervalo)
+        menor, resto = _dividir(self._raiz, llave)
+        # ``resto`` empieza por la llave buscada: se separa quitando su mínimo
+        _, mayor = _dividir_minimo(resto)
+        self._raiz = _unir(menor, mayor)
+        return True
+
+    def limpiar(self) -> None:
+        self._raiz = None
+        self._intervalos.clear()
+
+    def solapados(self, desde, hasta) -> List[Hashable]:
+        """Ids cuyos intervalos se solapan con [desde, hasta], ordenados por inicio"""
+        resultado: List[Hashable] = []
+        pila: List[_Nodo] = []
+        nodo = self._raiz
+        while pila or nodo is not None:
+            # Se baja por la izquierda mientras alguna rama pueda terminar después de ``desde``
+            while nodo is not None and nodo.max_fin >= desde:
+                pila.append(nodo)
+                nodo = nodo.izquierdo
+            if not pila:
+                break
+            nodo = pila.pop()
+            inicio = nodo.llave[0]
+            if inicio > hasta:
+                # Todo lo que sigue en orden empieza aún más tarde
+                break
+            if nodo.fin >= desde:
+                resultado.append(nodo.llave[1])
+            nodo = nodo.derecho
+        return resultado
+
+
+def _dividir_minimo(nodo: Optional[_Nodo]) -> Tuple[Optional[_Nodo], Optional[_Nodo]]:
+    """Separa el nodo de menor llave del resto"""
+    if nodo is None:
+        return None, None
+    if nodo.izquierdo is None:
+        resto = nodo.derecho
+        nodo.derecho = None
+        nodo.recalcular()
+        return nodo, resto
+    minimo, resto = _dividir_minimo(nodo.izquierdo)
+    nodo.izquierdo = resto
+    nodo.recalcular()
+    return minimo, nodo
@@ -0,0 +1,98 @@
+""" Cache en memoria reusable parte del seedwork del proyecto
+
+En este archivo usted encontrará una cache LRU con expiración (TTL) segura para
+hilos, y un registro de caches con nombre para exponer sus contadores
+
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_AUSENTE = object()
+
+
+class CacheLRUTTL:
+    """Cache acotada por número de entradas (LRU) y por antigüedad (TTL)"""
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: Optional[float] = None):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expiraciones = 0
+
+    def obtener(self, llave: Hashable, defecto: Any = None) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(llave, _AUSENTE)
+            if entrada is _AUSENTE:
+                self.fallos += 1
+                return defecto
+            valor, vence = entrada
+            if vence is not None and vence <= time.monotonic():
+                del self._entradas[llave]
+                self.expiraciones += 1
+                self.fallos += 1
+                return defecto
+            self._entradas.move_to_end(llave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, llave: Hashable, valor: Any, ttl_segundos: Optional[float] = None):
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        vence = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entradas[llave] = (valor, vence)
+            self._entradas.move_to_end(llave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, llave: Hashable):
+        with self._lock:
+            self._entradas.pop(llave, None)
+
+    def invalidar_si(self, llave: Hashable, condicion: Callable[[Any], bool]) -> bool:
+        """Quita la entrada solo si ``condicion(valor)`` es verdadera; devuelve si la quitó"""
+        with self._lock:
+            entrada = self._entradas.get(llave, _AUSENTE)
+            if entrada is _AUSENTE or not condicion(entrada[0]):
+                return False
+            del self._entradas[llave]
+            return True
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "expiraciones": self.expiraciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+_caches: Dict[str, CacheLRUTTL] = {}
+
+
+def registrar_cache(nombre: str, cache: CacheLRUTTL) -> CacheLRUTTL:
+    _caches[nombre] = cache
+    return cache
+
+
+def estadisticas_caches() -> Dict[str, Dict[str, Any]]:
+    return {nombre: cache.estadisticas() for nombre, cache in _caches.items()}
@@ -0,0 +1,289 @@
+""" Codecs de mensajes reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará los codecs con los que se codifica el sobre
+de los mensajes (saga_id, service, status, event_type, event_data...): JSON
+UTF-8 y un formato binario compacto con ``struct``. El productor marca cada
+mensaje con la propiedad ``content-type``; el consumidor elige el codec por esa
+propiedad y, si no viene, lo detecta por los bytes mágicos del formato binario,
+de modo que productores y consumidores pueden migrar por separado.
+
+Formato binario (little endian)::
+
+    'CMB' | versión (u8) | valor
+
+    valor := etiqueta (u8) + contenido
+      NULO, FALSO, VERDADERO       sin contenido
+      ENTERO                       i64
+      ENTERO_GRANDE                u32 largo + dígitos ASCII
+      REAL                         f64
+      TEXTO                        u16 largo + UTF-8
+      TEXTO_LARGO                  u32 largo + UTF-8
+      UUID                         16 bytes (texto UUID canónico en minúsculas)
+      LISTA                        u32 cantidad + valores
+      MAPA                         u32 cantidad + (clave + valor)...
+    clave := u8 índice en la tabla de claves de la versión
+           | 0xFF + u16 largo + UTF-8
+
+La tabla de claves es parte del esquema: solo se agregan claves al final y
+cualquier otro cambio requiere una versión nueva.
+
+"""
+
+import json
+import os
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from campaign_management.seedwork.infraestructura.serializacion import a_json
+
+PROPIEDAD_CONTENT_TYPE = 'content-type'
+
+MAGIA = b'CMB'
+VERSION = 1
+
+# Claves frecuentes del sobre y de los eventos de campañas; el índice viaja en un byte
+CLAVES_V1 = (
+    'saga_id', 'service', 'status', 'event_type', 'event_data', 'event_id', 'timestamp',
+    'aggregate_id', 'aggregate_type', 'version', 'metadata', 'data',
+    'id', 'id_campana', 'id_marca', 'nombre', 'descripcion', 'tipo_campana', 'objetivo', 'estado',
+    'fecha_inicio', 'fecha_fin', 'presupuesto_total', 'presupuesto_utilizado',
+    'meta_ventas', 'ventas_actuales', 'meta_engagement', 'engagement_actual',
+    'target_audiencia', 'canales_distribucion', 'terminos_condiciones',
+    'fecha_creacion', 'fecha_ultima_actividad', 'fecha_actualizacion', 'fecha_evento',
+    'fecha_programacion', 'fecha_activacion', 'fecha_pausa', 'fecha_finalizacion', 'fecha_cancelacion',
+    'motivo',
+)
+_TABLAS_CLAVES = {1: CLAVES_V1}
+
+(NULO, FALSO, VERDADERO, ENTERO, ENTERO_GRANDE, REAL,
+ TEXTO, TEXTO_LARGO, UUID, LISTA, MAPA) = range(11)
+CLAVE_LITERAL = 0xFF
+assert len(CLAVES_V1) < CLAVE_LITERAL
+
+_ENCABEZADO = struct.Struct('<3sB')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_ETIQUETA_U16 = struct.Struct('<BH')
+_ETIQUETA_U32 = struct.Struct('<BI')
+_ETIQUETA_I64 = struct.Struct('<Bq')
+_ETIQUETA_F64 = struct.Struct('<Bd')
+_MIN_I64, _MAX_I64 = -2 ** 63, 2 ** 63 - 1
+_BYTE_NULO, _BYTE_FALSO, _BYTE_VERDADERO, _BYTE_UUID = (bytes([etiqueta]) for etiqueta in (NULO, FALSO, VERDADERO, UUID))
+
+
+class ErrorCodec(ValueError):
+    """Mensaje que no se puede codificar o decodificar con el codec elegido"""
+
+
+class CodecJSON:
+    nombre = 'json'
+    content_type = 'application/json'
+
+    def codificar(self, mensaje: Dict[str, Any]) -> bytes:
+        return a_json(mensaje).encode('utf-8')
+
+    def decodificar(self, datos: bytes) -> Dict[str, Any]:
+        return json.loads(datos)
+
+
+_HEX = frozenset('0123456789abcdef')
+
+
+def _uuid_a_bytes(texto: str) -> Optional[bytes]:
+    """16 bytes del UUID si el texto es canónico (minúsculas, con guiones), para que al decodificar se reconstruya idéntico"""
+    if len(texto) != 36 or texto[8] != '-' or texto[13] != '-' or texto[18] != '-' or texto[23] != '-':
+        return None
+    hexadecimal = texto[:8] + texto[9:13] + texto[14:18] + texto[19:23] + texto[24:]
+    if not _HEX.issuperset(hexadecimal):
+        return None
+    return bytes.fromhex(hexadecimal)
+
+
+def _bytes_a_uuid(datos) -> str:
+    h = datos.hex()
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+class CodecBinario:
+    nombre = 'binary'
+    content_type = f'application/x-campaign-envelope; v={VERSION}'
+
+    def __init__(self, version: int = VERSION):
+        self.version = version
+        self._claves = _TABLAS_CLAVES[version]
+        # Clave -> byte ya empaquetado con su índice
+        self._indices = {clave: bytes([indice]) for indice, clave in enumerate(self._claves)}
+
+    # -------------------------------------------------------------- codificación
+
+    def codificar(self, mensaje: Dict[str, Any]) -> bytes:
+        partes: List[bytes] = [_ENCABEZADO.pack(MAGIA, self.version)]
+        self._valor(mensaje, partes)
+        return b''.join(partes)
+
+    def _valor(self, valor, partes: List[bytes]) -> None:
+        tipo = valor.__class__
+        if tipo is str:
+            crudo = _uuid_a_bytes(valor)
+            if crudo is not None:
+                partes.append(_BYTE_UUID)
+                partes.append(crudo)
+                return
+            datos = valor.encode('utf-8')
+            if len(datos) <= 0xFFFF:
+                partes.append(_ETIQUETA_U16.pack(TEXTO, len(datos)))
+            else:
+                partes.append(_ETIQUETA_U32.pack(TEXTO_LARGO, len(datos)))
+            partes.append(datos)
+        elif valor is None:
+            partes.append(_BYTE_NULO)
+        elif tipo is bool:
+            partes.append(_BYTE_VERDADERO if valor else _BYTE_FALSO)
+        elif tipo is int:
+            if _MIN_I64 <= valor <= _MAX_I64:
+                partes.append(_ETIQUETA_I64.pack(ENTERO, valor))
+            else:
+                digitos = str(valor).encode('ascii')
+                partes.append(_ETIQUETA_U32.pack(ENTERO_GRANDE, len(digitos)))
+                partes.append(digitos)
+        elif tipo is float:
+            partes.append(_ETIQUETA_F64.pack(REAL, valor))
+        elif tipo is dict:
+            partes.append(_ETIQUETA_U32.pack(MAPA, len(valor)))
+            for clave, contenido in valor.items():
+                self._clave(clave, partes)
+                self._valor(contenido, partes)
+        elif tipo is list or tipo is tuple:
+            partes.append(_ETIQUETA_U32.pack(LISTA, len(valor)))
+            for contenido in valor:
+                self._valor(contenido, partes)
+        else:
+            # El mensaje llega ya convertido a tipos JSON (ver serializacion.codificar)
+            raise ErrorCodec(f"Tipo no soportado por el codec binario: {tipo.__name__}")
+
+    def _clave(self, clave: str, partes: List[bytes]) -> None:
+        indice = self._indices.get(clave)
+        if indice is not None:
+            partes.append(indice)
+            return
+        if clave.__class__ is not str:
+            raise ErrorCodec(f"Las claves deben ser texto, no {clave.__class__.__name__}")
+        datos = clave.encode('utf-8')
+        partes.append(_ETIQUETA_U16.pack(CLAVE_LITERAL, len(datos)))
+        partes.append(datos)
+
+    # -------------------------------------------------------------- decodificación
+
+    def decodificar(self, datos: bytes) -> Dict[str, Any]:
+        datos = memoryview(datos)
+        if len(datos) < _ENCABEZADO.size:
+            raise ErrorCodec("Mensaje binario truncado")
+        magia, version = _ENCABEZADO.unpack_from(datos, 0)
+        if magia != MAGIA:
+            raise ErrorCodec("El mensaje no tiene el encabezado del formato binario")
+        claves = _TABLAS_CLAVES.get(version)
+        if claves is None:
+            raise ErrorCodec(f"Versión de esquema binario desconocida: {version}")
+        try:
+            valor, posicion = _leer_valor(datos, _ENCABEZADO.size, claves)
+        except (struct.error, IndexError, UnicodeDecodeError, RecursionError) as e:
+            raise ErrorCodec(f"Mensaje binario corrupto: {e}") from e
+        if posicion != len(datos):
+            raise ErrorCodec("Bytes sobrantes al final del mensaje binario")
+        return valor
+
+
+def _leer_texto(datos: memoryview, posicion: int, largo: int) -> Tuple[str, int]:
+    fin = posicion + largo
+    if fin > len(datos):
+        raise IndexError("texto fuera del mensaje")
+    return str(datos[posicion:fin], 'utf-8'), fin
+
+
+def _leer_valor(datos: memoryview, posicion: int, claves: Tuple[str, ...]) -> Tuple[Any, int]:
+    etiqueta = datos[posicion]
+    posicion += 1
+    if etiqueta == TEXTO:
+        (largo,) = _U16.unpack_from(datos, posicion)
+        return _leer_texto(datos, posicion + 2, largo)
+    if etiqueta == UUID:
+        fin = posicion + 16
+        if fin > len(datos):
+            raise IndexError("uuid fuera del mensaje")
+        return _bytes_a_uuid(datos[posicion:fin]), fin
+    if etiqueta == MAPA:
+        (cantidad,) = _U32.unpack_from(datos, posicion)
+        posicion += 4
+        mapa = {}
+        for _ in range(cantidad):
+            indice = datos[posicion]
+            if indice == CLAVE_LITERAL:
+                (largo,) = _U16.unpack_from(datos, posicion + 1)
+                clave, posicion = _leer_texto(datos, posicion + 3, largo)
+            else:
+                clave = claves[indice]
+                posicion += 1
+            mapa[clave], posicion = _leer_valor(datos, posicion, claves)
+        return mapa, posicion
+    if etiqueta == NULO:
+        return None, posicion
+    if etiqueta == ENTERO:
+        return _I64.unpack_from(datos, posicion)[0], posicion + 8
+    if etiqueta == REAL:
+        return _F64.unpack_from(datos, posicion)[0], posicion + 8
+    if etiqueta == VERDADERO:
+        return True, posicion
+    if etiqueta == FALSO:
+        return False, posicion
+    if etiqueta == LISTA:
+        (cantidad,) = _U32.unpack_from(datos, posicion)
+        posicion += 4
+        lista = []
+        for _ in range(cantidad):
+            valor, posicion = _leer_valor(datos, posicion, claves)
+            lista.append(valor)
+        return lista, posicion
+    if etiqueta == TEXTO_LARGO:
+        (largo,) = _U32.unpack_from(datos, posicion)
+        return _leer_texto(datos, posicion + 4, largo)
+    if etiqueta == ENTERO_GRANDE:
+        (largo,) = _U32.unpack_from(datos, posicion)
+        texto, posicion = _leer_texto(datos, posicion + 4, largo)
+        return int(texto), posicion
+    raise ErrorCodec(f"Etiqueta desconocida en el mensaje binario: {etiqueta}")
+
+
+codec_json = CodecJSON()
+codec_binario = CodecBinario()
+
+CODECS = {codec.nombre: codec for codec in (codec_json, codec_binario)}
+_POR_CONTENT_TYPE = {codec.content_type: codec for codec in CODECS.values()}
+
+
+def codec_configurado(nombre: Optional[str] = None):
+    """Codec con el que publica este proceso (``PULSAR_MESSAGE_CODEC``: json o binary, default json)"""
+    nombre = (nombre or os.getenv('PULSAR_MESSAGE_CODEC', 'json')).lower()
+    if nombre not in CODECS:
+        raise ValueError(f"Codec de mensajes desconocido '{nombre}'. Opciones: {', '.join(CODECS)}")
+    return CODECS[nombre]
+
+
+def propiedades_mensaje(codec) -> Dict[str, str]:
+    return {PROPIEDAD_CONTENT_TYPE: codec.content_type}
+
+
+def decodificar_mensaje(datos: bytes, propiedades: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Decodifica según ``content-type`` y, sin esa propiedad, según los bytes mágicos"""
+    content_type = (propiedades or {}).get(PROPIEDAD_CONTENT_TYPE)
+    if content_type:
+        codec = _POR_CONTENT_TYPE.get(content_type)
+        if codec is None and content_type.startswith('application/x-campaign-envelope'):
+            # Otra versión del formato binario: la versión real viaja en el encabezado
+            codec = codec_binario
+        if codec is not None:
+            return codec.decodificar(datos)
+    if datos[:len(MAGIA)] == MAGIA:
+        return codec_binario.decodificar(datos)
+    return codec_json.decodificar(datos)
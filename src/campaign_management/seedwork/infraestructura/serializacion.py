@@ -0,0 +1,134 @@
+""" Serializadores de eventos reusables parte del seedwork del proyecto
+
+En este archivo usted encontrará el registro de serializadores que, la primera
+vez que ve una clase de evento (dataclass), genera una función específica que
+la convierte en un dict listo para ``json.dumps``: campos en orden fijo, UUID a
+``str`` y fechas a ``isoformat()`` directamente según la anotación del campo,
+sin recorrer el objeto por reflexión ni pasar por un callback ``default=``.
+
+"""
+
+import dataclasses
+import json
+import threading
+import typing
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict
+
+Codificador = Callable[[Any], Dict[str, Any]]
+
+_NATIVOS = (str, int, float, bool, type(None))
+
+# Anotación -> expresión que convierte ``{v}`` cuando el valor es del tipo anotado;
+# cualquier otro valor (None incluido) pasa por ``_valor``
+_EXPRESIONES = {
+    uuid.UUID: '(str({v}) if {v}.__class__ is _UUID else _valor({v}))',
+    datetime: '({v}.isoformat() if {v}.__class__ is _datetime else _valor({v}))',
+    date: '({v}.isoformat() if {v}.__class__ is _date else _valor({v}))',
+    str: '({v} if {v}.__class__ is str else _valor({v}))',
+    int: '({v} if {v}.__class__ is int else _valor({v}))',
+    float: '({v} if {v}.__class__ is float else _valor({v}))',
+    bool: '({v} if {v}.__class__ is bool else _valor({v}))',
+}
+
+
+def _valor(v):
+    """Conversión genérica para valores cuyo tipo no coincide con la anotación"""
+    if isinstance(v, _NATIVOS):
+        return v
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, Enum):
+        return _valor(v.value)
+    if isinstance(v, dict):
+        return {str(llave): _valor(valor) for llave, valor in v.items()}
+    if isinstance(v, (list, tuple, set, frozenset)):
+        return [_valor(valor) for valor in v]
+    if isinstance(v, Decimal):
+        return float(v)
+    if dataclasses.is_dataclass(v) and not isinstance(v, type):
+        return serializadores.codificar(v)
+    # Mismo resultado que el antiguo ``default=str`` para tipos no previstos
+    return str(v)
+
+
+def _tipo_anotado(anotacion):
+    """``Optional[X]`` -> X; otras uniones o genéricos quedan sin tipo conocido"""
+    if typing.get_origin(anotacion) is typing.Union:
+        tipos = [tipo for tipo in typing.get_args(anotacion) if tipo is not type(None)]
+        return tipos[0] if len(tipos) == 1 else None
+    return anotacion
+
+
+class RegistroSerializadores:
+    """Codificadores generados por clase, creados en el primer uso"""
+
+    def __init__(self):
+        self._codificadores: Dict[type, Codificador] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, tipo: type, codificador: Codificador) -> None:
+        """Reemplaza el codificador generado de una clase por uno propio"""
+        self._codificadores[tipo] = codificador
+
+    def codificador(self, tipo: type) -> Codificador:
+        codificador = self._codificadores.get(tipo)
+        if codificador is None:
+            with self._lock:
+                codificador = self._codificadores.get(tipo)
+                if codificador is None:
+                    codificador = self._codificadores[tipo] = self._generar(tipo)
+        return codificador
+
+    def codificar(self, objeto) -> Dict[str, Any]:
+        return self.codificador(type(objeto))(objeto)
+
+    @staticmethod
+    def _generar(tipo: type) -> Codificador:
+        if not dataclasses.is_dataclass(tipo):
+            return lambda objeto: _valor(vars(objeto))
+        try:
+            anotaciones = typing.get_type_hints(tipo)
+        except Exception:
+            anotaciones = {}
+        campos = dataclasses.fields(tipo)
+        # Cada campo se lee una sola vez en una variable local y el dict se arma en un solo literal
+        lecturas = [f'    v{i} = o.{campo.name}' for i, campo in enumerate(campos)]
+        entradas = [
+            f'        {campo.name!r}: ' + _EXPRESIONES.get(
+                _tipo_anotado(anotaciones.get(campo.name)), '_valor({v})'
+            ).format(v=f'v{i}') + ','
+            for i, campo in enumerate(campos)
+        ]
+        fuente = 'def codificar(o):\n' + '\n'.join(lecturas) + '\n    return {\n' + '\n'.join(entradas) + '\n    }\n'
+        espacio = {'_valor': _valor, '_UUID': uuid.UUID, '_datetime': datetime, '_date': date}
+        exec(compile(fuente, f'<serializador {tipo.__qualname__}>', 'exec'), espacio)
+        codificar = espacio['codificar']
+        codificar.__qualname__ = f'codificar_{tipo.__name__}'
+        return codificar
+
+
+serializadores = RegistroSerializadores()
+
+
+def codificar(objeto) -> Dict[str, Any]:
+    """Dict listo para JSON de un evento o comando, con el codificador de su clase"""
+    return serializadores.codificar(objeto)
+
+
+def valor_json(valor):
+    """Convierte un valor suelto (UUID, fecha, dict anidado...) a su forma JSON"""
+    return _valor(valor)
+
+
+def a_json(valor) -> str:
+    """``json.dumps`` sin ``default=``: si aparece un tipo que json no conoce, el valor se convierte antes y se reintenta"""
+    try:
+        return json.dumps(valor)
+    except TypeError:
+        return json.dumps(_valor(valor))
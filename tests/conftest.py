@@ -0,0 +1,87 @@
+"""Fixtures compartidas de las pruebas
+
+Las pruebas corren contra ``TEST_DATABASE_URL`` (p. ej. una base PostgreSQL
+desechable). Sin ella se usa un archivo SQLite temporal, donde las columnas
+UUID de PostgreSQL se guardan como CHAR(32). No necesitan un broker de
+Pulsar: la app se crea sin iniciar los consumidores de eventos ni el
+verificador de salud.
+"""
+
+import os
+import sys
+import uuid
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Antes de importar la app: la configuración se lee al importar los módulos
+os.environ['HEALTH_CHECK_ENABLED'] = 'false'
+
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(UUID, 'sqlite')
+def _uuid_sqlite(tipo, compilador, **kw):
+    return 'CHAR(32)'
+
+
+def _savepoints_sqlite(engine):
+    """pysqlite no emite BEGIN: sin él, liberar el primer SAVEPOINT confirma la transacción
+
+    BEGIN IMMEDIATE toma el lock de escritura al empezar, para que dos hilos que
+    leen y luego escriben no se bloqueen entre sí.
+    """
+    @event.listens_for(engine, 'connect')
+    def _sin_transaccion_implicita(conexion_dbapi, registro):
+        conexion_dbapi.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conexion):
+        conexion.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        # timeout: los hilos de las pruebas de concurrencia esperan el lock de escritura de SQLite
+        url = f"sqlite:///{tmp_path_factory.mktemp('db') / 'campaigns.db'}?timeout=30"
+    os.environ['DATABASE_URL'] = url
+    os.environ.pop('READ_DATABASE_URL', None)
+
+    from campaign_management.main import create_app
+    from campaign_management.config.db import db
+    from campaign_management.infraestructura.event_consumer_service import EventConsumerService
+    import campaign_management.infraestructura.outbox.model  # noqa: F401
+    import campaign_management.modulos.campaign_management.infraestructura.modelos_read  # noqa: F401
+
+    with mock.patch.object(EventConsumerService, 'start_consuming'):
+        app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            _savepoints_sqlite(db.engine)
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def campana_activa(app):
+    """Id de una campaña nueva en estado activa, sin métricas"""
+    from campaign_management.config.db import db
+    from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+
+    with app.app_context():
+        campana = CampanaDBModel(
+            id=uuid.uuid4(), id_marca=uuid.uuid4(), nombre='Campaña de prueba',
+            tipo_campana='lealtad', objetivo='ventas', estado='activa'
+        )
+        db.session.add(campana)
+        db.session.commit()
+        return campana.id
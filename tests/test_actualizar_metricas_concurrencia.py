@@ -0,0 +1,68 @@
+"""Incrementos concurrentes de métricas sobre una misma campaña
+
+Varios hilos aplican incrementos a la vez por el bus de comandos; como la suma
+la resuelve la base en un único UPDATE condicional, ninguno debe perderse.
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import func, select
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import ActualizarMetricasCampana
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.seedwork.aplicacion.comandos import ejecutar_commando
+
+HILOS = 8
+INCREMENTOS_POR_HILO = 25
+
+
+def test_incrementos_concurrentes_no_se_pierden(app, campana_activa):
+    inicio = threading.Barrier(HILOS)
+    errores = []
+
+    def trabajar():
+        with app.app_context():
+            inicio.wait()
+            for _ in range(INCREMENTOS_POR_HILO):
+                try:
+                    ejecutar_commando(ActualizarMetricasCampana(
+                        id_campana=str(campana_activa), ventas=1, engagement=2, presupuesto_utilizado=0.5
+                    ))
+                except Exception as e:
+                    errores.append(e)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(HILOS)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    total = HILOS * INCREMENTOS_POR_HILO
+    with app.app_context():
+        campana = db.session.get(CampanaDBModel, campana_activa)
+        assert campana.ventas_actuales == total
+        assert campana.engagement_actual == 2 * total
+        assert campana.presupuesto_utilizado == 0.5 * total
+        eventos = db.session.execute(
+            select(func.count()).select_from(OutboxEvent).where(
+                OutboxEvent.aggregate_id == campana_activa,
+                OutboxEvent.event_type == 'CampaignMetricsUpdated'
+            )
+        ).scalar_one()
+        assert eventos == total
+
+
+def test_incremento_sobre_campana_no_activa_no_cambia_nada(app, campana_activa):
+    with app.app_context():
+        db.session.get(CampanaDBModel, campana_activa).estado = 'pausada'
+        db.session.commit()
+
+        with pytest.raises(ValueError, match='pausada'):
+            ejecutar_commando(ActualizarMetricasCampana(id_campana=str(campana_activa), ventas=5))
+
+        db.session.expire_all()
+        assert db.session.get(CampanaDBModel, campana_activa).ventas_actuales == 0
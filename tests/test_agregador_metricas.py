@@ -0,0 +1,49 @@
+"""Vaciado del agregador write-behind de métricas ante errores"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from campaign_management.config.db import db
+from campaign_management.modulos.campaign_management.aplicacion.agregador_metricas import AgregadorMetricas
+from campaign_management.modulos.campaign_management.aplicacion.handlers import actualizar_metricas_campana_handler
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+
+
+def _ventas(app, id_campana):
+    with app.app_context():
+        return db.session.get(CampanaDBModel, id_campana).ventas_actuales
+
+
+def test_error_transitorio_reencola_los_incrementos(app, campana_activa, monkeypatch):
+    agregador = AgregadorMetricas(app)
+    agregador.registrar(campana_activa, ventas=2)
+    agregador.registrar(campana_activa, ventas=3)
+
+    original = actualizar_metricas_campana_handler.incrementar_metricas_campana
+
+    def base_caida(*args, **kwargs):
+        raise OperationalError('UPDATE campaigns', {}, Exception('server closed the connection unexpectedly'))
+
+    monkeypatch.setattr(actualizar_metricas_campana_handler, 'incrementar_metricas_campana', base_caida)
+    agregador._vaciar(agregador._tomar_pendientes())
+    assert _ventas(app, campana_activa) == 0
+
+    # Lo que llega mientras tanto se suma a lo reencolado
+    agregador.registrar(campana_activa, ventas=1)
+    monkeypatch.setattr(actualizar_metricas_campana_handler, 'incrementar_metricas_campana', original)
+    agregador._vaciar(agregador._tomar_pendientes())
+    assert _ventas(app, campana_activa) == 6
+
+
+@pytest.mark.parametrize('estado', ['pausada', 'finalizada'])
+def test_rechazo_del_dominio_descarta_los_incrementos(app, campana_activa, estado):
+    with app.app_context():
+        db.session.get(CampanaDBModel, campana_activa).estado = estado
+        db.session.commit()
+
+    agregador = AgregadorMetricas(app)
+    agregador.registrar(campana_activa, ventas=4)
+    agregador._vaciar(agregador._tomar_pendientes())
+
+    assert agregador._tomar_pendientes() == {}
+    assert _ventas(app, campana_activa) == 0
@@ -0,0 +1,24 @@
+"""Validación del body de POST /campaigns/ids"""
+
+import pytest
+
+
+@pytest.mark.parametrize('body', [
+    {'ids': 'no-es-lista'},
+    {'ids': [1, 2]},
+    {'ids': ['a'], 'fields': 'nombre'},
+    {'ids': ['a'], 'fields': ['nombre', 3]},
+    [{'ids': ['a']}],
+])
+def test_body_invalido_responde_400(app, body):
+    respuesta = app.test_client().post('/campaign-management/campaigns/ids', json=body)
+    assert respuesta.status_code == 400
+    assert 'error' in respuesta.get_json()
+
+
+def test_campana_existente_con_campos(app, campana_activa):
+    respuesta = app.test_client().post(
+        '/campaign-management/campaigns/ids', json={'ids': [str(campana_activa)], 'fields': ['nombre']}
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.get_json() == {'items': [{'nombre': 'Campaña de prueba'}], 'faltantes': []}
@@ -0,0 +1,25 @@
+"""Validación del body de PUT /campaigns/marca/<id_marca>/<accion>"""
+
+import uuid
+
+import pytest
+
+
+@pytest.mark.parametrize('body', [
+    {'estados': 'activa'},
+    {'estados': [{'a': 1}]},
+    {'estados': ['activa', 1]},
+    [{'estados': ['activa']}],
+])
+def test_body_invalido_responde_400(app, body):
+    respuesta = app.test_client().put(f'/campaign-management/campaigns/marca/{uuid.uuid4()}/pausar', json=body)
+    assert respuesta.status_code == 400
+    assert 'error' in respuesta.get_json()
+
+
+def test_estados_validos_transicionan(app):
+    respuesta = app.test_client().put(
+        f'/campaign-management/campaigns/marca/{uuid.uuid4()}/pausar', json={'estados': ['activa'], 'motivo': 'Revisión'}
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.get_json() == {'accion': 'pausar', 'afectadas': 0, 'ids': []}
@@ -0,0 +1,42 @@
+"""Cache de ``get_by_id`` del repositorio de campañas
+
+Las lecturas repetidas se sirven de la cache; una escritura del propio proceso
+la invalida al confirmarse, y un evento consumido solo si trae una versión
+más nueva que la guardada.
+"""
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.repositories import SQLAlchemyCampaignRepository
+from campaign_management.infraestructura.repositories_cache import (
+    CachedCampaignRepository, campaign_cache, invalidate_campaign
+)
+from campaign_management.modulos.campaign_management.aplicacion.handlers.transiciones_campana import transicionar_campana
+
+
+def test_lecturas_repetidas_aciertan_y_una_escritura_invalida(app, campana_activa):
+    campaign_cache.limpiar()
+    with app.app_context():
+        repositorio = CachedCampaignRepository(SQLAlchemyCampaignRepository(db.session))
+        aciertos = campaign_cache.aciertos
+
+        assert repositorio.get_by_id(campana_activa)["estado"] == "activa"
+        assert repositorio.get_by_id(campana_activa)["estado"] == "activa"
+        assert repositorio.get_by_id(campana_activa)["estado"] == "activa"
+        assert campaign_cache.aciertos - aciertos == 2
+
+        # UPDATE directo del motor de transiciones: la cache se limpia al hacer commit
+        transicionar_campana("pausar", campana_activa)
+        assert repositorio.get_by_id(campana_activa)["estado"] == "pausada"
+        assert campaign_cache.aciertos - aciertos == 2
+
+
+def test_evento_consumido_invalida_solo_si_es_mas_nuevo(app, campana_activa):
+    campaign_cache.limpiar()
+    with app.app_context():
+        repositorio = CachedCampaignRepository(SQLAlchemyCampaignRepository(db.session))
+        version = repositorio.get_by_id(campana_activa)["version"]
+
+        assert not invalidate_campaign(campana_activa, version)
+        assert not invalidate_campaign(campana_activa, version - 1)
+        assert invalidate_campaign(campana_activa, version + 1)
+        assert len(campaign_cache) == 0
@@ -0,0 +1,137 @@
+"""Commit agrupado del bus de comandos
+
+Cada comando del lote corre en su SAVEPOINT y el líder hace un único COMMIT;
+los comandos que llegan mientras se ejecuta un lote los toma el siguiente
+líder, promovido por el anterior.
+"""
+
+import threading
+import time
+import uuid
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.commit_grupal import CommitGrupal
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+
+ESPERA_MAXIMA = 10
+
+
+class ComandoPrueba:
+    def __init__(self, nombre, fallar=False):
+        self.nombre = nombre
+        self.fallar = fallar
+
+
+def _crear_campana(comando):
+    db.session.add(CampanaDBModel(
+        id=uuid.uuid4(), id_marca=uuid.uuid4(), nombre=comando.nombre,
+        tipo_campana='lealtad', objetivo='ventas', estado='activa'
+    ))
+    db.session.flush()
+    if comando.fallar:
+        raise ValueError(f'falló {comando.nombre}')
+    return comando.nombre
+
+
+def _enviar(app, grupal, comando, resultados, siguiente=_crear_campana):
+    def cliente():
+        with app.app_context():
+            try:
+                resultados[comando.nombre] = grupal(comando, siguiente)
+            except Exception as e:
+                resultados[comando.nombre] = e
+    hilo = threading.Thread(target=cliente, daemon=True)
+    hilo.start()
+    return hilo
+
+
+def _esperar(hilos):
+    for hilo in hilos:
+        hilo.join(ESPERA_MAXIMA)
+    assert not any(hilo.is_alive() for hilo in hilos), 'el lote quedó bloqueado'
+
+
+def _nombres_guardados(app, nombres):
+    with app.app_context():
+        return set(db.session.execute(
+            select(CampanaDBModel.nombre).where(CampanaDBModel.nombre.in_(nombres))
+        ).scalars())
+
+
+def _lote(prefijo, cantidad):
+    return [f'{prefijo}-{i}-{uuid.uuid4()}' for i in range(cantidad)]
+
+
+def test_comando_fallido_vuelve_a_su_savepoint_y_los_demas_confirman(app):
+    # La ventana es larga: el lote sale cuando llegan los tres comandos
+    grupal = CommitGrupal([ComandoPrueba], ventana_ms=5000, max_comandos=3)
+    nombres, resultados = _lote('savepoint', 3), {}
+
+    hilos = [_enviar(app, grupal, ComandoPrueba(nombre, fallar=(i == 1)), resultados)
+             for i, nombre in enumerate(nombres)]
+    _esperar(hilos)
+
+    assert grupal.estadisticas()['lotes'] == 1
+    assert resultados[nombres[0]] == nombres[0] and resultados[nombres[2]] == nombres[2]
+    assert isinstance(resultados[nombres[1]], ValueError)
+    assert _nombres_guardados(app, nombres) == {nombres[0], nombres[2]}
+
+
+def test_commit_fallido_llega_a_todos_los_comandos_del_lote(app):
+    grupal = CommitGrupal([ComandoPrueba], ventana_ms=5000, max_comandos=3)
+    nombres, resultados = _lote('commit', 3), {}
+
+    def marcar_y_crear(comando):
+        db.session.info['fallar_commit'] = True
+        return _crear_campana(comando)
+
+    def fallar_commit(session):
+        # before_commit también corre al liberar cada SAVEPOINT: falla solo el COMMIT del lote
+        if session.in_nested_transaction():
+            return
+        if session.info.pop('fallar_commit', False):
+            raise RuntimeError('commit rechazado')
+
+    event.listen(Session, 'before_commit', fallar_commit)
+    try:
+        hilos = [_enviar(app, grupal, ComandoPrueba(nombre), resultados, marcar_y_crear) for nombre in nombres]
+        _esperar(hilos)
+    finally:
+        event.remove(Session, 'before_commit', fallar_commit)
+
+    errores = [resultados[nombre] for nombre in nombres]
+    assert all(isinstance(error, RuntimeError) for error in errores)
+    assert len({id(error) for error in errores}) == 1
+    assert _nombres_guardados(app, nombres) == set()
+
+
+def test_comandos_que_llegan_durante_un_lote_los_toma_el_lider_promovido(app):
+    grupal = CommitGrupal([ComandoPrueba], ventana_ms=0, max_comandos=64)
+    primero, *siguientes = nombres = _lote('promovido', 3)
+    resultados, ejecutando, seguir = {}, threading.Event(), threading.Event()
+
+    def crear_y_esperar(comando):
+        if comando.nombre == primero:
+            ejecutando.set()
+            assert seguir.wait(ESPERA_MAXIMA)
+        return _crear_campana(comando)
+
+    hilos = [_enviar(app, grupal, ComandoPrueba(primero), resultados, crear_y_esperar)]
+    assert ejecutando.wait(ESPERA_MAXIMA)
+    # El primer lote sigue abierto: estos dos quedan en cola como seguidores
+    hilos += [_enviar(app, grupal, ComandoPrueba(nombre), resultados, crear_y_esperar) for nombre in siguientes]
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while len(grupal._cola) < len(siguientes):
+        if time.monotonic() > limite:
+            pytest.fail('los comandos no llegaron a la cola')
+        time.sleep(0.01)
+    seguir.set()
+    _esperar(hilos)
+
+    assert resultados == {nombre: nombre for nombre in nombres}
+    assert grupal.estadisticas() == {'lotes': 2, 'comandos': 3, 'promedio_por_lote': 1.5}
+    assert _nombres_guardados(app, nombres) == set(nombres)
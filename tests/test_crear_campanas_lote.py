@@ -0,0 +1,32 @@
+"""Validación de fechas en la creación de campañas en lote"""
+
+import uuid
+from datetime import datetime
+
+from campaign_management.config.db import db
+from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import CrearCampana, CrearCampanasLote
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.seedwork.aplicacion.comandos import ejecutar_commando
+
+
+def _item(fecha_inicio, fecha_fin):
+    return CrearCampana(
+        id='', saga_id=str(uuid.uuid4()), id_marca=str(uuid.uuid4()), nombre='Otoño', tipo_campana='lealtad',
+        fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+    )
+
+
+def test_fechas_con_y_sin_zona_se_comparan_en_utc(app):
+    with app.app_context():
+        resultado = ejecutar_commando(CrearCampanasLote(campanas=[
+            # 10:00+05:00 son las 05:00 UTC: termina una hora después
+            _item('2026-01-01T10:00:00+05:00', '2026-01-01T06:00:00'),
+            # Termina una hora antes de empezar
+            _item('2026-01-01T10:00:00+05:00', '2026-01-01T04:00:00'),
+            _item('2026-01-01T00:00:00Z', '2026-01-31T00:00:00'),
+        ]))
+
+        assert (resultado['creadas'], resultado['rechazadas']) == (2, 1)
+        assert resultado['resultados'][1]['errores'] == ["fecha_fin debe ser posterior a fecha_inicio"]
+        campana = db.session.get(CampanaDBModel, uuid.UUID(resultado['resultados'][0]['id']))
+        assert (campana.fecha_inicio, campana.fecha_fin) == (datetime(2026, 1, 1, 5), datetime(2026, 1, 1, 6))
@@ -0,0 +1,86 @@
+"""Idempotency-Key en los endpoints de comandos"""
+
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from campaign_management.api.idempotencia import _huella
+from campaign_management.config.db import db
+from campaign_management.infraestructura import idempotencia
+from campaign_management.infraestructura.idempotencia import IdempotencyKey
+
+
+def _pausar(cliente, llave, id_marca, motivo='Revisión'):
+    return cliente.put(
+        f'/campaign-management/campaigns/marca/{id_marca}/pausar',
+        json={'motivo': motivo}, headers={'Idempotency-Key': llave}
+    )
+
+
+def _fila(app, llave):
+    with app.app_context():
+        return db.session.execute(select(IdempotencyKey).where(IdempotencyKey.key == llave)).scalar_one_or_none()
+
+
+def test_reintento_repite_la_respuesta_y_otra_peticion_responde_422(app):
+    cliente, llave, id_marca = app.test_client(), str(uuid.uuid4()), uuid.uuid4()
+
+    original = _pausar(cliente, llave, id_marca)
+    repetida = _pausar(cliente, llave, id_marca)
+    assert original.status_code == repetida.status_code == 200
+    assert repetida.headers['Idempotent-Replayed'] == 'true'
+    assert repetida.get_json() == original.get_json()
+
+    otra = _pausar(cliente, llave, id_marca, motivo='Otro motivo')
+    assert otra.status_code == 422
+
+
+def test_reserva_en_curso_responde_409(app):
+    cliente, llave, id_marca = app.test_client(), str(uuid.uuid4()), uuid.uuid4()
+    # Simula la petición original en curso con la misma huella que calcula el decorador
+    with app.test_request_context(
+        f'/campaign-management/campaigns/marca/{id_marca}/pausar', method='PUT', json={'motivo': 'Revisión'}
+    ):
+        huella = _huella()
+    with app.app_context():
+        reservada_en, guardada = idempotencia.reclamar_llave(llave, huella)
+    assert reservada_en is not None and guardada is None
+
+    assert _pausar(cliente, llave, id_marca).status_code == 409
+
+
+def test_reserva_retomada_no_la_pisa_la_peticion_original(app):
+    llave = str(uuid.uuid4())
+    with app.app_context():
+        original, _ = idempotencia.reclamar_llave(llave, 'a' * 64)
+        # La reserva queda huérfana: más antigua que IDEMPOTENCY_LOCK_SECONDS
+        vieja = original - timedelta(seconds=idempotencia.BLOQUEO_SEGUNDOS + 1)
+        with db.engine.begin() as conn:
+            conn.execute(update(IdempotencyKey).where(IdempotencyKey.key == llave).values(created_at=vieja))
+
+        retomada, _ = idempotencia.reclamar_llave(llave, 'a' * 64)
+        assert retomada is not None
+        assert idempotencia.guardar_respuesta(llave, 'a' * 64, retomada, 200, '{"segunda": true}')
+        # La original termina después: ni guarda ni libera sobre la reserva de la segunda
+        assert not idempotencia.guardar_respuesta(llave, 'a' * 64, vieja, 200, '{"primera": true}')
+        idempotencia.liberar_llave(llave, 'a' * 64, vieja)
+
+    assert _fila(app, llave).body == '{"segunda": true}'
+
+
+def test_purga_borra_solo_las_llaves_vencidas(app):
+    vencida, vigente = str(uuid.uuid4()), str(uuid.uuid4())
+    with app.app_context():
+        ahora = datetime.utcnow()
+        db.session.add_all([
+            IdempotencyKey(key=vencida, fingerprint='b' * 64, status_code=200, body='{}',
+                           created_at=ahora - timedelta(seconds=idempotencia.TTL_SEGUNDOS + 60)),
+            IdempotencyKey(key=vigente, fingerprint='b' * 64, status_code=200, body='{}', created_at=ahora),
+        ])
+        db.session.commit()
+
+        assert idempotencia.purgar_vencidas() >= 1
+
+    assert _fila(app, vencida) is None
+    assert _fila(app, vigente) is not None
@@ -0,0 +1,90 @@
+"""Índice en memoria de vigencias (``CAMPAIGN_RANGE_INDEX=memory``)
+
+El índice se mantiene al día con los eventos de ``campaign-events`` que lee el
+proceso de la API, sin retroceder con eventos atrasados, y la consulta por
+rango pide los ids encontrados en bloques acotados.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura import event_consumer_service
+from campaign_management.modulos.campaign_management.aplicacion.handlers import queries_campana_handler
+from campaign_management.modulos.campaign_management.aplicacion.paginacion import decodificar_cursor
+from campaign_management.modulos.campaign_management.aplicacion.queries.queries_campana import ObtenerCampanasEnRango
+from campaign_management.modulos.campaign_management.infraestructura.indice_rangos import IndiceRangosCampanas
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel
+
+
+@pytest.fixture
+def indice(monkeypatch):
+    indice = IndiceRangosCampanas(habilitado=True)
+    monkeypatch.setattr(event_consumer_service, 'indice_rangos', indice)
+    monkeypatch.setattr(queries_campana_handler, 'indice_rangos', indice)
+    return indice
+
+
+def _sobre(id_campana, version, fecha_inicio, fecha_fin):
+    """Mensaje de campaign-events como lo publica el dispatcher"""
+    return {'status': 'success', 'event_type': 'EventCampaignCreated', 'event_data': {
+        'event_type': 'CampaignScheduled', 'aggregate_id': str(id_campana), 'version': version,
+        'data': {'id': str(id_campana), 'id_marca': str(uuid.uuid4()), 'nombre': 'Invierno',
+                 'tipo_campana': 'lealtad', 'estado': 'programada', 'fecha_creacion': '2091-01-01T00:00:00',
+                 'fecha_inicio': fecha_inicio, 'fecha_fin': fecha_fin},
+    }}
+
+
+def test_eventos_leidos_en_la_api_actualizan_el_indice_por_version(app, indice):
+    servicio = event_consumer_service.EventConsumerService(app)
+    id_campana = uuid.uuid4()
+    enero, julio = (datetime(2091, 1, 10), datetime(2091, 1, 20)), (datetime(2091, 7, 10), datetime(2091, 7, 20))
+
+    servicio._on_campaign_snapshot(_sobre(id_campana, 2, '2091-01-01T00:00:00', '2091-01-31T00:00:00'))
+    servicio._on_campaign_snapshot(_sobre(id_campana, 3, '2091-07-01T00:00:00', '2091-07-31T00:00:00'))
+    # Repetido y atrasado: no debe devolver la campaña a enero
+    servicio._on_campaign_snapshot(_sobre(id_campana, 2, '2091-01-01T00:00:00', '2091-01-31T00:00:00'))
+
+    with app.app_context():
+        assert indice.solapadas(db.session, *enero) == []
+        assert [id_ for _, id_ in indice.solapadas(db.session, *julio)] == [id_campana]
+
+
+def test_rango_con_indice_consulta_los_ids_en_bloques(app, indice, monkeypatch):
+    monkeypatch.setattr(queries_campana_handler, 'MAX_IDS_POR_CONSULTA', 2)
+    monkeypatch.setattr(queries_campana_handler, 'modelo_lectura', lambda: CampanaReadDBModel)
+    id_marca, creacion = uuid.uuid4(), datetime(2092, 1, 1)
+    with app.app_context():
+        campanas = [
+            CampanaReadDBModel(
+                id=uuid.uuid4(), id_marca=id_marca, nombre=f'Campaña {i}', tipo_campana='lealtad', estado='programada',
+                fecha_inicio=datetime(2092, 3, 1), fecha_fin=datetime(2092, 3, 31),
+                fecha_creacion=creacion + timedelta(days=i), last_version=2
+            )
+            for i in range(5)
+        ]
+        db.session.add_all(campanas)
+        db.session.commit()
+        esperadas = [str(c.id) for c in sorted(campanas, key=lambda c: c.fecha_creacion, reverse=True)]
+
+        query = ObtenerCampanasEnRango(desde='2092-03-10T00:00:00', hasta='2092-03-11T00:00:00',
+                                       id_marca=str(id_marca), limite=2, campos=['id'])
+        vistas, paginas = [], 0
+        while True:
+            pagina = queries_campana_handler.manejar_obtener_campanas_en_rango(query)
+            vistas += [item['id'] for item in pagina['items']]
+            paginas += 1
+            if not pagina['next_cursor']:
+                break
+            assert decodificar_cursor(pagina['next_cursor'])[1] == uuid.UUID(vistas[-1])
+            query.cursor = pagina['next_cursor']
+        assert (vistas, paginas) == (esperadas, 3)
+
+        query = ObtenerCampanasEnRango(desde='2092-03-10T00:00:00', hasta='2092-03-11T00:00:00',
+                                       id_marca=str(id_marca), stream=True, campos=['id'])
+        assert [item['id'] for item in queries_campana_handler.manejar_obtener_campanas_en_rango(query)] == esperadas
+
+        query = ObtenerCampanasEnRango(desde='2093-01-01T00:00:00', hasta='2093-01-02T00:00:00')
+        assert queries_campana_handler.manejar_obtener_campanas_en_rango(query) == {'items': [], 'next_cursor': None}
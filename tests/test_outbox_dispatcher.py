@@ -0,0 +1,87 @@
+"""Plazo por lote del dispatcher de outbox
+
+Un lote mantiene tomadas sus filas mientras espera las confirmaciones de
+Pulsar: la espera total se corta en ``OUTBOX_BATCH_TIMEOUT_SECONDS``, las olas
+siguientes no se envían y lo que quedó sin confirmar se reintenta sin contar
+un intento fallido.
+"""
+
+import contextlib
+import json
+import time
+import uuid
+
+from campaign_management.infraestructura.outbox import dispatcher
+
+
+class PublicadorSinRespuesta:
+    """Confirma al instante, salvo los eventos de ``colgado``, que nunca reciben respuesta"""
+
+    def __init__(self, colgado):
+        self.colgado = colgado
+        self.enviados = []
+
+    def publish_json_async(self, saga_id, event_data, event_type, status, callback):
+        self.enviados.append(event_data['aggregate_id'])
+        if event_data['aggregate_id'] != self.colgado:
+            callback(True, None)
+
+    def flush(self):
+        pass
+
+
+class ConexionSimulada:
+    def __init__(self, filas):
+        self.filas = filas
+        self.sentencias = []
+
+    def execute(self, sentencia, parametros=None):
+        self.sentencias.append((str(sentencia), parametros))
+        filas = self.filas
+
+        class Resultado:
+            def mappings(self):
+                return self
+
+            def all(self):
+                return filas
+        return Resultado()
+
+
+class BaseSimulada:
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    @property
+    def engine(self):
+        return self
+
+    @contextlib.contextmanager
+    def begin(self):
+        yield self.conexion
+
+
+def _fila(id_agregado):
+    return {'id': uuid.uuid4(), 'saga_id': uuid.uuid4(), 'aggregate_id': id_agregado,
+            'event_data': json.dumps({'aggregate_id': id_agregado})}
+
+
+def test_lote_corta_la_espera_y_no_cuenta_intento_a_lo_no_confirmado(monkeypatch):
+    colgado, sano = str(uuid.uuid4()), str(uuid.uuid4())
+    filas = [_fila(colgado), _fila(sano), _fila(colgado), _fila(sano)]
+    conexion, publicador = ConexionSimulada(filas), PublicadorSinRespuesta(colgado)
+    monkeypatch.setattr(dispatcher, 'db', BaseSimulada(conexion))
+    monkeypatch.setattr(dispatcher, 'pulsar_publisher', publicador)
+    monkeypatch.setattr(dispatcher, 'ACK_TIMEOUT_SECONDS', 30.0)
+    monkeypatch.setattr(dispatcher, 'BATCH_TIMEOUT_SECONDS', 0.2)
+
+    inicio = time.monotonic()
+    dispatcher.publish_pending_batch()
+
+    assert time.monotonic() - inicio < 5
+    # La primera ola agotó el plazo: la segunda no se envía
+    assert publicador.enviados == [colgado, sano]
+    updates = conexion.sentencias[1:]
+    assert len(updates) == 1
+    assert "status='PUBLISHED'" in updates[0][0]
+    assert updates[0][1]['ids'] == [str(filas[1]['id'])]
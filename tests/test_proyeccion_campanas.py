@@ -0,0 +1,115 @@
+"""Proyección de lectura reconstruida solo con los eventos de outbox
+
+Cada escritura deja en outbox la instantánea de la fila con su versión; al
+aplicar esos eventos, ``campaigns_read`` y ``campaigns_resumen`` deben quedar
+iguales al modelo de escritura, aunque lleguen repetidos o desordenados.
+"""
+
+import json
+import uuid
+
+from sqlalchemy import select
+
+from campaign_management.config.db import db
+from campaign_management.infraestructura.outbox.event_consumer_service import EventConsumerService
+from campaign_management.infraestructura.outbox.model import OutboxEvent
+from campaign_management.modulos.campaign_management.aplicacion.comandos.comandos_campana import (
+    ActivarCampana, ActualizarMetricasCampana, CrearCampana, CrearCampanasLote, PausarCampana, ProgramarCampana
+)
+from campaign_management.modulos.campaign_management.aplicacion.handlers.event_handler_factory import EventHandlerFactory
+from campaign_management.modulos.campaign_management.infraestructura.eventos_campana import COLUMNAS_INSTANTANEA
+from campaign_management.modulos.campaign_management.infraestructura.modelos import CampanaDBModel
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaReadDBModel, CampanaResumenDBModel
+from campaign_management.seedwork.aplicacion.comandos import ejecutar_commando
+
+
+def _campana_con_historia(app):
+    """Crea una campaña y la lleva por programar, activar, métricas y pausar; devuelve (id, id_marca)"""
+    id_marca = uuid.uuid4()
+    with app.app_context():
+        resultado = ejecutar_commando(CrearCampanasLote(campanas=[CrearCampana(
+            id='', saga_id=str(uuid.uuid4()), id_marca=str(id_marca), nombre='Verano', tipo_campana='lealtad',
+            descripcion='Descuentos de temporada', objetivo='ventas', presupuesto_total=1000.0, meta_ventas=50,
+            target_audiencia='Clientes frecuentes', terminos_condiciones='Aplican restricciones'
+        )]))
+        id_campana = resultado['resultados'][0]['id']
+        ejecutar_commando(ProgramarCampana(id_campana=id_campana, fecha_inicio='2030-01-01T00:00:00', fecha_fin='2030-02-01T00:00:00'))
+        ejecutar_commando(ActivarCampana(id_campana=id_campana))
+        ejecutar_commando(ActualizarMetricasCampana(id_campana=id_campana, ventas=7, presupuesto_utilizado=120.5))
+        ejecutar_commando(PausarCampana(id_campana=id_campana, motivo='Revisión'))
+    return uuid.UUID(id_campana), id_marca
+
+
+def _eventos(app, id_campana):
+    with app.app_context():
+        payloads = db.session.execute(
+            select(OutboxEvent.payload).where(OutboxEvent.aggregate_id == id_campana)
+        ).scalars().all()
+    return sorted((json.loads(p) for p in payloads), key=lambda evento: evento['version'])
+
+
+def _sobre(evento):
+    """Mensaje tal como lo publica el dispatcher en campaign-events"""
+    return {'saga_id': None, 'service': 'Campaign', 'status': 'success', 'event_type': 'EventCampaignCreated',
+            'event_data': evento, 'timestamp': evento['timestamp']}
+
+
+def _assert_proyeccion_igual_a_escritura(app, id_campana, version):
+    with app.app_context():
+        escritura = db.session.get(CampanaDBModel, id_campana)
+        lectura = db.session.get(CampanaReadDBModel, id_campana)
+        assert lectura.last_version == escritura.version == version
+        for columna in COLUMNAS_INSTANTANEA:
+            assert getattr(lectura, columna) == getattr(escritura, columna), columna
+
+
+def _resumen(app, id_marca):
+    with app.app_context():
+        filas = db.session.execute(
+            select(CampanaResumenDBModel).where(CampanaResumenDBModel.id_marca == id_marca)
+        ).scalars().all()
+        return {fila.estado: (fila.cantidad, fila.presupuesto_total, fila.presupuesto_utilizado, fila.ventas_actuales)
+                for fila in filas}
+
+
+def test_cada_escritura_deja_su_version_y_la_fila_completa(app):
+    id_campana, _ = _campana_con_historia(app)
+    eventos = _eventos(app, id_campana)
+
+    assert [(e['event_type'], e['version']) for e in eventos] == [
+        ('CampaignCreated', 1), ('CampaignScheduled', 2), ('CampaignActivated', 3),
+        ('CampaignMetricsUpdated', 4), ('CampaignPaused', 5),
+    ]
+    creada, pausada = eventos[0]['data'], eventos[-1]['data']
+    assert creada['descripcion'] == 'Descuentos de temporada'
+    assert creada['presupuesto_total'] == 1000.0
+    assert creada['meta_ventas'] == 50
+    assert pausada['estado'] == 'pausada'
+    assert pausada['ventas_actuales'] == 7
+    assert pausada['fecha_inicio'] == '2030-01-01T00:00:00'
+
+
+def test_proyeccion_con_los_handlers_queda_igual_al_modelo_de_escritura(app):
+    id_campana, id_marca = _campana_con_historia(app)
+    with app.app_context():
+        for evento in _eventos(app, id_campana):
+            EventHandlerFactory.handle_campaign_event(evento)
+
+    _assert_proyeccion_igual_a_escritura(app, id_campana, 5)
+    resumen = _resumen(app, id_marca)
+    assert resumen.pop('pausada') == (1, 1000.0, 120.5, 7)
+    assert all(cantidad == 0 for cantidad, *_ in resumen.values())
+
+
+def test_eventos_repetidos_o_atrasados_no_retroceden_la_proyeccion(app):
+    id_campana, id_marca = _campana_con_historia(app)
+    eventos = _eventos(app, id_campana)
+    servicio = EventConsumerService(use_new_handlers=False, app=app)
+    servicio.running = True
+
+    # Llegan desordenados y con repetidos: la versión 5 primero, luego las anteriores
+    for evento in [eventos[-1], *eventos, eventos[2]]:
+        servicio._on_campaign_message(_sobre(evento))
+
+    _assert_proyeccion_igual_a_escritura(app, id_campana, 5)
+    assert _resumen(app, id_marca) == {'pausada': (1, 1000.0, 120.5, 7)}
@@ -0,0 +1,39 @@
+"""Deltas del resumen por marca con y sin upsert del dialecto"""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from campaign_management.config.db import db
+from campaign_management.modulos.campaign_management.infraestructura import resumen_marca
+from campaign_management.modulos.campaign_management.infraestructura.modelos_read import CampanaResumenDBModel
+
+
+def _campana(id_marca, estado, presupuesto, ventas):
+    return resumen_marca.instantanea({
+        'id_marca': id_marca, 'estado': estado, 'tipo_campana': 'lealtad',
+        'presupuesto_total': presupuesto, 'presupuesto_utilizado': 0.0, 'ventas_actuales': ventas,
+    })
+
+
+@pytest.mark.parametrize('con_upsert', [True, False], ids=['on_conflict', 'generico'])
+def test_deltas_suman_y_mueven_entre_estados(app, monkeypatch, con_upsert):
+    if not con_upsert:
+        monkeypatch.setattr(resumen_marca, '_UPSERTS', {})
+    id_marca = uuid.uuid4()
+    with app.app_context():
+        resumen_marca.aplicar_delta_resumen(db.session, None, _campana(id_marca, 'borrador', 100.0, 0))
+        resumen_marca.aplicar_delta_resumen(db.session, None, _campana(id_marca, 'borrador', 50.0, 0))
+        resumen_marca.aplicar_delta_resumen(
+            db.session, _campana(id_marca, 'borrador', 100.0, 0), _campana(id_marca, 'activa', 100.0, 3)
+        )
+        db.session.commit()
+
+        filas = db.session.execute(
+            select(CampanaResumenDBModel).where(CampanaResumenDBModel.id_marca == id_marca)
+        ).scalars().all()
+        assert {f.estado: (f.cantidad, f.presupuesto_total, f.ventas_actuales) for f in filas} == {
+            'borrador': (1, 50.0, 0),
+            'activa': (1, 100.0, 3),
+        }